@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+MCP Platform - Orchestrator benchmark
+Generates a synthetic config.json with N clients (plus their credential
+files) in a temporary directory and times manifest generation, per run and
+per tenant, and template loading with a cold and a warm bytecode cache.
+
+Usage (from mcp-platform/):
+    python benchmarks/orchestrator_bench.py --clients 5000 --jobs 1 4 8
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PLATFORM_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PLATFORM_DIR / 'orchestrator'))
+
+from orchestrator import CACHE_DIR, MCPOrchestrator  # noqa: E402
+
+
+def build_workspace(workspace, clients):
+    """Create config/config.json, config/secrets/*.env and the templates"""
+    shutil.copytree(PLATFORM_DIR / 'orchestrator' / 'templates', workspace / 'orchestrator' / 'templates')
+    secrets_dir = workspace / 'config' / 'secrets'
+    secrets_dir.mkdir(parents=True)
+
+    config = {
+        'path_pattern': '/{client_name}/{environment}',
+        'argocd': {
+            'namespace': 'argocd',
+            'repo_url': 'https://github.com/your-org/mcp-manifests.git',
+            'branch': 'main'
+        },
+        'clients': [],
+        'database': {
+            'host': 'postgres-service.mcp-platform.svc.cluster.local',
+            'port': 5432,
+            'name': 'mcp_platform'
+        }
+    }
+    for i in range(clients):
+        client_name = f"bench-client-{i:05d}"
+        config['clients'].append({
+            'client_name': client_name,
+            'environments': {'development': True, 'staging': i % 2 == 0, 'production': i % 3 == 0},
+            'credentials_file': f"secrets/{client_name}.env",
+            'resources': {
+                'limits': {'cpu': '500m', 'memory': '512Mi'},
+                'requests': {'cpu': '250m', 'memory': '256Mi'}
+            }
+        })
+        with open(secrets_dir / f"{client_name}.env", 'w') as f:
+            f.write(f'GOOGLE_CALENDAR_ID="{client_name}@group.calendar.google.com"\n')
+            f.write(f'GOOGLE_PROJECT_ID="{client_name}"\n')
+            f.write(f'GEMINI_API_KEY="key-{i}"\n')
+            f.write(f'WHATSAPP_API_TOKEN="token-{i}"\n')
+            f.write(f'WHATSAPP_PHONE_NUMBER_ID="{1000000 + i}"\n')
+            f.write('DATABASE_USER="client"\nDATABASE_PASSWORD="secret"\n')
+
+    with open(workspace / 'config' / 'config.json', 'w') as f:
+        json.dump(config, f)
+
+
+def time_template_loading():
+    """Time MCPOrchestrator construction without and with the Jinja bytecode cache"""
+    shutil.rmtree(CACHE_DIR, ignore_errors=True)
+    start = time.perf_counter()
+    MCPOrchestrator('config/config.json')
+    cold = time.perf_counter() - start
+    start = time.perf_counter()
+    MCPOrchestrator('config/config.json')
+    warm = time.perf_counter() - start
+    return cold, warm
+
+
+def run(jobs, force):
+    orchestrator = MCPOrchestrator('config/config.json')
+    start = time.perf_counter()
+    stats = orchestrator.generate_all_manifests(force=force, jobs=jobs)
+    return time.perf_counter() - start, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Orchestrator benchmark')
+    parser.add_argument('--clients', type=int, default=5000, help='Number of synthetic clients')
+    parser.add_argument('--jobs', type=int, nargs='+', default=[1, os.cpu_count() or 1],
+                        help='Worker counts to benchmark')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    original_cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='mcp-orchestrator-bench-') as tmp:
+        workspace = Path(tmp)
+        build_workspace(workspace, args.clients)
+        os.chdir(workspace)
+        try:
+            print(f"{args.clients} clients")
+            cold, warm = time_template_loading()
+            print(f"template loading: cold cache {cold * 1000:.1f}ms, warm cache {warm * 1000:.1f}ms")
+            print(f"{'jobs':>5} {'run':>12} {'envs':>7} {'seconds':>9} {'ms/env':>8} {'ms/tenant':>9}  phases (ms)")
+            for jobs in args.jobs:
+                for label, force in (('full', True), ('incremental', False)):
+                    seconds, stats = run(jobs, force)
+                    environments = stats['generated'] + stats['unchanged']
+                    per_env = seconds * 1000 / max(environments, 1)
+                    per_tenant = seconds * 1000 / max(args.clients, 1)
+                    phases = ' '.join(f"{name}={ms}" for name, ms in stats['timings'].items())
+                    phases += ' | workers: ' + ' '.join(
+                        f"{name}={ms}" for name, ms in stats['worker_timings'].items()
+                    )
+                    print(f"{jobs:>5} {label:>12} {environments:>7} {seconds:>9.2f} {per_env:>8.3f} {per_tenant:>9.3f}  {phases}")
+        finally:
+            os.chdir(original_cwd)
+
+
+if __name__ == '__main__':
+    main()
@@ -63,6 +63,8 @@ CREATE TABLE IF NOT EXISTS message_logs (
 -- Indexes
 CREATE INDEX IF NOT EXISTS idx_appointments_client_name ON appointments(client_name);
 CREATE INDEX IF NOT EXISTS idx_appointments_customer_phone ON appointments(customer_phone);
+-- (start_time, id): paginação por cursor em /api/v1/appointments/list
+CREATE INDEX IF NOT EXISTS idx_appointments_client_start_id ON appointments(client_name, start_time, id);
 CREATE INDEX IF NOT EXISTS idx_message_logs_client_name ON message_logs(client_name);
 
 -- Insert default admin user (password: admin123)
@@ -87,4 +89,22 @@ CREATE TRIGGER update_clients_updated_at BEFORE UPDATE ON clients
 
 DROP TRIGGER IF EXISTS update_appointments_updated_at ON appointments;
 CREATE TRIGGER update_appointments_updated_at BEFORE UPDATE ON appointments
-    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
\ No newline at end of file
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- Notify the orchestrator (LISTEN clients_changed) about client changes
+CREATE OR REPLACE FUNCTION notify_clients_changed()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM pg_notify('clients_changed', OLD.client_name);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND (TG_OP = 'INSERT' OR NEW.client_name <> OLD.client_name) THEN
+        PERFORM pg_notify('clients_changed', NEW.client_name);
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS notify_clients_changed ON clients;
+CREATE TRIGGER notify_clients_changed AFTER INSERT OR UPDATE OR DELETE ON clients
+    FOR EACH ROW EXECUTE FUNCTION notify_clients_changed();
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, List, Optional
 
 class Settings(BaseSettings):
     # Application settings
@@ -12,6 +12,8 @@ class Settings(BaseSettings):
     DATABASE_NAME: str
     DATABASE_USER: str
     DATABASE_PASSWORD: str
+    DATABASE_POOL_MIN_SIZE: int = 0  # connections are opened on demand
+    DATABASE_POOL_MAX_SIZE: int = 10  # per worker process
     
     # Google Calendar settings
     GOOGLE_CALENDAR_API_KEY: Optional[str] = None
@@ -28,10 +30,89 @@ class Settings(BaseSettings):
     WHATSAPP_PHONE_NUMBER_ID: str
     WHATSAPP_WEBHOOK_VERIFY_TOKEN: str = "mcp_webhook_verify_token"
     
+    # Outbound scheduler for the Graph API (per phone_number_id, per worker process)
+    WHATSAPP_MESSAGES_PER_SECOND: float = 40.0
+    WHATSAPP_MAX_CONCURRENCY: int = 32
+    WHATSAPP_INITIAL_CONCURRENCY: int = 4
+    WHATSAPP_MAX_SEND_ATTEMPTS: int = 5
+    WHATSAPP_THROTTLE_BACKOFF_SECONDS: float = 1.0
+    
+    # Appointment reminder campaigns (template sent the evening before)
+    REMINDER_ENABLED: bool = False
+    REMINDER_TEMPLATE_NAME: str = "appointment_reminder"
+    REMINDER_WINDOW_START_HOUR: int = 18  # America/Sao_Paulo
+    REMINDER_WINDOW_END_HOUR: int = 21
+    REMINDER_CHECK_INTERVAL_SECONDS: float = 300.0
+    REMINDER_BATCH_SIZE: int = 500
+    REMINDER_CONCURRENCY: int = 64
+    REMINDER_LOCK_TTL_SECONDS: int = 60
+    REMINDER_RETENTION_SECONDS: int = 7 * 24 * 3600
+    
+    # Outbound HTTP settings (shared aiohttp session, per worker process)
+    HTTP_POOL_SIZE: int = 100
+    HTTP_TIMEOUT_SECONDS: float = 15.0
+    
+    # Resilience for Calendar, Gemini and Graph calls (per dependency, per worker process)
+    DEPENDENCY_TIMEOUTS: Dict[str, float] = {"calendar": 10.0, "gemini": 20.0, "graph": 10.0}
+    CIRCUIT_WINDOW: int = 50  # most recent calls considered by the breaker
+    CIRCUIT_MIN_CALLS: int = 10
+    CIRCUIT_FAILURE_RATIO: float = 0.5
+    CIRCUIT_RESET_SECONDS: float = 30.0
+    RETRY_MAX_ATTEMPTS: int = 3
+    RETRY_BASE_DELAY_SECONDS: float = 0.2
+    RETRY_MAX_DELAY_SECONDS: float = 2.0
+    RETRY_BUDGET_RATIO: float = 0.1  # retries as a share of calls in the last 10s
+    RETRY_BUDGET_MIN_PER_SECOND: float = 1.0
+    CALENDAR_MAX_THREADS: int = 8  # blocking googleapiclient calls run in this pool
+    CALENDAR_PAGE_SIZE: int = 250  # events per events().list page (max 2500)
+    
+    # Hedged Calendar reads: a second request after the HEDGE_PERCENTILE latency
+    HEDGE_ENABLED: bool = False
+    HEDGE_PERCENTILE: float = 0.95
+    HEDGE_MIN_DELAY_SECONDS: float = 0.05
+    HEDGE_MIN_SAMPLES: int = 20
+    HEDGE_BUDGET_RATIO: float = 0.05  # hedges as a share of calls in the last 10s
+    
     # Redis settings
     REDIS_HOST: str = "redis-service"
     REDIS_PORT: int = 6379
     
+    # Slot holds in Redis (prevent double-booking between concurrent conversations)
+    SLOT_HOLDS_ENABLED: bool = True
+    SLOT_HOLD_GRANULARITY_MINUTES: int = 15
+    SLOT_OFFER_HOLD_SECONDS: int = 120  # slots offered in a conversation
+    SLOT_CONFIRM_HOLD_SECONDS: int = 30  # while the booking is written to Calendar
+    SLOT_BUSY_CACHE_SECONDS: int = 300  # bookings read from / written to Calendar
+    
+    # Rate limiting settings (token buckets in Redis, requests per minute)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_TENANT_PER_MINUTE: float = 600
+    RATE_LIMIT_TENANT_BURST: int = 100
+    RATE_LIMIT_TENANT_OVERRIDES: Dict[str, float] = {}  # CLIENT_NAME -> per minute
+    RATE_LIMIT_SENDER_PER_MINUTE: float = 10
+    RATE_LIMIT_SENDER_BURST: int = 5
+    RATE_LIMIT_SENDER_OVERRIDES: Dict[str, float] = {}  # phone number / user_id -> per minute
+    RATE_LIMIT_NOTICE_WINDOW_SECONDS: int = 300
+    RATE_LIMIT_REPLY: str = "Você enviou muitas mensagens em pouco tempo. Aguarde alguns minutos e tente novamente."
+    
+    # Health check settings
+    HEALTH_CHECK_INTERVAL_SECONDS: float = 30.0
+    HEALTH_CHECK_TIMEOUT_SECONDS: float = 5.0
+    READINESS_DEPENDENCIES: List[str] = ["redis"]
+    
+    # Logging settings
+    LOG_LEVEL: str = "INFO"
+    LOG_LEVEL_OVERRIDES: Dict[str, str] = {}  # CLIENT_NAME -> level
+    LOG_FORMAT: str = "json"  # json | text
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_PAYLOAD_SAMPLE_RATE: float = 0.0  # fraction of webhook payloads dumped at DEBUG
+    
+    # Tracing settings (OpenTelemetry)
+    OTEL_TRACES_EXPORTER: str = "none"  # none | otlp | console | memory
+    OTEL_EXPORTER_OTLP_ENDPOINT: Optional[str] = None
+    OTEL_SERVICE_NAME: str = "mcp-server"
+    OTEL_TRACES_SAMPLER_RATIO: float = 1.0
+    
     # Security settings
     SECRET_KEY: str = "your-secret-key-here"
     ALGORITHM: str = "HS256"
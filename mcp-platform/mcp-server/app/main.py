@@ -1,15 +1,28 @@
 from fastapi import FastAPI, HTTPException, Depends, Request
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from contextlib import asynccontextmanager
 import asyncio
+import hashlib
 import logging
+import math
+import orjson
+from app.utils.services.lazy import LazyService, startup_report
+from app.utils.services.health_service import HealthMonitor
+from app.utils.services.rate_limiter import RateLimiter
+from app.utils.services.slot_holds import SlotHolds
+from app.utils.services.outbound_scheduler import stop_schedulers
+from app.utils.services.reminder_service import ReminderService
 from app.config import settings
-from app.utils.routers import appointments, webhooks, onboarding_api
-from app.utils.services import calendar_service, whatsapp_service, gemini_service
-import redis.asyncio as aioredis
+from app.utils.metrics import observe_stage, render_latest
+from app.utils.tracing import setup_tracing
+from app.utils.logging_config import configure_logging
 
-# Configura o logging
-logging.basicConfig(level=logging.INFO)
+with startup_report.measure("import:routers"):
+    from app.utils.routers import appointments, webhooks, onboarding_api
+
+# Configura o logging (JSON, assíncrono via fila, com redação de PII)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 # Segurança
@@ -17,32 +30,96 @@ security = HTTPBearer()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Incialização da aplicação
+    # Incialização da aplicação. Sob gunicorn roda uma vez em cada worker,
+    # depois do fork: Redis, pool do banco e sessão HTTP são por processo
     logger.info(f"Iniciando MCP Server para {settings.CLIENT_NAME} - {settings.ENVIRONMENT}")
 
     # **CORREÇÃO**: Disponibiliza as configurações no estado da aplicação
     app.state.settings = settings
 
-    # Conexão com o Redis
+    # Conexão com o Redis (import adiado para não pesar em processos que só respondem /health)
+    with startup_report.measure("import:redis"):
+        import redis.asyncio as aioredis
+
     redis_url = f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}"
     logger.info(f"Conectando ao Redis em {redis_url}")
     try:
-        app.state.redis = aioredis.Redis.from_url(redis_url)
-        await app.state.redis.ping()
+        with startup_report.measure("init:redis"):
+            app.state.redis = aioredis.Redis.from_url(redis_url)
+            await app.state.redis.ping()
         logger.info("Conectado ao Redis com sucesso.")
     except Exception as e:
         logger.error(f"Falha ao conectar ao Redis: {e}")
         app.state.redis = None
 
-    # Inicialização dos serviços
-    app.state.calendar_service = calendar_service.CalendarService()
-    app.state.whatsapp_service = whatsapp_service.WhatsAppService()
-    app.state.gemini_service = gemini_service.GeminiService()
-    logger.info("Serviços principais inicializados.")
+    # Limites por cliente e por remetente (fail open sem Redis)
+    app.state.rate_limiter = RateLimiter(app.state.redis)
+
+    # Reservas curtas de horários no Redis (evitam agendamento duplo)
+    app.state.slot_holds = SlotHolds(app.state.redis) if settings.SLOT_HOLDS_ENABLED else None
+
+    # Pool do Postgres por worker; com DATABASE_POOL_MIN_SIZE=0 as conexões
+    # só são abertas no primeiro uso
+    with startup_report.measure("import:asyncpg"):
+        import asyncpg
+
+    try:
+        with startup_report.measure("init:postgres_pool"):
+            app.state.db_pool = await asyncpg.create_pool(
+                user=settings.DATABASE_USER,
+                password=settings.DATABASE_PASSWORD,
+                database=settings.DATABASE_NAME,
+                host=settings.DATABASE_HOST,
+                port=settings.DATABASE_PORT,
+                min_size=settings.DATABASE_POOL_MIN_SIZE,
+                max_size=settings.DATABASE_POOL_MAX_SIZE
+            )
+    except Exception as e:
+        logger.error(f"Falha ao criar o pool do Postgres: {e}")
+        app.state.db_pool = None
+
+    # Sessão HTTP compartilhada (keep-alive) para as chamadas à Graph API
+    with startup_report.measure("import:aiohttp"):
+        import aiohttp
+
+    app.state.http_session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=settings.HTTP_POOL_SIZE, ttl_dns_cache=300),
+        timeout=aiohttp.ClientTimeout(total=settings.HTTP_TIMEOUT_SECONDS)
+    )
+
+    # Os serviços são construídos sob demanda, no primeiro uso, para não
+    # atrasar o readiness do pod (build do Calendar, genai.configure etc.)
+    app.state.calendar_service = LazyService(
+        "calendar", "app.utils.services.calendar_service:CalendarService",
+        holds=app.state.slot_holds
+    )
+    app.state.whatsapp_service = LazyService(
+        "whatsapp", "app.utils.services.whatsapp_service:WhatsAppService",
+        session=app.state.http_session, redis=app.state.redis
+    )
+    app.state.gemini_service = LazyService(
+        "gemini", "app.utils.services.gemini_service:GeminiService"
+    )
+    app.state.startup_report = startup_report
+    startup_report.log("Tempos de inicialização")
+
+    # Health check das dependências em background; os probes só leem o cache
+    app.state.health_monitor = HealthMonitor(app.state)
+    app.state.health_monitor.start()
+
+    # Campanhas de lembrete (agenda noturna quando REMINDER_ENABLED)
+    app.state.reminder_service = ReminderService(app.state)
+    app.state.reminder_service.start()
 
     yield
 
     # Encerramento da aplicação
+    await app.state.health_monitor.stop()
+    await app.state.reminder_service.stop()
+    await stop_schedulers()
+    await app.state.http_session.close()
+    if app.state.db_pool:
+        await app.state.db_pool.close()
     if app.state.redis:
         await app.state.redis.close()
         logger.info("Conexão com o Redis fechada.")
@@ -52,9 +129,13 @@ app = FastAPI(
     title="MCP Server",
     description="Servidor da Multi-Client Platform para gerenciamento de agendamentos",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    # Respostas serializadas com orjson em vez do json da stdlib
+    default_response_class=ORJSONResponse
 )
 
+setup_tracing(app)
+
 # Inclusão das rotas da API
 app.include_router(appointments.router, prefix="/api/v1/appointments", tags=["Appointments"])
 app.include_router(webhooks.router, prefix="/api/v1/webhooks", tags=["Webhooks"])
@@ -69,47 +150,54 @@ async def root():
         "status": "healthy"
     }
 
+@app.get("/livez")
+async def liveness_check():
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readiness_check():
+    snapshot = app.state.health_monitor.snapshot()
+    return ORJSONResponse(status_code=200 if snapshot["ready"] else 503, content=snapshot)
+
 @app.get("/health")
 async def health_check():
-    redis_status = "desconectado"
-    if hasattr(app.state, 'redis') and app.state.redis:
-        try:
-            await app.state.redis.ping()
-            redis_status = "conectado"
-        except Exception as e:
-            logger.error(f"Ping do Redis falhou no health check: {e}")
-            redis_status = "não saudável"
-    
-    calendar_status = "desconhecido"
-    if hasattr(app.state, 'calendar_service') and app.state.calendar_service:
-        try:
-            calendar_status = await app.state.calendar_service.health_check()
-        except Exception as e:
-            logger.error(f"Health check do serviço de calendário falhou: {e}")
-            calendar_status = "não saudável"
-    
-    overall_status = "não saudável"
-    if redis_status == "conectado" and calendar_status == "healthy":
-        overall_status = "saudável"
+    # Resposta servida a partir do cache do HealthMonitor (sem chamadas externas)
+    snapshot = app.state.health_monitor.snapshot()
+    services = {name: result["status"] for name, result in snapshot["services"].items()}
     
     return {
-        "status": overall_status,
-        "services": {
-            "redis": redis_status,
-            "calendar": calendar_status
-        }
+        "status": "saudável" if snapshot["ready"] else "não saudável",
+        "services": services
     }
 
+@app.get("/metrics")
+async def metrics():
+    payload, content_type = render_latest()
+    return Response(content=payload, media_type=content_type)
+
 @app.post("/api/v1/chat")
 async def chat_endpoint(
     request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
     try:
-        body = await request.json()
+        try:
+            body = orjson.loads(await request.body())
+        except orjson.JSONDecodeError:
+            raise HTTPException(status_code=400, detail="Corpo JSON inválido.")
         user_message = body.get("message", "")
         user_id = body.get("user_id", "")
 
+        # Sem user_id, o limite por remetente é aplicado ao token do chamador
+        sender = user_id or hashlib.sha256(credentials.credentials.encode()).hexdigest()[:16]
+        decision = await app.state.rate_limiter.check(sender, endpoint="chat")
+        if not decision.allowed:
+            raise HTTPException(
+                status_code=429,
+                detail=settings.RATE_LIMIT_REPLY,
+                headers={"Retry-After": str(max(1, math.ceil(decision.retry_after)))}
+            )
+
         ai_response = await app.state.gemini_service.process_message(
             user_message=user_message,
             user_id=user_id,
@@ -123,16 +211,19 @@ async def chat_endpoint(
             whatsapp_number = body.get("whatsapp_number")
             if not whatsapp_number:
                 raise HTTPException(status_code=400, detail="whatsapp_number é obrigatório quando send_whatsapp é true.")
-            await app.state.whatsapp_service.send_message(
-                to=whatsapp_number,
-                message=ai_response
-            )
+            with observe_stage("send"):
+                await app.state.whatsapp_service.send_message(
+                    to=whatsapp_number,
+                    message=ai_response
+                )
 
         return {
             "response": ai_response,
             "user_id": user_id,
             "processed": True
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Erro no processamento do chat: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Erro ao processar mensagem: {str(e)}")
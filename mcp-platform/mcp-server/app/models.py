@@ -37,9 +37,23 @@ class ClientEnvironments(BaseModel):
     staging: bool = False
     production: bool = False
 
+class ScalingMetric(BaseModel):
+    name: str
+    target_average_value: str
+
+class ClientScaling(BaseModel):
+    min_replicas: int = Field(1, ge=1)
+    max_replicas: int = Field(3, ge=1)
+    target_cpu_utilization: Optional[int] = Field(None, ge=1, le=100)
+    metric: Optional[ScalingMetric] = None
+    min_available: Optional[int] = None
+    scale_down_stabilization_seconds: int = 300
+    environments: Optional[List[EnvironmentType]] = None
+
 class ClientResources(BaseModel):
     limits: Dict[str, str] = Field(default_factory=lambda: {"cpu": "500m", "memory": "512Mi"})
     requests: Dict[str, str] = Field(default_factory=lambda: {"cpu": "250m", "memory": "256Mi"})
+    scaling: Optional[ClientScaling] = None
 
 class ClientCreate(BaseModel): 
     client_name: str = Field(..., pattern="^[a-z0-9-]+$") # MUDANÇA: regex para pattern
@@ -99,9 +113,10 @@ class AppointmentResponse(AppointmentBase):
 
 class AppointmentListResponse(BaseModel):
     appointments: List[AppointmentResponse]
-    total: int
+    total: Optional[int] = None  # not counted on cursor-paginated listings
     page: int = 1
     page_size: int = 20
+    next_cursor: Optional[str] = None  # pass as ?cursor= for the next page; null on the last page
 
 # Message Models
 class MessageBase(BaseModel):
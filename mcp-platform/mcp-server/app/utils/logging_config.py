@@ -0,0 +1,184 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import re
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from opentelemetry import trace
+
+from app.config import settings
+
+# Attributes every LogRecord has; anything else was passed through `extra=`
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "trace_id", "span_id"}
+
+_PHONE_RE = re.compile(r"(?<!\d)\+?\d{11,15}(?!\d)")
+_PAYLOAD_FIELD_RE = re.compile(r'("(?:body|text|name|title)"\s*:\s*)"(?:[^"\\]|\\.)*"')
+_BEARER_RE = re.compile(r"(Bearer\s+)[A-Za-z0-9._\-]+")
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_dropped_records = 0
+
+
+def _mask_phone(match: re.Match) -> str:
+    value = match.group(0)
+    return f"***{value[-4:]}"
+
+
+def redact(text: str) -> str:
+    """Mask phone numbers, message bodies/names in payloads and bearer tokens"""
+    text = _PAYLOAD_FIELD_RE.sub(r'\1"[REDACTED]"', text)
+    text = _BEARER_RE.sub(r"\1[REDACTED]", text)
+    return _PHONE_RE.sub(_mask_phone, text)
+
+
+def _redact_value(value: Any) -> Any:
+    """redact() for `extra=` values, keeping containers and plain numbers as they are"""
+    if isinstance(value, str):
+        return redact(value)
+    if isinstance(value, dict):
+        return {key: _redact_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [_redact_value(item) for item in value]
+    if isinstance(value, int) and not isinstance(value, bool):
+        # A phone number passed as an int
+        return value if len(str(abs(value))) < 11 else redact(str(value))
+    if value is None or isinstance(value, (bool, float)):
+        return value
+    return redact(str(value))
+
+
+class RedactionFilter(logging.Filter):
+    """Redacts PII. Attached to the output handler, so it runs on the listener thread.
+
+    Covers the interpolated message (so values passed through `args` too),
+    the exception text and every `extra=` attribute.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.msg = redact(record.getMessage())
+        record.args = None
+        if record.exc_text:
+            record.exc_text = redact(record.exc_text)
+        for key, value in list(record.__dict__.items()):
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                setattr(record, key, _redact_value(value))
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "tenant": settings.CLIENT_NAME,
+            "environment": settings.ENVIRONMENT,
+        }
+        if getattr(record, "trace_id", None):
+            entry["trace_id"] = record.trace_id
+            entry["span_id"] = record.span_id
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that does the minimum work on the calling thread.
+
+    Only the message interpolation, exception text and trace ids are
+    captured here; JSON encoding, redaction and the stdout write happen on
+    the listener thread. Records are dropped instead of blocking when the
+    queue is full.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+
+        span_context = trace.get_current_span().get_span_context()
+        if span_context.is_valid:
+            record.trace_id = format(span_context.trace_id, "032x")
+            record.span_id = format(span_context.span_id, "016x")
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        global _dropped_records
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _dropped_records += 1
+
+
+def effective_log_level() -> str:
+    """LOG_LEVEL, unless LOG_LEVEL_OVERRIDES has an entry for this tenant"""
+    return settings.LOG_LEVEL_OVERRIDES.get(settings.CLIENT_NAME, settings.LOG_LEVEL).upper()
+
+
+def should_log_payload() -> bool:
+    """Sampling decision for full webhook payload dumps (DEBUG only)"""
+    return settings.LOG_PAYLOAD_SAMPLE_RATE > 0 and random.random() < settings.LOG_PAYLOAD_SAMPLE_RATE
+
+
+def configure_logging():
+    """Route all logging through a bounded queue drained by a background thread"""
+    global _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler()
+    if settings.LOG_FORMAT == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+    output.addFilter(RedactionFilter())
+
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=False)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    root = logging.getLogger()
+    root.handlers = [NonBlockingQueueHandler(log_queue)]
+    root.setLevel(effective_log_level())
+
+    # Uvicorn/gunicorn install their own stream handlers; send them through the queue too
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access", "gunicorn.error", "gunicorn.access"):
+        server_logger = logging.getLogger(name)
+        server_logger.handlers = []
+        server_logger.propagate = True
+
+
+def restart_after_fork():
+    """Give a forked worker (gunicorn preload_app) its own queue and listener thread.
+
+    Threads do not survive fork, and the parent's queue may have been locked
+    by its listener at fork time.
+    """
+    global _listener
+    if _listener is None:
+        return
+
+    atexit.unregister(_listener.stop)
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, NonBlockingQueueHandler):
+            handler.queue = log_queue
+
+    _listener = logging.handlers.QueueListener(log_queue, *_listener.handlers, respect_handler_level=False)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+def dropped_records() -> int:
+    return _dropped_records
@@ -0,0 +1,233 @@
+import os
+import time
+from contextvars import ContextVar
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+from app.config import settings
+from app.utils.tracing import SpanKind, set_span_attribute, start_span
+
+TENANT = settings.CLIENT_NAME
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+STAGE_LATENCY = Histogram(
+    "mcp_pipeline_stage_duration_seconds",
+    "Duration of each message pipeline stage",
+    ["tenant", "stage", "intent"],
+    buckets=LATENCY_BUCKETS,
+)
+STAGE_ERRORS = Counter(
+    "mcp_pipeline_stage_errors_total",
+    "Exceptions raised by a message pipeline stage",
+    ["tenant", "stage", "intent"],
+)
+DEPENDENCY_LATENCY = Histogram(
+    "mcp_dependency_duration_seconds",
+    "Duration of calls to external dependencies",
+    ["tenant", "dependency", "operation"],
+    buckets=LATENCY_BUCKETS,
+)
+DEPENDENCY_ERRORS = Counter(
+    "mcp_dependency_errors_total",
+    "Failed calls to external dependencies",
+    ["tenant", "dependency", "operation"],
+)
+RETRIES = Counter(
+    "mcp_dependency_retries_total",
+    "Retried calls to external dependencies",
+    ["tenant", "dependency", "operation"],
+)
+CACHE_HITS = Counter(
+    "mcp_cache_hits_total",
+    "Cache hits",
+    ["tenant", "cache"],
+)
+CACHE_MISSES = Counter(
+    "mcp_cache_misses_total",
+    "Cache misses",
+    ["tenant", "cache"],
+)
+RATE_LIMITED = Counter(
+    "mcp_rate_limited_total",
+    "Requests rejected by the rate limiter",
+    ["tenant", "endpoint", "scope"],
+)
+OUTBOUND_QUEUE_DEPTH = Gauge(
+    "mcp_outbound_queue_depth",
+    "Graph API calls waiting in the outbound scheduler",
+    ["tenant", "phone_number_id"],
+    multiprocess_mode="livesum",
+)
+OUTBOUND_CONCURRENCY = Gauge(
+    "mcp_outbound_concurrency_limit",
+    "Current AIMD concurrency limit of the outbound scheduler",
+    ["tenant", "phone_number_id"],
+    multiprocess_mode="liveall",
+)
+OUTBOUND_QUEUE_WAIT = Histogram(
+    "mcp_outbound_queue_wait_seconds",
+    "Time Graph API calls spent queued before being sent",
+    ["tenant", "operation"],
+    buckets=LATENCY_BUCKETS,
+)
+CIRCUIT_STATE = Gauge(
+    "mcp_circuit_state",
+    "Circuit breaker state per dependency (0 closed, 1 half-open, 2 open)",
+    ["tenant", "dependency"],
+    multiprocess_mode="liveall",
+)
+CIRCUIT_REJECTED = Counter(
+    "mcp_circuit_rejected_total",
+    "Calls rejected without being sent because the circuit was open",
+    ["tenant", "dependency", "operation"],
+)
+RETRY_BUDGET_EXHAUSTED = Counter(
+    "mcp_retry_budget_exhausted_total",
+    "Retries skipped because the dependency's retry budget was spent",
+    ["tenant", "dependency"],
+)
+HEDGES = Counter(
+    "mcp_hedged_requests_total",
+    "Hedged requests sent, by which request answered first",
+    ["tenant", "dependency", "operation", "winner"],
+)
+SLOT_CONFLICTS = Counter(
+    "mcp_slot_conflicts_total",
+    "Slot reservations refused, by conflict (held by another owner, known booking)",
+    ["tenant", "reason"],
+)
+REMINDERS = Counter(
+    "mcp_reminders_total",
+    "Appointment reminders processed by campaigns",
+    ["tenant", "result"],
+)
+
+# Intent of the message being processed by the current request. Set by the
+# intent parser and read by the stages that run after it.
+_current_intent: ContextVar[str] = ContextVar("mcp_current_intent", default="none")
+
+
+def set_intent(intent: str):
+    _current_intent.set(intent)
+    set_span_attribute("mcp.intent", intent)
+
+
+def get_intent() -> str:
+    return _current_intent.get()
+
+
+class _Timer:
+    """Records latency (and errors) on exit and wraps the block in a span"""
+    __slots__ = ("histogram", "errors", "span", "start")
+
+    def __init__(self, histogram, errors, span):
+        self.histogram = histogram
+        self.errors = errors
+        self.span = span
+
+    def __enter__(self):
+        self.span.__enter__()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.start)
+        if exc_type is not None:
+            self.errors.inc()
+        self.span.__exit__(exc_type, exc, tb)
+        return False
+
+
+def observe_stage(stage: str, intent: str = None) -> _Timer:
+    """Time a pipeline stage: `with observe_stage("parse"): ...`"""
+    intent = intent or _current_intent.get()
+    return _Timer(
+        STAGE_LATENCY.labels(TENANT, stage, intent),
+        STAGE_ERRORS.labels(TENANT, stage, intent),
+        start_span(f"stage.{stage}", attributes={"mcp.stage": stage, "mcp.intent": intent}),
+    )
+
+
+def observe_dependency(dependency: str, operation: str) -> _Timer:
+    """Time a call to an external dependency: `with observe_dependency("calendar", "list"): ...`"""
+    return _Timer(
+        DEPENDENCY_LATENCY.labels(TENANT, dependency, operation),
+        DEPENDENCY_ERRORS.labels(TENANT, dependency, operation),
+        start_span(
+            f"{dependency}.{operation}",
+            kind=SpanKind.CLIENT,
+            attributes={"peer.service": dependency, "mcp.operation": operation},
+        ),
+    )
+
+
+def record_dependency_error(dependency: str, operation: str):
+    """Count a failure that the caller handled without raising"""
+    DEPENDENCY_ERRORS.labels(TENANT, dependency, operation).inc()
+
+
+def record_retry(dependency: str, operation: str):
+    RETRIES.labels(TENANT, dependency, operation).inc()
+
+
+def record_retry_budget_exhausted(dependency: str):
+    RETRY_BUDGET_EXHAUSTED.labels(TENANT, dependency).inc()
+
+
+_CIRCUIT_STATE_VALUES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+def set_circuit_state(dependency: str, state: str):
+    CIRCUIT_STATE.labels(TENANT, dependency).set(_CIRCUIT_STATE_VALUES[state])
+
+
+def record_circuit_rejected(dependency: str, operation: str):
+    CIRCUIT_REJECTED.labels(TENANT, dependency, operation).inc()
+
+
+def record_hedge(dependency: str, operation: str, winner: str):
+    HEDGES.labels(TENANT, dependency, operation, winner).inc()
+
+
+def record_slot_conflict(reason: str):
+    SLOT_CONFLICTS.labels(TENANT, reason).inc()
+
+
+def record_cache(cache: str, hit: bool):
+    (CACHE_HITS if hit else CACHE_MISSES).labels(TENANT, cache).inc()
+
+
+def record_rate_limited(endpoint: str, scope: str):
+    RATE_LIMITED.labels(TENANT, endpoint, scope).inc()
+
+
+def set_outbound_queue_depth(phone_number_id: str, depth: int):
+    OUTBOUND_QUEUE_DEPTH.labels(TENANT, phone_number_id).set(depth)
+
+
+def set_outbound_concurrency(phone_number_id: str, limit: float):
+    OUTBOUND_CONCURRENCY.labels(TENANT, phone_number_id).set(limit)
+
+
+def observe_outbound_queue_wait(operation: str, seconds: float):
+    OUTBOUND_QUEUE_WAIT.labels(TENANT, operation).observe(seconds)
+
+
+def record_reminder(result: str, count: int = 1):
+    REMINDERS.labels(TENANT, result).inc(count)
+
+
+def render_latest():
+    """Return the exposition payload and its content type for /metrics
+
+    Under gunicorn (PROMETHEUS_MULTIPROC_DIR set) the samples of every worker
+    are aggregated, whichever worker serves the scrape.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import CollectorRegistry, multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
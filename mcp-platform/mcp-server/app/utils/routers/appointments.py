@@ -1,14 +1,45 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Header, Query
 from fastapi.security import HTTPBearer
-from datetime import datetime, timedelta
-from typing import List, Optional
-from pydantic import BaseModel
+from datetime import date as Date, datetime, timedelta
+from typing import List, Literal, Optional
+from pydantic import BaseModel, Field
 import logging
+import math
+from app.models import AppointmentListResponse, AppointmentStatus
+from app.utils.services.appointment_store import (
+    AppointmentStore,
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+)
+from app.utils.services.resilience import CircuitOpenError
+from app.utils.services.slot_holds import SlotUnavailableError
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 security = HTTPBearer()
 
+# Itens por requisição nos endpoints /bulk (enviados ao Calendar em lotes de 50)
+MAX_BULK_ITEMS = 500
+
+# Tamanho máximo de página em /list (maxResults do Calendar vai até 2500)
+MAX_LIST_PAGE_SIZE = 250
+
+# Status que existem nos eventos do Calendar (completed/no_show só no banco)
+CALENDAR_STATUSES = {AppointmentStatus.SCHEDULED, AppointmentStatus.CONFIRMED, AppointmentStatus.CANCELLED}
+
+def slot_unavailable(e: SlotUnavailableError) -> HTTPException:
+    # Horário reservado em outra conversa ou já ocupado
+    return HTTPException(status_code=409, detail=f"Time slot is no longer available ({e.reason})")
+
+def calendar_unavailable(e: CircuitOpenError) -> HTTPException:
+    # Circuito aberto: responde na hora em vez de esperar o timeout do Google
+    return HTTPException(
+        status_code=503,
+        detail="Calendar temporarily unavailable",
+        headers={"Retry-After": str(math.ceil(e.retry_after))}
+    )
+
 # Pydantic models
 class AppointmentCreate(BaseModel):
     start_time: datetime
@@ -36,6 +67,28 @@ class AvailableSlot(BaseModel):
     end: str
     available: bool = True
 
+class BulkCreateRequest(BaseModel):
+    appointments: List[AppointmentCreate] = Field(..., min_length=1, max_length=MAX_BULK_ITEMS)
+
+class BulkCancelRequest(BaseModel):
+    ids: Optional[List[str]] = Field(None, min_length=1, max_length=MAX_BULK_ITEMS)
+    date: Optional[Date] = None  # cancela todos os agendamentos do dia
+
+class BulkAppointmentUpdate(AppointmentUpdate):
+    id: str
+    etag: Optional[str] = None  # If-Match: falha com 412 se o evento mudou
+
+class BulkUpdateRequest(BaseModel):
+    updates: List[BulkAppointmentUpdate] = Field(..., min_length=1, max_length=MAX_BULK_ITEMS)
+
+def bulk_response(results: List[dict]) -> dict:
+    succeeded = sum(1 for result in results if result["success"])
+    return {"succeeded": succeeded, "failed": len(results) - succeeded, "results": results}
+
+class ReminderCampaignRequest(BaseModel):
+    date: Optional[Date] = None  # default: tomorrow
+    source: Literal["database", "calendar"] = "database"
+
 @router.get("/available", response_model=List[AvailableSlot])
 async def get_available_slots(
     date: str = Query(..., description="Date in YYYY-MM-DD format"),
@@ -62,6 +115,8 @@ async def get_available_slots(
         
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+    except CircuitOpenError as e:
+        raise calendar_unavailable(e)
     except Exception as e:
         logger.error(f"Error getting available slots: {e}")
         raise HTTPException(status_code=500, detail="Error fetching available slots")
@@ -108,40 +163,201 @@ async def create_appointment(
             service_type=appointment.service_type
         )
         
+    except SlotUnavailableError as e:
+        raise slot_unavailable(e)
+    except CircuitOpenError as e:
+        raise calendar_unavailable(e)
     except Exception as e:
         logger.error(f"Error creating appointment: {e}")
         raise HTTPException(status_code=500, detail="Error creating appointment")
 
-@router.get("/list")
+@router.get("/list", response_model=AppointmentListResponse)
 async def list_appointments(
     phone: Optional[str] = Query(None, description="Filter by phone number"),
-    date: Optional[str] = Query(None, description="Filter by date (YYYY-MM-DD)"),
+    date: Optional[Date] = Query(None, description="Filter by date (YYYY-MM-DD)"),
+    date_from: Optional[Date] = Query(None, description="First day of the range (YYYY-MM-DD), default today"),
+    date_to: Optional[Date] = Query(None, description="Last day of the range (YYYY-MM-DD), inclusive"),
+    status: Optional[AppointmentStatus] = Query(None, description="Filter by status"),
+    service: Optional[str] = Query(None, description="Filter by service type"),
+    source: Literal["calendar", "database"] = Query("calendar", description="Google Calendar or the appointments table"),
+    page_size: int = Query(50, ge=1, le=MAX_LIST_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
     credentials = Depends(security)
 ):
-    """List appointments with optional filters"""
+    """List appointments by start time, one page per request (cursor pagination)"""
+    if date and (date_from or date_to):
+        raise HTTPException(status_code=400, detail="Use either date or date_from/date_to")
+    if source == "calendar" and status and status not in CALENDAR_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Status {status.value} is only available with source=database")
+    
+    # Datas no horário local do negócio; date_to inclui o dia inteiro
+    first_day = date or date_from or Date.today()
+    last_day = date or date_to
+    start = datetime.combine(first_day, datetime.min.time())
+    end = datetime.combine(last_day + timedelta(days=1), datetime.min.time()) if last_day else None
+    if end is not None and end <= start:
+        raise HTTPException(status_code=400, detail="date_to must not be before date_from")
+    
     try:
         from app.main import app
         
-        if phone:
-            # Get appointments by phone number
-            appointments = await app.state.calendar_service.get_appointment_by_phone(phone)
-            return {"appointments": appointments}
+        filters = {
+            "status": status.value if status else None,
+            "service_type": service,
+            "phone": phone,
+            "page_size": page_size
+        }
+        if source == "database":
+            if app.state.db_pool is None:
+                raise HTTPException(status_code=503, detail="Database not available")
+            appointments, next_cursor = await AppointmentStore(app.state.db_pool).list_page(
+                start, end, cursor=cursor, **filters
+            )
+        else:
+            # O cursor carrega o nextPageToken do Calendar
+            page_token = decode_cursor("calendar", cursor).get("page_token") if cursor else None
+            if cursor and not isinstance(page_token, str):
+                raise InvalidCursorError("Malformed cursor")
+            appointments, next_page_token = await app.state.calendar_service.list_appointments_page(
+                start, end, page_token=page_token, **filters
+            )
+            next_cursor = encode_cursor("calendar", {"page_token": next_page_token}) if next_page_token else None
         
-        # For now, return empty list if no phone filter
-        # In production, you'd implement date filtering
-        return {"appointments": []}
+        return AppointmentListResponse(
+            appointments=appointments,
+            page_size=page_size,
+            next_cursor=next_cursor
+        )
         
+    except HTTPException:
+        raise
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    except CircuitOpenError as e:
+        raise calendar_unavailable(e)
     except Exception as e:
         logger.error(f"Error listing appointments: {e}")
         raise HTTPException(status_code=500, detail="Error fetching appointments")
 
+@router.post("/bulk/create")
+async def bulk_create_appointments(
+    request: BulkCreateRequest,
+    credentials = Depends(security)
+):
+    """Create many appointments in Calendar batch requests (no WhatsApp confirmation)
+
+    Each item goes through the slot hold check of /create: an item whose slot
+    is held or booked fails with status 409 in its result.
+    """
+    try:
+        from app.main import app
+        
+        results = await app.state.calendar_service.create_appointments([
+            appointment.model_dump() for appointment in request.appointments
+        ])
+        return bulk_response(results)
+        
+    except CircuitOpenError as e:
+        raise calendar_unavailable(e)
+    except Exception as e:
+        logger.error(f"Error creating appointments in bulk: {e}")
+        raise HTTPException(status_code=500, detail="Error creating appointments")
+
+@router.post("/bulk/cancel")
+async def bulk_cancel_appointments(
+    request: BulkCancelRequest,
+    credentials = Depends(security)
+):
+    """Cancel a list of appointments, or every appointment of a day"""
+    if (request.ids is None) == (request.date is None):
+        raise HTTPException(status_code=400, detail="Provide either ids or date")
+    
+    try:
+        from app.main import app
+        
+        calendar_service = app.state.calendar_service
+        if request.date:
+            results = await calendar_service.cancel_day(request.date)
+        else:
+            results = await calendar_service.cancel_appointments(request.ids)
+        return bulk_response(results)
+        
+    except CircuitOpenError as e:
+        raise calendar_unavailable(e)
+    except Exception as e:
+        logger.error(f"Error cancelling appointments in bulk: {e}")
+        raise HTTPException(status_code=500, detail="Error cancelling appointments")
+
+@router.post("/bulk/update")
+async def bulk_update_appointments(
+    request: BulkUpdateRequest,
+    credentials = Depends(security)
+):
+    """Update many appointments (one batch of reads, one batch of writes)
+
+    Items that change the time go through the slot hold check of the single
+    PATCH: a taken slot fails that item with status 409 in its result.
+    """
+    try:
+        from app.main import app
+        
+        results = await app.state.calendar_service.update_appointments([
+            {
+                "event_id": update.id,
+                "start_time": update.start_time,
+                "end_time": update.end_time,
+                "notes": update.notes,
+                "etag": update.etag
+            }
+            for update in request.updates
+        ])
+        return bulk_response(results)
+        
+    except CircuitOpenError as e:
+        raise calendar_unavailable(e)
+    except Exception as e:
+        logger.error(f"Error updating appointments in bulk: {e}")
+        raise HTTPException(status_code=500, detail="Error updating appointments")
+
+@router.post("/reminders", status_code=202)
+async def start_reminder_campaign(
+    campaign: ReminderCampaignRequest,
+    credentials = Depends(security)
+):
+    """Start (or resume) the reminder campaign for one day's appointments"""
+    from app.main import app
+    
+    if app.state.redis is None:
+        raise HTTPException(status_code=503, detail="Reminder campaigns need Redis")
+    
+    target_date = campaign.date or (datetime.now() + timedelta(days=1)).date()
+    campaign_id = app.state.reminder_service.launch(target_date, campaign.source)
+    return {"campaign_id": campaign_id, "status": "started"}
+
+@router.get("/reminders/{campaign_id}")
+async def get_reminder_campaign(
+    campaign_id: str,
+    credentials = Depends(security)
+):
+    """Progress of a reminder campaign (sent, failed, skipped, cursor, status)"""
+    from app.main import app
+    
+    progress = await app.state.reminder_service.progress(campaign_id)
+    if not progress:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    return {"campaign_id": campaign_id, **progress}
+
 @router.patch("/{appointment_id}")
 async def update_appointment(
     appointment_id: str,
     update: AppointmentUpdate,
+    if_match: Optional[str] = Header(None, description="ETag of the version being updated"),
     credentials = Depends(security)
 ):
     """Update an existing appointment"""
+    # Import tardio: calendar_service carrega o googleapiclient
+    from app.utils.services.calendar_service import AppointmentConflictError
+    
     try:
         from app.main import app
         
@@ -149,11 +365,18 @@ async def update_appointment(
             event_id=appointment_id,
             start_time=update.start_time,
             end_time=update.end_time,
-            notes=update.notes
+            notes=update.notes,
+            etag=if_match
         )
         
         return {"message": "Appointment updated successfully", "appointment": result}
         
+    except AppointmentConflictError:
+        raise HTTPException(status_code=409, detail="Appointment was modified by another request")
+    except SlotUnavailableError as e:
+        raise slot_unavailable(e)
+    except CircuitOpenError as e:
+        raise calendar_unavailable(e)
     except Exception as e:
         logger.error(f"Error updating appointment: {e}")
         raise HTTPException(status_code=500, detail="Error updating appointment")
@@ -174,6 +397,8 @@ async def cancel_appointment(
         else:
             raise HTTPException(status_code=404, detail="Appointment not found")
             
+    except CircuitOpenError as e:
+        raise calendar_unavailable(e)
     except Exception as e:
         logger.error(f"Error cancelling appointment: {e}")
         raise HTTPException(status_code=500, detail="Error cancelling appointment")
\ No newline at end of file
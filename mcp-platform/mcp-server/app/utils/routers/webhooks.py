@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Request, HTTPException, Query
 from fastapi.responses import PlainTextResponse
 import logging
-import json
 from typing import Optional
 from app.config import settings
+from app.utils.metrics import observe_stage
+from app.utils.logging_config import should_log_payload
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -54,15 +55,34 @@ async def process_client_webhook(client_name: str, request: Request):
     try:
         from app.main import app
         
-        body = await request.json()
-        logger.info(f"Recebido webhook para {client_name}: {json.dumps(body, indent=2)}")
-        
-        parsed_message = app.state.whatsapp_service.parse_webhook_message(body)
+        with observe_stage("parse"):
+            # O corpo bruto vai direto para os structs msgspec (sem json.loads)
+            body = await request.body()
+            # O payload completo só é registrado em DEBUG e por amostragem
+            if logger.isEnabledFor(logging.DEBUG) and should_log_payload():
+                logger.debug("Recebido webhook para %s: %s", client_name, body.decode(errors="replace"))
+            
+            parsed_message = app.state.whatsapp_service.parse_webhook_message(body)
         
         if not parsed_message:
             return {"status": "ok"}
         
-        await app.state.whatsapp_service.mark_as_read(parsed_message['message_id'])
+        # Limite por cliente e por remetente: acima dele a mensagem não chega ao
+        # Gemini e o remetente recebe uma resposta fixa (uma vez por janela).
+        # O webhook responde 200 para o WhatsApp não reenviar o evento.
+        decision = await app.state.rate_limiter.check(parsed_message['from'], endpoint="whatsapp_webhook")
+        if not decision.allowed:
+            logger.info(f"Mensagem {parsed_message['message_id']} descartada pelo rate limit ({decision.scope})")
+            if await app.state.rate_limiter.should_notify(parsed_message['from']):
+                with observe_stage("send", intent="rate_limited"):
+                    await app.state.whatsapp_service.send_message(
+                        to=parsed_message['from'],
+                        message=settings.RATE_LIMIT_REPLY
+                    )
+            return {"status": "rate_limited"}
+        
+        with observe_stage("mark_as_read"):
+            await app.state.whatsapp_service.mark_as_read(parsed_message['message_id'])
         
         if parsed_message['type'] == 'text':
             ai_response = await app.state.gemini_service.process_message(
@@ -73,10 +93,11 @@ async def process_client_webhook(client_name: str, request: Request):
                     "calendar_service": app.state.calendar_service
                 }
             )
-            await app.state.whatsapp_service.send_message(
-                to=parsed_message['from'],
-                message=ai_response
-            )
+            with observe_stage("send"):
+                await app.state.whatsapp_service.send_message(
+                    to=parsed_message['from'],
+                    message=ai_response
+                )
         elif parsed_message['type'] == 'interactive':
             button_id = parsed_message.get('button_id')
             if button_id == 'confirm_appointment':
@@ -85,10 +106,11 @@ async def process_client_webhook(client_name: str, request: Request):
                 response = "Seu agendamento foi cancelado. Caso queira remarcar, é só me avisar."
             else:
                 response = "Opção recebida. Como posso ajudar?"
-            await app.state.whatsapp_service.send_message(
-                to=parsed_message['from'],
-                message=response
-            )
+            with observe_stage("send", intent="interactive"):
+                await app.state.whatsapp_service.send_message(
+                    to=parsed_message['from'],
+                    message=response
+                )
         
         return {"status": "ok"}
         
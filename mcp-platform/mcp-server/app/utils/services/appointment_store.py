@@ -0,0 +1,119 @@
+import base64
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidCursorError(ValueError):
+    """The cursor is malformed or belongs to another listing source"""
+
+
+def encode_cursor(source: str, position: Dict[str, Any]) -> str:
+    """Opaque, URL-safe cursor for the next page of a listing"""
+    payload = json.dumps({"source": source, **position}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(source: str, cursor: str) -> Dict[str, Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError("Malformed cursor") from e
+    if not isinstance(position, dict) or position.pop("source", None) != source:
+        raise InvalidCursorError(f"Cursor is not from a {source} listing")
+    return position
+
+
+class AppointmentStore:
+    """Reads the `appointments` table of this tenant.
+
+    Listings use keyset pagination on (start_time, id), served by the
+    (client_name, start_time, id) index: each page is one indexed range scan
+    of `page_size` rows, however deep the page, and nothing else is kept in
+    memory.
+    """
+
+    def __init__(self, pool: Any, tenant: str = settings.CLIENT_NAME):
+        self.pool = pool
+        self.tenant = tenant
+
+    async def list_page(
+        self,
+        start: datetime,
+        end: Optional[datetime] = None,
+        status: Optional[str] = None,
+        service_type: Optional[str] = None,
+        phone: Optional[str] = None,
+        page_size: int = 50,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """One page of appointments starting in [start, end), by start time; returns (items, next cursor)"""
+        if self.pool is None:
+            raise RuntimeError("Database pool not available")
+
+        conditions = ["client_name = $1", "start_time >= $2"]
+        args: List[Any] = [self.tenant, start]
+
+        def add(condition: str, value: Any):
+            args.append(value)
+            conditions.append(condition.format(f"${len(args)}"))
+
+        if end is not None:
+            add("start_time < {}", end)
+        if status is not None:
+            add("status = {}", status)
+        if service_type is not None:
+            add("service_type = {}", service_type)
+        if phone is not None:
+            add("customer_phone = {}", phone)
+        if cursor is not None:
+            position = decode_cursor("database", cursor)
+            try:
+                after = (datetime.fromisoformat(position["start_time"]), int(position["id"]))
+            except (KeyError, TypeError, ValueError) as e:
+                raise InvalidCursorError("Malformed cursor") from e
+            args.extend(after)
+            conditions.append(f"(start_time, id) > (${len(args) - 1}, ${len(args)})")
+
+        # One extra row tells whether there is a next page
+        args.append(page_size + 1)
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(
+                f"""
+                SELECT id, appointment_id, customer_name, customer_phone, service_type,
+                       start_time, end_time, status, notes, created_at, updated_at
+                FROM appointments
+                WHERE {' AND '.join(conditions)}
+                ORDER BY start_time, id
+                LIMIT ${len(args)}
+                """,
+                *args
+            )
+
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            last = rows[-1]
+            next_cursor = encode_cursor("database", {"start_time": last["start_time"].isoformat(), "id": last["id"]})
+
+        return [
+            {
+                "id": row["appointment_id"],
+                "customer_name": row["customer_name"],
+                "customer_phone": row["customer_phone"],
+                "service_type": row["service_type"] or "",
+                "notes": row["notes"],
+                "start_time": row["start_time"],
+                "end_time": row["end_time"],
+                "status": row["status"],
+                "created_at": row["created_at"],
+                "updated_at": row["updated_at"],
+            }
+            for row in rows
+        ], next_cursor
@@ -1,26 +1,74 @@
 import asyncio
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+import socket
+from contextlib import aclosing
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time, timedelta
+from typing import Any, AsyncIterator, List, Dict, Optional, Tuple
+import google_auth_httplib2
+import httplib2
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 import pytz
 import logging
 from app.config import settings
+from app.utils.services.resilience import get_dependency
+from app.utils.services.slot_holds import SlotHolds, SlotUnavailableError, event_interval, phone_key
 
 logger = logging.getLogger(__name__)
 
+# Calendar API limit of calls per HTTP batch request
+BATCH_LIMIT = 50
+
+# Partial responses: only the event fields this service reads
+EVENT_FIELDS = 'id,etag,status,summary,description,start,end,htmlLink'
+EVENT_LIST_FIELDS = f'nextPageToken,items({EVENT_FIELDS})'
+SLOT_LIST_FIELDS = 'nextPageToken,items(id,start,end)'
+APPOINTMENT_LIST_FIELDS = 'nextPageToken,items(id,status,summary,description,start,end,created,updated)'
+# Calendar event status -> AppointmentStatus
+EVENT_STATUSES = {'confirmed': 'confirmed', 'tentative': 'scheduled', 'cancelled': 'cancelled'}
+WRITE_FIELDS = 'id,etag,htmlLink,start,end'
+
+# Read-modify-patch attempts when the event changes between the read and the patch
+MAX_PATCH_ATTEMPTS = 3
+
+
+class AppointmentConflictError(Exception):
+    """The event changed since the ETag the caller based its update on"""
+
+    def __init__(self, event_id: str):
+        super().__init__(f"Appointment {event_id} was modified concurrently")
+        self.event_id = event_id
+
+
+def _is_transient(exc: BaseException) -> bool:
+    """Rate limits, server errors and network failures; 4xx answers are not retried"""
+    if isinstance(exc, HttpError):
+        return exc.resp.status == 429 or exc.resp.status >= 500
+    return isinstance(exc, (socket.timeout, ConnectionError, httplib2.HttpLib2Error))
+
+
 class CalendarService:
-    def __init__(self):
+    def __init__(self, holds: Optional[SlotHolds] = None):
         self.calendar_id = settings.GOOGLE_CALENDAR_ID
+        # Redis slot holds: offered/confirmed slots are reserved, bookings cached as busy
+        self.holds = holds
         self.timezone = pytz.timezone('America/Sao_Paulo')
+        self.dependency = get_dependency('calendar', _is_transient)
+        # googleapiclient is blocking and httplib2 is not thread-safe: calls run
+        # in a bounded pool, each thread with its own authorized connection
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.CALENDAR_MAX_THREADS, thread_name_prefix='calendar'
+        )
+        self._local = threading.local()
         self.service = self._initialize_service()
         
     def _initialize_service(self):
         """Initialize Google Calendar API service"""
         try:
             # Use service account credentials from environment
-            credentials = service_account.Credentials.from_service_account_info(
+            self.credentials = service_account.Credentials.from_service_account_info(
                 {
                     "type": "service_account",
                     "project_id": settings.GOOGLE_PROJECT_ID,
@@ -31,7 +79,14 @@ class CalendarService:
                 scopes=['https://www.googleapis.com/auth/calendar']
             )
             
-            service = build('calendar', 'v3', credentials=credentials)
+            # Use the discovery document bundled with google-api-python-client
+            # instead of fetching it from the network on every cold start
+            service = build(
+                'calendar', 'v3',
+                credentials=self.credentials,
+                static_discovery=True,
+                cache_discovery=False
+            )
             logger.info("Google Calendar service initialized successfully")
             return service
             
@@ -39,61 +94,270 @@ class CalendarService:
             logger.error(f"Failed to initialize Calendar service: {e}")
             raise
     
+    def _http(self) -> google_auth_httplib2.AuthorizedHttp:
+        http = getattr(self._local, 'http', None)
+        if http is None:
+            # Socket timeout matches the call timeout so abandoned threads are freed
+            http = google_auth_httplib2.AuthorizedHttp(
+                self.credentials, http=httplib2.Http(timeout=self.dependency.timeout)
+            )
+            self._local.http = http
+        return http
+    
+    async def _execute(self, request, operation: str, idempotent: bool = True, hedge: bool = False):
+        """Execute a Calendar API request off the event loop, under the calendar policies
+
+        `hedge` marks reads on the reply path: with HEDGE_ENABLED a slow request
+        is duplicated on another thread/connection and the first answer wins.
+        The losing thread cannot be interrupted; it finishes in the background
+        within the socket timeout and its result is dropped.
+        """
+        loop = asyncio.get_running_loop()
+        return await self.dependency.call(
+            operation,
+            lambda: loop.run_in_executor(self._executor, lambda: request.execute(http=self._http())),
+            idempotent=idempotent,
+            hedge=hedge
+        )
+    
+    async def _execute_batch(
+        self, requests: List[Any], operation: str, idempotent: bool = True
+    ) -> List[Tuple[Optional[Dict], Optional[Exception]]]:
+        """Send requests through the batch endpoint, BATCH_LIMIT per round trip
+
+        Returns (response, exception) per request, in order. Each batch is one
+        call for the calendar policies; per-item errors do not trip the breaker.
+        A batch that fails as a whole reports its exception on every item.
+        """
+        loop = asyncio.get_running_loop()
+        results: List[Tuple[Optional[Dict], Optional[Exception]]] = [(None, None)] * len(requests)
+        for offset in range(0, len(requests), BATCH_LIMIT):
+            def callback(request_id, response, exception, offset=offset):
+                results[offset + int(request_id)] = (response, exception)
+            
+            batch = self.service.new_batch_http_request(callback=callback)
+            for index, request in enumerate(requests[offset:offset + BATCH_LIMIT]):
+                batch.add(request, request_id=str(index))
+            try:
+                await self.dependency.call(
+                    f'batch.{operation}',
+                    lambda: loop.run_in_executor(self._executor, lambda: batch.execute(http=self._http())),
+                    idempotent=idempotent
+                )
+            except Exception as e:
+                # The whole batch failed (timeout, open circuit): report it on each of its items
+                logger.error(f"Calendar batch {operation} failed: {e}")
+                for index in range(offset, min(offset + BATCH_LIMIT, len(requests))):
+                    results[index] = (None, e)
+        return results
+    
+    @staticmethod
+    def _item_error(exception: Exception) -> Dict[str, Any]:
+        if isinstance(exception, HttpError):
+            return {'status': exception.status_code, 'message': exception.reason}
+        if isinstance(exception, SlotUnavailableError):
+            return {'status': 409, 'message': f'Time slot is no longer available ({exception.reason})'}
+        return {'status': None, 'message': str(exception)}
+    
+    async def _reserve_items(self, intervals: Dict[int, Tuple[datetime, datetime, str]]) -> Dict[int, SlotUnavailableError]:
+        """Hold each (start, end, owner) for SLOT_CONFIRM_HOLD_SECONDS; returns the conflicts by index"""
+        conflicts = {}
+        for index, (start_time, end_time, owner) in intervals.items():
+            try:
+                await self.holds.reserve(start_time, end_time, owner, settings.SLOT_CONFIRM_HOLD_SECONDS)
+            except SlotUnavailableError as e:
+                conflicts[index] = e
+        return conflicts
+    
+    async def _release_items(self, intervals: Dict[int, Tuple[datetime, datetime, str]], conflicts: Dict[int, Any]):
+        for index, (start_time, end_time, owner) in intervals.items():
+            if index not in conflicts:
+                await self.holds.release(start_time, end_time, owner)
+    
+    @staticmethod
+    def _event_body(
+        start_time: datetime,
+        end_time: datetime,
+        customer_name: str,
+        customer_phone: str,
+        service_type: str,
+        notes: Optional[str] = None
+    ) -> Dict:
+        return {
+            'summary': f'{service_type} - {customer_name}',
+            'description': f'Cliente: {customer_name}\nTelefone: {customer_phone}\n{notes or ""}',
+            'start': {
+                'dateTime': start_time.isoformat(),
+                'timeZone': 'America/Sao_Paulo',
+            },
+            'end': {
+                'dateTime': end_time.isoformat(),
+                'timeZone': 'America/Sao_Paulo',
+            },
+            'reminders': {
+                'useDefault': False,
+                'overrides': [
+                    {'method': 'popup', 'minutes': 30},
+                ],
+            },
+        }
+    
+    @staticmethod
+    def _patch_body(
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        description: Optional[str] = None
+    ) -> Dict:
+        body = {}
+        if start_time:
+            body['start'] = {'dateTime': start_time.isoformat(), 'timeZone': 'America/Sao_Paulo'}
+        if end_time:
+            body['end'] = {'dateTime': end_time.isoformat(), 'timeZone': 'America/Sao_Paulo'}
+        if description is not None:
+            body['description'] = description
+        return body
+    
+    @staticmethod
+    def _append_notes(current: Dict, notes: str) -> str:
+        return current.get('description', '') + f'\n\nAtualização: {notes}'
+    
+    def _patch_request(self, event_id: str, body: Dict, if_match: Optional[str] = None):
+        request = self.service.events().patch(
+            calendarId=self.calendar_id,
+            eventId=event_id,
+            body=body,
+            fields=WRITE_FIELDS
+        )
+        if if_match:
+            request.headers['If-Match'] = if_match
+        return request
+    
+    async def iter_event_pages(
+        self,
+        fields: str = EVENT_LIST_FIELDS,
+        page_size: Optional[int] = None,
+        hedge: bool = False,
+        **params
+    ) -> AsyncIterator[List[Dict]]:
+        """Pages of events().list (single events, by start time), following nextPageToken
+
+        The next page is requested while the caller processes the current one.
+        Use it with contextlib.aclosing: leaving the loop early cancels the
+        prefetch and no further pages are downloaded.
+        """
+        def fetch(page_token: Optional[str]) -> asyncio.Future:
+            return asyncio.ensure_future(self._execute(self.service.events().list(
+                calendarId=self.calendar_id,
+                singleEvents=True,
+                orderBy='startTime',
+                maxResults=page_size or settings.CALENDAR_PAGE_SIZE,
+                pageToken=page_token,
+                fields=fields,
+                **params
+            ), 'events.list', hedge=hedge))
+        
+        next_page = fetch(None)
+        try:
+            while next_page is not None:
+                result = await next_page
+                page_token = result.get('nextPageToken')
+                next_page = fetch(page_token) if page_token else None
+                yield result.get('items', [])
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+    
+    async def iter_events(self, **kwargs) -> AsyncIterator[Dict]:
+        """Events one by one across pages; same arguments as iter_event_pages"""
+        async with aclosing(self.iter_event_pages(**kwargs)) as pages:
+            async for page in pages:
+                for event in page:
+                    yield event
+    
+    async def _iter_free_slots(
+        self, start_time: datetime, end_time: datetime, duration_minutes: int
+    ) -> AsyncIterator[Tuple[datetime, datetime]]:
+        """Free (start, end) intervals of the day, computed while the events stream in"""
+        duration = timedelta(minutes=duration_minutes)
+        current_time = start_time
+        busy = []
+        
+        # Convert to RFC3339 format
+        events = self.iter_events(
+            timeMin=start_time.isoformat() + 'Z',
+            timeMax=end_time.isoformat() + 'Z',
+            fields=SLOT_LIST_FIELDS,
+            hedge=True
+        )
+        try:
+            async with aclosing(events):
+                async for event in events:
+                    interval = event_interval(event)
+                    if interval:
+                        busy.append((event['id'], *interval))
+                    
+                    event_start = datetime.fromisoformat(
+                        event['start'].get('dateTime', event['start'].get('date'))
+                    ).replace(tzinfo=None)
+                    
+                    # Check if there's a gap before this event
+                    if current_time + duration <= event_start:
+                        yield current_time, current_time + duration
+                    
+                    # Move current time to end of this event
+                    event_end = datetime.fromisoformat(
+                        event['end'].get('dateTime', event['end'].get('date'))
+                    ).replace(tzinfo=None)
+                    current_time = max(current_time, event_end)
+        finally:
+            # Cache the bookings read so far for create_appointment's conflict
+            # check, also when the caller stops early (the chat's limit=5)
+            if self.holds and busy:
+                await self.holds.mark_busy(busy)
+        
+        # Check if there's time at the end of the day
+        while current_time + duration <= end_time:
+            yield current_time, current_time + duration
+            current_time += duration
+    
     async def get_available_slots(
         self, 
         date: datetime, 
-        duration_minutes: int = 30
+        duration_minutes: int = 30,
+        limit: Optional[int] = None,
+        owner: Optional[str] = None
     ) -> List[Dict[str, str]]:
-        """Get available time slots for a specific date"""
+        """Get available time slots for a specific date
+
+        With `limit`, stops reading the calendar once that many slots are found.
+        With slot holds, slots held by someone else are skipped, and with an
+        `owner` (the customer phone) the returned slots are held for them for
+        SLOT_OFFER_HOLD_SECONDS.
+        """
+        owner = phone_key(owner) if owner else None
         try:
             # Set time range for the day
             start_time = date.replace(hour=8, minute=0, second=0, microsecond=0)
             end_time = date.replace(hour=18, minute=0, second=0, microsecond=0)
             
-            # Convert to RFC3339 format
-            time_min = start_time.isoformat() + 'Z'
-            time_max = end_time.isoformat() + 'Z'
-            
-            # Get events for the day
-            events_result = self.service.events().list(
-                calendarId=self.calendar_id,
-                timeMin=time_min,
-                timeMax=time_max,
-                singleEvents=True,
-                orderBy='startTime'
-            ).execute()
-            
-            events = events_result.get('items', [])
-            
-            # Calculate available slots
             available_slots = []
-            current_time = start_time
-            
-            for event in events:
-                event_start = datetime.fromisoformat(
-                    event['start'].get('dateTime', event['start'].get('date'))
-                ).replace(tzinfo=None)
-                
-                # Check if there's a gap before this event
-                if current_time + timedelta(minutes=duration_minutes) <= event_start:
+            slots = self._iter_free_slots(start_time, end_time, duration_minutes)
+            async with aclosing(slots):
+                async for slot_start, slot_end in slots:
+                    if self.holds:
+                        if owner:
+                            free = await self.holds.try_hold(slot_start, slot_end, owner, settings.SLOT_OFFER_HOLD_SECONDS)
+                        else:
+                            free = await self.holds.is_free(slot_start, slot_end)
+                        if not free:
+                            continue
+                    
                     available_slots.append({
-                        'start': current_time.strftime('%H:%M'),
-                        'end': (current_time + timedelta(minutes=duration_minutes)).strftime('%H:%M')
+                        'start': slot_start.strftime('%H:%M'),
+                        'end': slot_end.strftime('%H:%M')
                     })
-                
-                # Move current time to end of this event
-                event_end = datetime.fromisoformat(
-                    event['end'].get('dateTime', event['end'].get('date'))
-                ).replace(tzinfo=None)
-                current_time = max(current_time, event_end)
-            
-            # Check if there's time at the end of the day
-            while current_time + timedelta(minutes=duration_minutes) <= end_time:
-                available_slots.append({
-                    'start': current_time.strftime('%H:%M'),
-                    'end': (current_time + timedelta(minutes=duration_minutes)).strftime('%H:%M')
-                })
-                current_time += timedelta(minutes=duration_minutes)
+                    if limit and len(available_slots) >= limit:
+                        break
             
             return available_slots
             
@@ -108,35 +372,29 @@ class CalendarService:
         customer_name: str,
         customer_phone: str,
         service_type: str,
-        notes: Optional[str] = None
+        notes: Optional[str] = None,
+        owner: Optional[str] = None
     ) -> Dict[str, str]:
-        """Create a new appointment"""
+        """Create a new appointment
+
+        With slot holds, the interval is first reserved for `owner` (default:
+        the customer phone, which keeps a slot offered to that conversation;
+        both are compared as phone_key); SlotUnavailableError is raised if
+        someone else holds it or a known booking overlaps it.
+        """
+        owner = phone_key(owner or customer_phone)
+        if self.holds:
+            await self.holds.reserve(start_time, end_time, owner, settings.SLOT_CONFIRM_HOLD_SECONDS)
         try:
-            event = {
-                'summary': f'{service_type} - {customer_name}',
-                'description': f'Cliente: {customer_name}\nTelefone: {customer_phone}\n{notes or ""}',
-                'start': {
-                    'dateTime': start_time.isoformat(),
-                    'timeZone': 'America/Sao_Paulo',
-                },
-                'end': {
-                    'dateTime': end_time.isoformat(),
-                    'timeZone': 'America/Sao_Paulo',
-                },
-                'reminders': {
-                    'useDefault': False,
-                    'overrides': [
-                        {'method': 'popup', 'minutes': 30},
-                    ],
-                },
-            }
-            
-            event = self.service.events().insert(
+            event = await self._execute(self.service.events().insert(
                 calendarId=self.calendar_id,
-                body=event
-            ).execute()
+                body=self._event_body(start_time, end_time, customer_name, customer_phone, service_type, notes),
+                fields=WRITE_FIELDS
+            ), 'events.insert', idempotent=False)
             
             logger.info(f"Appointment created: {event.get('id')}")
+            if self.holds:
+                await self.holds.mark_busy([(event['id'], start_time, end_time)])
             
             return {
                 'id': event.get('id'),
@@ -148,16 +406,21 @@ class CalendarService:
         except HttpError as e:
             logger.error(f"Error creating appointment: {e}")
             raise
+        finally:
+            if self.holds:
+                await self.holds.release(start_time, end_time, owner)
     
     async def cancel_appointment(self, event_id: str) -> bool:
         """Cancel an existing appointment"""
         try:
-            self.service.events().delete(
+            await self._execute(self.service.events().delete(
                 calendarId=self.calendar_id,
                 eventId=event_id
-            ).execute()
+            ), 'events.delete')
             
             logger.info(f"Appointment cancelled: {event_id}")
+            if self.holds:
+                await self.holds.forget_event(event_id)
             return True
             
         except HttpError as e:
@@ -169,42 +432,69 @@ class CalendarService:
         event_id: str,
         start_time: Optional[datetime] = None,
         end_time: Optional[datetime] = None,
-        notes: Optional[str] = None
+        notes: Optional[str] = None,
+        etag: Optional[str] = None
     ) -> Dict[str, str]:
-        """Update an existing appointment"""
+        """Update an existing appointment with a partial PATCH
+
+        Time changes are patched directly, in one round trip. Notes are
+        appended to the description, so it is read first (with its ETag) and
+        patched with If-Match; if the event changed in between, it is read
+        again. A caller-supplied `etag` is sent as If-Match and a mismatch
+        raises AppointmentConflictError.
+
+        With slot holds, a new time is reserved first (owner: the event id,
+        so it does not conflict with its own cached slot) and
+        SlotUnavailableError is raised if it is taken.
+        """
+        moving = self.holds is not None and start_time is not None and end_time is not None
+        if moving:
+            await self.holds.reserve(start_time, end_time, event_id, settings.SLOT_CONFIRM_HOLD_SECONDS)
         try:
-            # Get current event
-            event = self.service.events().get(
-                calendarId=self.calendar_id,
-                eventId=event_id
-            ).execute()
-            
-            # Update fields if provided
-            if start_time:
-                event['start']['dateTime'] = start_time.isoformat()
-            if end_time:
-                event['end']['dateTime'] = end_time.isoformat()
-            if notes:
-                event['description'] = event.get('description', '') + f'\n\nAtualização: {notes}'
-            
-            # Update event
-            updated_event = self.service.events().update(
-                calendarId=self.calendar_id,
-                eventId=event_id,
-                body=event
-            ).execute()
+            for attempt in range(1, MAX_PATCH_ATTEMPTS + 1):
+                description = None
+                if_match = etag
+                if notes:
+                    current = await self._execute(self.service.events().get(
+                        calendarId=self.calendar_id,
+                        eventId=event_id,
+                        fields='etag,description'
+                    ), 'events.get', hedge=True)
+                    if_match = etag or current['etag']
+                    description = self._append_notes(current, notes)
+                
+                try:
+                    # Appending notes is not idempotent: a resent patch would add them twice
+                    updated_event = await self._execute(
+                        self._patch_request(event_id, self._patch_body(start_time, end_time, description), if_match),
+                        'events.patch',
+                        idempotent=not notes
+                    )
+                    break
+                except HttpError as e:
+                    if e.status_code != 412:
+                        raise
+                    if etag or attempt == MAX_PATCH_ATTEMPTS:
+                        raise AppointmentConflictError(event_id) from e
             
             logger.info(f"Appointment updated: {event_id}")
+            if moving:
+                await self.holds.forget_event(event_id)
+                await self.holds.mark_busy([(event_id, start_time, end_time)])
             
             return {
                 'id': updated_event.get('id'),
                 'htmlLink': updated_event.get('htmlLink'),
+                'etag': updated_event.get('etag'),
                 'updated': True
             }
             
         except HttpError as e:
             logger.error(f"Error updating appointment: {e}")
             raise
+        finally:
+            if moving:
+                await self.holds.release(start_time, end_time, event_id)
     
     async def get_appointment_by_phone(self, phone_number: str) -> List[Dict]:
         """Get appointments by customer phone number"""
@@ -212,25 +502,21 @@ class CalendarService:
             now = datetime.now(self.timezone)
             time_min = now.isoformat()
             
-            events_result = self.service.events().list(
-                calendarId=self.calendar_id,
+            appointments = []
+            events = self.iter_events(
                 timeMin=time_min,
                 q=phone_number,  # Search in event description
-                singleEvents=True,
-                orderBy='startTime'
-            ).execute()
-            
-            events = events_result.get('items', [])
-            
-            appointments = []
-            for event in events:
-                if phone_number in event.get('description', ''):
-                    appointments.append({
-                        'id': event['id'],
-                        'summary': event['summary'],
-                        'start': event['start'].get('dateTime', event['start'].get('date')),
-                        'end': event['end'].get('dateTime', event['end'].get('date'))
-                    })
+                hedge=True
+            )
+            async with aclosing(events):
+                async for event in events:
+                    if phone_number in event.get('description', ''):
+                        appointments.append({
+                            'id': event['id'],
+                            'summary': event['summary'],
+                            'start': event['start'].get('dateTime', event['start'].get('date')),
+                            'end': event['end'].get('dateTime', event['end'].get('date'))
+                        })
             
             return appointments
             
@@ -238,11 +524,260 @@ class CalendarService:
             logger.error(f"Error searching appointments: {e}")
             return []
     
+    def _event_time(self, value: Dict) -> str:
+        """dateTime of an event start/end; all-day events start at midnight in the calendar timezone"""
+        if 'dateTime' in value:
+            return value['dateTime']
+        return self.timezone.localize(datetime.combine(date.fromisoformat(value['date']), time.min)).isoformat()
+    
+    def _event_appointment(self, event: Dict) -> Dict[str, Any]:
+        """Appointment fields of an event written by _event_body"""
+        summary = event.get('summary', '')
+        service_type, _, customer_name = summary.partition(' - ')
+        lines = event.get('description', '').split('\n')
+        fields = {'Cliente': customer_name, 'Telefone': ''}
+        for line in lines[:2]:
+            key, _, value = line.partition(': ')
+            if key in fields:
+                fields[key] = value.strip()
+        return {
+            'id': event['id'],
+            'customer_name': fields['Cliente'],
+            'customer_phone': fields['Telefone'],
+            'service_type': service_type,
+            'notes': '\n'.join(lines[2:]).strip() or None,
+            'start_time': self._event_time(event['start']),
+            'end_time': self._event_time(event['end']),
+            'status': EVENT_STATUSES.get(event.get('status'), 'confirmed'),
+            'created_at': event.get('created') or event.get('updated'),
+            'updated_at': event.get('updated')
+        }
+    
+    async def list_appointments_page(
+        self,
+        time_min: datetime,
+        time_max: Optional[datetime] = None,
+        status: Optional[str] = None,
+        service_type: Optional[str] = None,
+        phone: Optional[str] = None,
+        page_size: int = 50,
+        page_token: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """One events().list page of appointments, by start time; returns (items, nextPageToken)
+
+        Service and phone narrow the page server-side (`q`) and are then
+        matched exactly, as is the status, so a page can hold fewer than
+        `page_size` items (even none) while a next page token is returned.
+        """
+        # Naive datetimes are local business time
+        time_min, time_max = (
+            self.timezone.localize(value) if value is not None and value.tzinfo is None else value
+            for value in (time_min, time_max)
+        )
+        params = {}
+        if time_max is not None:
+            params['timeMax'] = time_max.isoformat()
+        if service_type or phone:
+            params['q'] = ' '.join(term for term in (service_type, phone) if term)
+        if status == 'cancelled':
+            params['showDeleted'] = True
+        
+        result = await self._execute(self.service.events().list(
+            calendarId=self.calendar_id,
+            timeMin=time_min.isoformat(),
+            singleEvents=True,
+            orderBy='startTime',
+            maxResults=page_size,
+            pageToken=page_token,
+            fields=APPOINTMENT_LIST_FIELDS,
+            **params
+        ), 'events.list', hedge=True)
+        
+        appointments = []
+        for event in result.get('items', []):
+            # Deleted occurrences of recurring events come without start/end
+            if 'start' not in event:
+                continue
+            appointment = self._event_appointment(event)
+            if status and appointment['status'] != status:
+                continue
+            if service_type and appointment['service_type'].lower() != service_type.lower():
+                continue
+            if phone and phone not in event.get('description', ''):
+                continue
+            appointments.append(appointment)
+        return appointments, result.get('nextPageToken')
+    
+    async def create_appointments(self, appointments: List[Dict]) -> List[Dict]:
+        """Create many appointments in batch requests; one result per item, in order
+
+        Each item has the create_appointment arguments. With slot holds every
+        item is reserved first, as in create_appointment; items whose slot is
+        held by someone else or already booked fail with status 409 and are
+        not sent.
+        """
+        results: List[Optional[Dict]] = [None] * len(appointments)
+        intervals = {
+            index: (item['start_time'], item['end_time'], phone_key(item.get('owner') or item['customer_phone']))
+            for index, item in enumerate(appointments)
+        } if self.holds else {}
+        conflicts = await self._reserve_items(intervals)
+        for index, conflict in conflicts.items():
+            results[index] = {'success': False, 'error': self._item_error(conflict)}
+        
+        try:
+            pending = [index for index in range(len(appointments)) if index not in conflicts]
+            requests = [
+                self.service.events().insert(
+                    calendarId=self.calendar_id,
+                    body=self._event_body(**{key: value for key, value in appointments[index].items() if key != 'owner'}),
+                    fields=WRITE_FIELDS
+                )
+                for index in pending
+            ]
+            created = []
+            responses = await self._execute_batch(requests, 'events.insert', idempotent=False)
+            for index, (event, exception) in zip(pending, responses):
+                item = appointments[index]
+                if exception is not None:
+                    results[index] = {'success': False, 'error': self._item_error(exception)}
+                else:
+                    results[index] = {
+                        'success': True,
+                        'id': event.get('id'),
+                        'htmlLink': event.get('htmlLink'),
+                        'start': item['start_time'].strftime('%d/%m/%Y %H:%M'),
+                        'end': item['end_time'].strftime('%d/%m/%Y %H:%M')
+                    }
+                    created.append((event['id'], item['start_time'], item['end_time']))
+            if self.holds and created:
+                await self.holds.mark_busy(created)
+        finally:
+            if self.holds:
+                await self._release_items(intervals, conflicts)
+        logger.info(f"Bulk create: {sum(r['success'] for r in results)}/{len(results)} appointments created")
+        return results
+    
+    async def cancel_appointments(self, event_ids: List[str]) -> List[Dict]:
+        """Cancel many appointments in batch requests; one result per id, in order"""
+        requests = [
+            self.service.events().delete(calendarId=self.calendar_id, eventId=event_id)
+            for event_id in event_ids
+        ]
+        results = []
+        for event_id, (_, exception) in zip(event_ids, await self._execute_batch(requests, 'events.delete')):
+            # 410 Gone: already cancelled (e.g. a retried batch)
+            if exception is None or (isinstance(exception, HttpError) and exception.status_code == 410):
+                results.append({'id': event_id, 'success': True})
+                if self.holds:
+                    await self.holds.forget_event(event_id)
+            else:
+                results.append({'id': event_id, 'success': False, 'error': self._item_error(exception)})
+        logger.info(f"Bulk cancel: {sum(r['success'] for r in results)}/{len(results)} appointments cancelled")
+        return results
+    
+    async def cancel_day(self, day: date) -> List[Dict]:
+        """Cancel every appointment of a day (calendar timezone)"""
+        start = self.timezone.localize(datetime.combine(day, time.min))
+        events = await self.list_events(start, start + timedelta(days=1))
+        return await self.cancel_appointments([event['id'] for event in events])
+    
+    async def update_appointments(self, updates: List[Dict]) -> List[Dict]:
+        """Update many appointments with batched PATCHes
+
+        Each item has the update_appointment arguments (event_id, start_time,
+        end_time, notes, etag). Items with notes need the current description:
+        those are read in one batch first and patched with If-Match. A
+        concurrent change is reported as a 412 on that item, not retried.
+        One result per item, in order.
+
+        With slot holds, items that move the appointment reserve the new time
+        first (owner: the event id, as in update_appointment); a conflict
+        fails that item with status 409. Moved events have their cached busy
+        cells replaced by the new time.
+        """
+        results: List[Optional[Dict]] = [None] * len(updates)
+        intervals = {
+            index: (item['start_time'], item['end_time'], item['event_id'])
+            for index, item in enumerate(updates)
+            if item.get('start_time') is not None and item.get('end_time') is not None
+        } if self.holds else {}
+        conflicts = await self._reserve_items(intervals)
+        for index, conflict in conflicts.items():
+            results[index] = {'id': updates[index]['event_id'], 'success': False, 'error': self._item_error(conflict)}
+        try:
+            await self._update_items(updates, results, intervals)
+        finally:
+            if self.holds:
+                await self._release_items(intervals, conflicts)
+        logger.info(f"Bulk update: {sum(r['success'] for r in results)}/{len(results)} appointments updated")
+        return results
+    
+    async def _update_items(
+        self, updates: List[Dict], results: List[Optional[Dict]], intervals: Dict[int, Tuple[datetime, datetime, str]]
+    ):
+        """Batched reads and PATCHes of update_appointments for the items without a result yet"""
+        with_notes = [index for index, item in enumerate(updates) if item.get('notes') and results[index] is None]
+        gets = [
+            self.service.events().get(
+                calendarId=self.calendar_id, eventId=updates[index]['event_id'], fields='etag,description'
+            )
+            for index in with_notes
+        ]
+        current: Dict[int, Dict] = {}
+        for index, (event, exception) in zip(with_notes, await self._execute_batch(gets, 'events.get')):
+            if exception is not None:
+                results[index] = {'id': updates[index]['event_id'], 'success': False, 'error': self._item_error(exception)}
+            else:
+                current[index] = event
+        
+        pending = []
+        for index, item in enumerate(updates):
+            if results[index] is not None:
+                continue
+            description, if_match = None, item.get('etag')
+            if index in current:
+                description = self._append_notes(current[index], item['notes'])
+                if_match = if_match or current[index]['etag']
+            body = self._patch_body(item.get('start_time'), item.get('end_time'), description)
+            pending.append((index, self._patch_request(item['event_id'], body, if_match)))
+        
+        responses = await self._execute_batch([request for _, request in pending], 'events.patch', idempotent=not with_notes)
+        moved = []
+        for (index, _), (event, exception) in zip(pending, responses):
+            event_id = updates[index]['event_id']
+            if exception is not None:
+                results[index] = {'id': event_id, 'success': False, 'error': self._item_error(exception)}
+            else:
+                results[index] = {'id': event_id, 'success': True, 'etag': event.get('etag'), 'htmlLink': event.get('htmlLink')}
+                if index in intervals:
+                    moved.append((event_id, *intervals[index][:2]))
+        if self.holds:
+            for event_id, _, _ in moved:
+                await self.holds.forget_event(event_id)
+            if moved:
+                await self.holds.mark_busy(moved)
+    
+    async def list_events(self, time_min: datetime, time_max: datetime) -> List[Dict]:
+        """Every event in [time_min, time_max), following nextPageToken"""
+        events = []
+        pages = self.iter_event_pages(
+            timeMin=time_min.isoformat(), timeMax=time_max.isoformat(), page_size=2500
+        )
+        async with aclosing(pages):
+            async for page in pages:
+                events.extend(page)
+        return events
+    
     async def health_check(self) -> str:
         """Check Calendar service health"""
         try:
-            # Try to list calendars
-            self.service.calendarList().list().execute()
+            # Try to list calendars (off the event loop, execute() is blocking).
+            # Bypasses the circuit breaker so the probe sees recovery on its own
+            request = self.service.calendarList().list(maxResults=1, fields='kind')
+            await asyncio.get_running_loop().run_in_executor(
+                self._executor, lambda: request.execute(http=self._http())
+            )
             return "healthy"
-        except:
+        except Exception:
             return "unhealthy"
\ No newline at end of file
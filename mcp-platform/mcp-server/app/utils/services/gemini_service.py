@@ -1,16 +1,32 @@
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
 from typing import Dict, List, Optional
+import asyncio
 import json
 import logging
 from datetime import datetime
 from app.config import settings
+from app.utils.metrics import observe_stage, set_intent
+from app.utils.services.resilience import CircuitOpenError, get_dependency
 
 logger = logging.getLogger(__name__)
 
+# Quota, overload and server-side failures; invalid prompts are not retried
+TRANSIENT_ERRORS = (
+    google_exceptions.TooManyRequests,
+    google_exceptions.InternalServerError,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.GatewayTimeout,
+    google_exceptions.DeadlineExceeded,
+    ConnectionError,
+)
+
 class GeminiService:
     def __init__(self):
         genai.configure(api_key=settings.GEMINI_API_KEY)
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
+        self.model_name = 'gemini-1.5-flash'
+        self.model = genai.GenerativeModel(self.model_name)
+        self.dependency = get_dependency('gemini', lambda e: isinstance(e, TRANSIENT_ERRORS))
         self.max_input_tokens = 1000
         self.max_output_tokens = 500
         
@@ -81,7 +97,9 @@ Responda APENAS em português brasileiro."""
                 return "Sua mensagem é muito longa. Por favor, seja mais breve."
             
             # Parse intent
-            intent_data = self._parse_intent(user_message)
+            with observe_stage('intent_parse'):
+                intent_data = self._parse_intent(user_message)
+            set_intent(intent_data['intent'])
             
             # Create conversation context
             system_prompt = self._create_system_prompt(context['client_name'])
@@ -96,9 +114,10 @@ Responda APENAS em português brasileiro."""
             calendar_service = context.get('calendar_service')
             
             if intent_data['intent'] == 'check_availability' and calendar_service:
-                # Get available slots for today
+                # Get available slots for today, held for this user while they choose
                 today = datetime.now()
-                available_slots = await calendar_service.get_available_slots(today)
+                with observe_stage('calendar_lookup'):
+                    available_slots = await calendar_service.get_available_slots(today, limit=5, owner=user_id)
                 
                 if available_slots:
                     slots_text = "\n".join([f"- {slot['start']} às {slot['end']}" for slot in available_slots[:5]])
@@ -113,26 +132,31 @@ Responda APENAS em português brasileiro."""
                     })
             
             # Generate response
-            response = self.model.generate_content(
-                "\n".join([f"{msg['role']}: {msg['content']}" for msg in conversation]),
-                generation_config=genai.types.GenerationConfig(
-                    max_output_tokens=self.max_output_tokens,
-                    temperature=0.7,
-                    top_p=0.8,
-                )
-            )
+            prompt = "\n".join([f"{msg['role']}: {msg['content']}" for msg in conversation])
+            with observe_stage('gemini_generation'):
+                response = await self.dependency.call('generate_content', lambda: self.model.generate_content_async(
+                    prompt,
+                    generation_config=genai.types.GenerationConfig(
+                        max_output_tokens=self.max_output_tokens,
+                        temperature=0.7,
+                        top_p=0.8,
+                    )
+                ))
             
             # Validate response
             ai_response = response.text.strip()
             
             # Security check - ensure response is within scope
             if self._is_response_safe(ai_response):
-                logger.info(f"Generated response for user {user_id}: {ai_response[:100]}...")
+                logger.debug("Generated response for user %s (%d chars)", user_id, len(ai_response))
                 return ai_response
             else:
                 logger.warning(f"Unsafe response blocked for user {user_id}")
                 return "Desculpe, só posso ajudar com agendamentos. Como posso ajudá-lo com isso?"
                 
+        except CircuitOpenError as e:
+            logger.warning(f"Skipping generation for user {user_id}: {e}")
+            return "Nosso assistente está temporariamente indisponível. Por favor, tente novamente em alguns minutos."
         except Exception as e:
             logger.error(f"Error processing message: {e}")
             return "Desculpe, ocorreu um erro. Por favor, tente novamente."
@@ -175,16 +199,24 @@ A mensagem deve:
 4. Ser amigável e profissional
 5. Ter no máximo 3 linhas"""
 
-            response = self.model.generate_content(
+            response = await self.dependency.call('generate_confirmation', lambda: self.model.generate_content_async(
                 prompt,
                 generation_config=genai.types.GenerationConfig(
                     max_output_tokens=100,
                     temperature=0.5,
                 )
-            )
+            ))
             
             return response.text.strip()
             
         except Exception as e:
             logger.error(f"Error generating confirmation: {e}")
-            return f"Agendamento confirmado para {appointment_details['start']}. Chegue 5 minutos antes. Obrigado!"
\ No newline at end of file
+            return f"Agendamento confirmado para {appointment_details['start']}. Chegue 5 minutos antes. Obrigado!"
+    
+    async def health_check(self) -> str:
+        """Check Gemini API health with a metadata lookup (no generation quota)"""
+        try:
+            await asyncio.to_thread(genai.get_model, f"models/{self.model_name}")
+            return "healthy"
+        except Exception:
+            return "unhealthy"
@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.config import settings
+from app.utils.metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+HEALTHY = "healthy"
+UNHEALTHY = "unhealthy"
+UNKNOWN = "unknown"
+NOT_INITIALIZED = "not_initialized"
+
+
+class ServiceNotInitialized(Exception):
+    """The lazy service has not been built yet, so there is nothing to probe"""
+
+
+class HealthMonitor:
+    """Checks dependency health in the background and caches the results.
+
+    Probe endpoints only read the cached snapshot, so they never block on
+    Redis, Postgres or the external APIs. Lazy services are only probed once
+    a request has built them; until then they report "not_initialized",
+    which does not hold readiness back.
+    """
+
+    def __init__(
+        self,
+        app_state: Any,
+        interval_seconds: Optional[float] = None,
+        timeout_seconds: Optional[float] = None,
+        required: Optional[List[str]] = None
+    ):
+        self.app_state = app_state
+        self.interval_seconds = interval_seconds or settings.HEALTH_CHECK_INTERVAL_SECONDS
+        self.timeout_seconds = timeout_seconds or settings.HEALTH_CHECK_TIMEOUT_SECONDS
+        self.required = required if required is not None else settings.READINESS_DEPENDENCIES
+        self.checks: Dict[str, Callable[[], Awaitable[None]]] = {
+            "redis": self._check_redis,
+            "postgres": self._check_postgres,
+            "calendar": self._check_calendar,
+            "gemini": self._check_gemini,
+            "graph": self._check_graph,
+        }
+        self.results: Dict[str, Dict[str, Any]] = {
+            name: {"status": UNKNOWN, "checked_at": None, "latency_ms": None}
+            for name in self.checks
+        }
+        self._task: Optional[asyncio.Task] = None
+        self._checked_at: Optional[float] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="health-monitor")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @property
+    def ready(self) -> bool:
+        return all(self.results[name]["status"] in (HEALTHY, NOT_INITIALIZED) for name in self.required)
+
+    def snapshot(self) -> Dict[str, Any]:
+        # Hit: served from a check that ran within the last two intervals
+        fresh = self._checked_at is not None and time.monotonic() - self._checked_at <= 2 * self.interval_seconds
+        record_cache("health_snapshot", hit=fresh)
+        return {
+            "ready": self.ready,
+            "services": {name: dict(result) for name, result in self.results.items()},
+        }
+
+    async def _run(self):
+        while True:
+            await self.check_all()
+            await asyncio.sleep(self.interval_seconds)
+
+    async def check_all(self):
+        await asyncio.gather(*(self._check(name, check) for name, check in self.checks.items()))
+        self._checked_at = time.monotonic()
+
+    async def _check(self, name: str, check: Callable[[], Awaitable[None]]):
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(check(), timeout=self.timeout_seconds)
+            status = HEALTHY
+        except ServiceNotInitialized:
+            status = NOT_INITIALIZED
+        except Exception as e:
+            if self.results[name]["status"] != UNHEALTHY:
+                logger.warning(f"Health check for {name} failed: {e}")
+            status = UNHEALTHY
+
+        self.results[name] = {
+            "status": status,
+            "checked_at": datetime.now().isoformat(),
+            "latency_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
+
+    async def _check_redis(self):
+        redis = getattr(self.app_state, "redis", None)
+        if redis is None:
+            raise RuntimeError("Redis client not connected")
+        await redis.ping()
+
+    async def _check_postgres(self):
+        pool = getattr(self.app_state, "db_pool", None)
+        if pool is not None:
+            async with pool.acquire() as conn:
+                await conn.fetchval("SELECT 1")
+            return
+
+        import asyncpg
+
+        conn = await asyncpg.connect(
+            user=settings.DATABASE_USER,
+            password=settings.DATABASE_PASSWORD,
+            database=settings.DATABASE_NAME,
+            host=settings.DATABASE_HOST,
+            port=settings.DATABASE_PORT
+        )
+        try:
+            await conn.fetchval("SELECT 1")
+        finally:
+            await conn.close()
+
+    async def _resolve(self, name: str):
+        # Never builds the service: that would undo the lazy loading in every
+        # worker and hold the LazyService lock while a request waits on it
+        service = getattr(self.app_state, name)
+        if not service.initialized:
+            raise ServiceNotInitialized(name)
+        return service.get()
+
+    async def _check_calendar(self):
+        service = await self._resolve("calendar_service")
+        if await service.health_check() != HEALTHY:
+            raise RuntimeError("Calendar API unreachable")
+
+    async def _check_gemini(self):
+        service = await self._resolve("gemini_service")
+        if await service.health_check() != HEALTHY:
+            raise RuntimeError("Gemini API unreachable")
+
+    async def _check_graph(self):
+        service = await self._resolve("whatsapp_service")
+        if await service.health_check() != HEALTHY:
+            raise RuntimeError("Graph API unreachable")
@@ -0,0 +1,98 @@
+import importlib
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StartupReport:
+    """Collects import and initialization timings for the startup report"""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.timings: Dict[str, float] = {}
+
+    def record(self, phase: str, seconds: float):
+        self.timings[phase] = seconds
+
+    def measure(self, phase: str):
+        return _Measure(self, phase)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "phases_ms": {
+                phase: round(seconds * 1000, 2)
+                for phase, seconds in self.timings.items()
+            },
+            "elapsed_ms": round((time.perf_counter() - self.started_at) * 1000, 2),
+        }
+
+    def log(self, title: str):
+        summary = self.summary()
+        details = ", ".join(f"{phase}={ms}ms" for phase, ms in summary["phases_ms"].items())
+        logger.info(f"{title}: {details} (total {summary['elapsed_ms']}ms)")
+
+
+class _Measure:
+    def __init__(self, report: StartupReport, phase: str):
+        self.report = report
+        self.phase = phase
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.report.record(self.phase, time.perf_counter() - self.start)
+        return False
+
+
+startup_report = StartupReport()
+
+
+class LazyService:
+    """Proxy that imports and constructs a service on first attribute access.
+
+    `target` is a "module.path:ClassName" string so the module (and the heavy
+    SDKs it imports) is only loaded when the service is actually used.
+    """
+
+    def __init__(self, name: str, target: str, **kwargs):
+        self._name = name
+        self._target = target
+        self._kwargs = kwargs
+        self._instance: Optional[Any] = None
+        self._lock = threading.Lock()
+
+    @property
+    def initialized(self) -> bool:
+        return self._instance is not None
+
+    def get(self) -> Any:
+        """Return the underlying service, constructing it if needed"""
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self._build()
+        return self._instance
+
+    def _build(self) -> Any:
+        module_path, class_name = self._target.split(":")
+
+        with startup_report.measure(f"import:{self._name}"):
+            module = importlib.import_module(module_path)
+
+        with startup_report.measure(f"init:{self._name}"):
+            instance = getattr(module, class_name)(**self._kwargs)
+
+        timings = startup_report.summary()["phases_ms"]
+        logger.info(
+            f"Service {self._name} initialized lazily "
+            f"(import {timings[f'import:{self._name}']}ms, init {timings[f'init:{self._name}']}ms)"
+        )
+        return instance
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self.get(), attr)
@@ -0,0 +1,326 @@
+import asyncio
+import itertools
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Set, Tuple
+
+from app.config import settings
+from app.utils.metrics import (
+    observe_outbound_queue_wait,
+    record_dependency_error,
+    record_retry,
+    set_outbound_concurrency,
+    set_outbound_queue_depth,
+)
+from app.utils.tracing import attached_context, inject_context
+
+logger = logging.getLogger(__name__)
+
+# Lower values are sent first: replies to customers go ahead of campaigns
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 1
+
+# Graph API error codes that mean "slow down"
+# 4: app rate limit, 613: call rate limit, 80007: WABA rate limit,
+# 130429: Cloud API throughput, 131048: spam rate limit, 131056: pair rate limit
+THROTTLE_ERROR_CODES = {4, 613, 80007, 130429, 131048, 131056}
+
+MAX_BACKOFF_SECONDS = 60.0
+
+# (status, body, retry hint in seconds)
+SendResult = Tuple[int, Any, Optional[float]]
+
+# Takes the next send turn of a phone_number_id, shared by every worker:
+# turns are `interval` apart and none starts before the shared pause ends.
+# KEYS: next free turn, pause end (epoch ms)
+# ARGV: now_ms, interval_ms
+# Returns the ms to wait before sending
+PACE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local interval = tonumber(ARGV[2])
+local start = math.max(now, tonumber(redis.call('GET', KEYS[1])) or 0, tonumber(redis.call('GET', KEYS[2])) or 0)
+redis.call('SET', KEYS[1], start + interval, 'PX', math.ceil(start + interval - now) + 1000)
+return math.ceil(start - now)
+"""
+
+# Moves the shared pause end forward, never back
+# KEYS: pause end; ARGV: pause end (epoch ms), ttl_ms
+PAUSE_SCRIPT = """
+if tonumber(ARGV[1]) > (tonumber(redis.call('GET', KEYS[1])) or 0) then
+    redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+end
+return 0
+"""
+
+
+class SchedulerStopped(Exception):
+    """The scheduler was stopped before the call finished"""
+
+
+def retry_after_hint(headers: Mapping[str, str]) -> Optional[float]:
+    """Seconds to wait according to Retry-After or X-Business-Use-Case-Usage"""
+    retry_after = headers.get("Retry-After")
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+
+    usage = headers.get("X-Business-Use-Case-Usage")
+    if usage:
+        try:
+            minutes = [
+                entry.get("estimated_time_to_regain_access", 0)
+                for entries in json.loads(usage).values()
+                for entry in entries
+            ]
+            if any(minutes):
+                return max(minutes) * 60.0
+        except (ValueError, AttributeError, TypeError):
+            pass
+    return None
+
+
+def is_throttled(status: int, body: Any) -> bool:
+    if status == 429:
+        return True
+    if isinstance(body, dict):
+        return (body.get("error") or {}).get("code") in THROTTLE_ERROR_CODES
+    return False
+
+
+class OutboundScheduler:
+    """Paces Graph API calls for one phone_number_id.
+
+    - a messages-per-second budget spaces out the calls
+    - AIMD concurrency: the in-flight limit grows by ~1 per window of
+      successful calls and is halved on every throttle response
+    - throttled calls are paused for the Retry-After hint (or an exponential
+      backoff) and re-queued, up to WHATSAPP_MAX_SEND_ATTEMPTS
+
+    With Redis the messages-per-second budget and the throttle pauses are
+    shared by every worker (and pod) sending for the number; without it, or
+    when Redis fails, each worker paces on its own. The concurrency limit is
+    per worker.
+    """
+
+    def __init__(
+        self,
+        phone_number_id: str,
+        messages_per_second: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        initial_concurrency: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        redis: Any = None
+    ):
+        self.phone_number_id = phone_number_id
+        self.interval = 1.0 / (messages_per_second or settings.WHATSAPP_MESSAGES_PER_SECOND)
+        self.max_concurrency = max_concurrency or settings.WHATSAPP_MAX_CONCURRENCY
+        self.limit = float(min(initial_concurrency or settings.WHATSAPP_INITIAL_CONCURRENCY, self.max_concurrency))
+        self.max_attempts = max_attempts or settings.WHATSAPP_MAX_SEND_ATTEMPTS
+        self.in_flight = 0
+        self.consecutive_throttles = 0
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._slots: Optional[asyncio.Condition] = None
+        self._sequence = itertools.count()
+        self._next_send = 0.0
+        self._paused_until = 0.0
+        self._task: Optional[asyncio.Task] = None
+        # In-flight sends; referenced here so they are not garbage-collected
+        self._sends: Set[asyncio.Task] = set()
+        self.redis = redis
+        self._pace = redis.register_script(PACE_SCRIPT) if redis is not None else None
+        self._pause = redis.register_script(PAUSE_SCRIPT) if redis is not None else None
+        self._pace_keys = [f"outbound:{phone_number_id}:next", f"outbound:{phone_number_id}:paused"]
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def _start(self):
+        # Created on first use so they bind to the worker's event loop
+        if self._task is None:
+            self._queue = asyncio.PriorityQueue()
+            self._slots = asyncio.Condition()
+            self._task = asyncio.create_task(self._run(), name=f"outbound-{self.phone_number_id}")
+            set_outbound_concurrency(self.phone_number_id, self.limit)
+
+    async def stop(self):
+        """Cancel the dispatcher and in-flight sends; every pending caller gets SchedulerStopped"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        for task in self._sends:
+            task.cancel()
+        await asyncio.gather(*self._sends, return_exceptions=True)
+
+        while self._queue is not None and not self._queue.empty():
+            _, _, job = self._queue.get_nowait()
+            if not job["future"].done():
+                job["future"].set_exception(SchedulerStopped(f"{job['operation']} not sent: scheduler stopped"))
+        if self._queue is not None:
+            set_outbound_queue_depth(self.phone_number_id, 0)
+
+    async def submit(
+        self,
+        operation: str,
+        send: Callable[[], Awaitable[SendResult]],
+        priority: int = PRIORITY_INTERACTIVE
+    ) -> Tuple[int, Any]:
+        """Queue a call and wait for its final (status, body)"""
+        self._start()
+        future = asyncio.get_running_loop().create_future()
+        job = {
+            "operation": operation,
+            "send": send,
+            "future": future,
+            "priority": priority,
+            "attempt": 1,
+            "enqueued_at": time.perf_counter(),
+            "trace": inject_context(),
+        }
+        self._enqueue(job)
+        return await future
+
+    def _enqueue(self, job: Dict[str, Any]):
+        self._queue.put_nowait((job["priority"], next(self._sequence), job))
+        set_outbound_queue_depth(self.phone_number_id, self._queue.qsize())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            _, _, job = await self._queue.get()
+            set_outbound_queue_depth(self.phone_number_id, self._queue.qsize())
+
+            acquired = False
+            try:
+                async with self._slots:
+                    await self._slots.wait_for(lambda: self.in_flight < int(self.limit))
+                    self.in_flight += 1
+                    acquired = True
+
+                while True:
+                    delay = await self._take_turn(loop)
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    # A throttle seen during the wait moved the pause: take a turn after it
+                    if self._paused_until <= loop.time():
+                        break
+            except asyncio.CancelledError:
+                # Back in the queue so stop() fails it with the other pending jobs
+                if acquired:
+                    self.in_flight -= 1
+                self._enqueue(job)
+                raise
+
+            task = asyncio.create_task(self._send(job))
+            self._sends.add(task)
+            task.add_done_callback(self._sends.discard)
+
+    async def _take_turn(self, loop: asyncio.AbstractEventLoop) -> float:
+        """Reserve the next send turn; returns the seconds to wait for it"""
+        local_pause = self._paused_until - loop.time()
+        if self._pace is not None:
+            try:
+                wait_ms = await self._pace(keys=self._pace_keys, args=[int(time.time() * 1000), self.interval * 1000])
+                return max(int(wait_ms) / 1000, local_pause)
+            except Exception as e:
+                logger.warning(f"Shared outbound pacing unavailable, pacing per worker: {e}")
+                record_dependency_error("redis", "outbound_pace")
+        now = loop.time()
+        start = max(now, self._next_send, self._paused_until)
+        self._next_send = start + self.interval
+        return start - now
+
+    async def _share_pause(self):
+        """Publish the current pause so the other workers hold their sends too"""
+        if self._pause is None:
+            return
+        remaining = self._paused_until - asyncio.get_running_loop().time()
+        try:
+            await self._pause(
+                keys=self._pace_keys[1:],
+                args=[int((time.time() + remaining) * 1000), max(1, int(remaining * 1000))]
+            )
+        except Exception as e:
+            logger.warning(f"Could not share the outbound pause: {e}")
+            record_dependency_error("redis", "outbound_pause")
+
+    async def _send(self, job: Dict[str, Any]):
+        future = job["future"]
+        observe_outbound_queue_wait(job["operation"], time.perf_counter() - job["enqueued_at"])
+        try:
+            with attached_context(job["trace"]):
+                status, body, retry_after = await job["send"]()
+        except BaseException as e:
+            if not future.done():
+                if isinstance(e, asyncio.CancelledError):
+                    future.set_exception(SchedulerStopped(f"{job['operation']} cancelled: scheduler stopped"))
+                else:
+                    future.set_exception(e)
+            raise
+        finally:
+            # Also on cancellation, or the slot would never be given back
+            self.in_flight -= 1
+            await self._wake_dispatcher()
+
+        if is_throttled(status, body):
+            self._on_throttle(retry_after)
+            await self._share_pause()
+            if job["attempt"] < self.max_attempts:
+                record_retry("graph", job["operation"])
+                job["attempt"] += 1
+                self._enqueue(job)
+                return
+            logger.warning(f"Giving up {job['operation']} after {job['attempt']} throttled attempts")
+        else:
+            self._on_success()
+
+        if not future.done():
+            future.set_result((status, body))
+
+    async def _wake_dispatcher(self):
+        async with self._slots:
+            self._slots.notify_all()
+
+    def _on_success(self):
+        self.consecutive_throttles = 0
+        self.limit = min(self.max_concurrency, self.limit + 1.0 / self.limit)
+        set_outbound_concurrency(self.phone_number_id, self.limit)
+
+    def _on_throttle(self, retry_after: Optional[float]):
+        self.consecutive_throttles += 1
+        self.limit = max(1.0, self.limit / 2)
+        if retry_after is None:
+            retry_after = min(
+                MAX_BACKOFF_SECONDS,
+                settings.WHATSAPP_THROTTLE_BACKOFF_SECONDS * 2 ** (self.consecutive_throttles - 1)
+            )
+        loop = asyncio.get_running_loop()
+        self._paused_until = max(self._paused_until, loop.time() + retry_after)
+        set_outbound_concurrency(self.phone_number_id, self.limit)
+        logger.warning(
+            f"Graph API throttled {self.phone_number_id}: concurrency limit {self.limit:.1f}, "
+            f"pausing {retry_after:.1f}s"
+        )
+
+
+_schedulers: Dict[str, OutboundScheduler] = {}
+
+
+def get_scheduler(phone_number_id: str, redis: Any = None) -> OutboundScheduler:
+    """One scheduler per phone_number_id in this process; `redis` shares its budget with the other workers"""
+    if phone_number_id not in _schedulers:
+        _schedulers[phone_number_id] = OutboundScheduler(phone_number_id, redis=redis)
+    return _schedulers[phone_number_id]
+
+
+async def stop_schedulers():
+    for scheduler in _schedulers.values():
+        await scheduler.stop()
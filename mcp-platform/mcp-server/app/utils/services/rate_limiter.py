@@ -0,0 +1,108 @@
+import logging
+import time
+from typing import Any, NamedTuple, Optional
+
+from app.config import settings
+from app.utils.metrics import record_dependency_error, record_rate_limited
+
+logger = logging.getLogger(__name__)
+
+# Token buckets checked and consumed atomically: a request is only charged
+# when every level (tenant, sender) has a token left.
+# KEYS: one bucket per level
+# ARGV: now_ms, then capacity and refill rate (tokens/ms) for each key
+# Returns {0, 0} when allowed, or {index of the exhausted key, retry after ms}
+TOKEN_BUCKET_SCRIPT = """
+local now = tonumber(ARGV[1])
+local remaining = {}
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2])
+    local rate = tonumber(ARGV[i * 2 + 1])
+    local bucket = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(bucket[1]) or capacity
+    local ts = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    if tokens < 1 then
+        return {i, math.ceil((1 - tokens) / rate)}
+    end
+    remaining[i] = tokens
+end
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2])
+    local rate = tonumber(ARGV[i * 2 + 1])
+    redis.call('HSET', key, 'tokens', remaining[i] - 1, 'ts', now)
+    redis.call('PEXPIRE', key, math.ceil(capacity / rate))
+end
+return {0, 0}
+"""
+
+SCOPES = ("tenant", "sender")
+
+
+class RateLimitDecision(NamedTuple):
+    allowed: bool
+    scope: Optional[str] = None
+    retry_after: float = 0.0
+
+
+ALLOWED = RateLimitDecision(True)
+
+
+class RateLimiter:
+    """Per-tenant and per-sender token buckets stored in Redis.
+
+    Limits are in requests per minute with a burst capacity. The tenant
+    limit comes from RATE_LIMIT_TENANT_OVERRIDES[CLIENT_NAME] or
+    RATE_LIMIT_TENANT_PER_MINUTE; the sender limit from
+    RATE_LIMIT_SENDER_OVERRIDES[sender] or RATE_LIMIT_SENDER_PER_MINUTE.
+    When Redis is unavailable requests are allowed (fail open).
+    """
+
+    def __init__(self, redis: Any, tenant: str = settings.CLIENT_NAME):
+        self.redis = redis
+        self.tenant = tenant
+        self.enabled = settings.RATE_LIMIT_ENABLED
+        self.tenant_per_minute = settings.RATE_LIMIT_TENANT_OVERRIDES.get(
+            tenant, settings.RATE_LIMIT_TENANT_PER_MINUTE
+        )
+        self._script = redis.register_script(TOKEN_BUCKET_SCRIPT) if redis is not None else None
+
+    def _bucket(self, per_minute: float, burst: int):
+        return max(burst, 1), per_minute / 60000
+
+    async def check(self, sender: str, endpoint: str) -> RateLimitDecision:
+        if not self.enabled or self._script is None:
+            return ALLOWED
+
+        sender_per_minute = settings.RATE_LIMIT_SENDER_OVERRIDES.get(sender, settings.RATE_LIMIT_SENDER_PER_MINUTE)
+        tenant_capacity, tenant_rate = self._bucket(self.tenant_per_minute, settings.RATE_LIMIT_TENANT_BURST)
+        sender_capacity, sender_rate = self._bucket(sender_per_minute, settings.RATE_LIMIT_SENDER_BURST)
+
+        try:
+            exhausted, retry_after_ms = await self._script(
+                keys=[f"ratelimit:{self.tenant}:tenant", f"ratelimit:{self.tenant}:sender:{sender}"],
+                args=[int(time.time() * 1000), tenant_capacity, tenant_rate, sender_capacity, sender_rate]
+            )
+        except Exception as e:
+            logger.warning(f"Rate limiter unavailable, allowing request: {e}")
+            record_dependency_error("redis", "rate_limit")
+            return ALLOWED
+
+        if not exhausted:
+            return ALLOWED
+
+        scope = SCOPES[int(exhausted) - 1]
+        record_rate_limited(endpoint, scope)
+        return RateLimitDecision(False, scope, int(retry_after_ms) / 1000)
+
+    async def should_notify(self, sender: str) -> bool:
+        """True once per RATE_LIMIT_NOTICE_WINDOW_SECONDS per sender, for the canned reply"""
+        if self.redis is None:
+            return False
+        try:
+            return bool(await self.redis.set(
+                f"ratelimit:{self.tenant}:notified:{sender}", 1,
+                nx=True, ex=settings.RATE_LIMIT_NOTICE_WINDOW_SECONDS
+            ))
+        except Exception:
+            return False
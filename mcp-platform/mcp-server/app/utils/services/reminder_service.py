@@ -0,0 +1,301 @@
+import asyncio
+import logging
+import re
+import uuid
+from contextlib import aclosing
+from datetime import date, datetime, time, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from app.config import settings
+from app.utils.metrics import record_reminder
+from app.utils.services.outbound_scheduler import PRIORITY_BULK
+
+logger = logging.getLogger(__name__)
+
+TIMEZONE = ZoneInfo("America/Sao_Paulo")
+SOURCES = ("database", "calendar")
+
+# Deletes the lock only if we still own it
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Extends the lock only if we still own it
+REFRESH_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_DESCRIPTION_NAME_RE = re.compile(r"Cliente:\s*(.+)")
+_DESCRIPTION_PHONE_RE = re.compile(r"Telefone:\s*(\+?\d+)")
+
+
+class ReminderService:
+    """Sends WhatsApp template reminders for a day's appointments.
+
+    A campaign selects the appointments of one day in batches (keyset on the
+    `appointments` table, or the Calendar events of the day), renders the
+    template parameters per batch and sends them with bounded concurrency
+    through the outbound scheduler, at bulk priority. Progress lives in Redis:
+    a cursor advanced after each completed batch plus the set of appointment
+    ids already sent, so a restarted campaign resumes without re-sending.
+    A Redis lock makes a single worker run each campaign.
+    """
+
+    def __init__(self, app_state: Any):
+        self.app_state = app_state
+        self.tenant = settings.CLIENT_NAME
+        self._scheduler_task: Optional[asyncio.Task] = None
+        self._campaigns: Dict[str, asyncio.Task] = {}
+
+    def _key(self, campaign_id: str, suffix: str) -> str:
+        return f"reminders:{self.tenant}:{campaign_id}:{suffix}"
+
+    @staticmethod
+    def campaign_id(target_date: date, source: str) -> str:
+        return f"{target_date.isoformat()}-{source}"
+
+    def start(self):
+        """Start the nightly schedule (REMINDER_ENABLED)"""
+        if settings.REMINDER_ENABLED and self._scheduler_task is None:
+            self._scheduler_task = asyncio.create_task(self._schedule_loop(), name="reminder-scheduler")
+
+    async def stop(self):
+        tasks = list(self._campaigns.values())
+        if self._scheduler_task:
+            tasks.append(self._scheduler_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._scheduler_task = None
+        self._campaigns.clear()
+
+    async def _schedule_loop(self):
+        # Every worker runs this loop; the campaign lock lets only one send
+        while True:
+            now = datetime.now(TIMEZONE)
+            if settings.REMINDER_WINDOW_START_HOUR <= now.hour < settings.REMINDER_WINDOW_END_HOUR:
+                deadline = now.replace(hour=settings.REMINDER_WINDOW_END_HOUR, minute=0, second=0, microsecond=0)
+                try:
+                    await self.run_campaign(now.date() + timedelta(days=1), deadline=deadline)
+                except Exception as e:
+                    logger.error(f"Reminder campaign failed: {e}", exc_info=True)
+            await asyncio.sleep(settings.REMINDER_CHECK_INTERVAL_SECONDS)
+
+    def launch(self, target_date: date, source: str = "database") -> str:
+        """Run a campaign in the background (manual trigger); returns its id"""
+        campaign_id = self.campaign_id(target_date, source)
+        task = self._campaigns.get(campaign_id)
+        if task is None or task.done():
+            deadline = datetime.now(TIMEZONE) + timedelta(
+                hours=settings.REMINDER_WINDOW_END_HOUR - settings.REMINDER_WINDOW_START_HOUR
+            )
+            task = asyncio.create_task(self.run_campaign(target_date, source, deadline))
+            task.add_done_callback(lambda _: self._campaigns.pop(campaign_id, None))
+            self._campaigns[campaign_id] = task
+        return campaign_id
+
+    async def progress(self, campaign_id: str) -> Dict[str, str]:
+        redis = self.app_state.redis
+        if redis is None:
+            return {}
+        raw = await redis.hgetall(self._key(campaign_id, "progress"))
+        return {key.decode(): value.decode() for key, value in raw.items()}
+
+    async def run_campaign(self, target_date: date, source: str = "database", deadline: Optional[datetime] = None):
+        if source not in SOURCES:
+            raise ValueError(f"Unknown reminder source: {source}")
+        redis = self.app_state.redis
+        if redis is None:
+            raise RuntimeError("Reminder campaigns need Redis for checkpoints")
+
+        campaign_id = self.campaign_id(target_date, source)
+        progress = await self.progress(campaign_id)
+        if progress.get("status") in ("finished", "expired"):
+            return
+
+        lock_key = self._key(campaign_id, "lock")
+        token = uuid.uuid4().hex
+        lock_ttl_ms = settings.REMINDER_LOCK_TTL_SECONDS * 1000
+        if not await redis.set(lock_key, token, nx=True, px=lock_ttl_ms):
+            return
+
+        runner = asyncio.create_task(self._run(campaign_id, target_date, source, progress, deadline))
+        refresher = asyncio.create_task(self._refresh_lock(lock_key, token, lock_ttl_ms))
+        try:
+            await asyncio.wait({runner, refresher}, return_when=asyncio.FIRST_COMPLETED)
+            if not runner.done():
+                # The refresher only returns once the lock is no longer ours
+                logger.warning(f"Reminder campaign {campaign_id} lost its lock, stopping")
+                runner.cancel()
+                await asyncio.gather(runner, return_exceptions=True)
+                refresher.result()
+                return
+            runner.result()
+        finally:
+            runner.cancel()
+            refresher.cancel()
+            await redis.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+
+    async def _refresh_lock(self, lock_key: str, token: str, lock_ttl_ms: int):
+        """Keep extending the lock; returns when another worker owns it (or it expired)"""
+        while True:
+            await asyncio.sleep(lock_ttl_ms / 3000)
+            if not await self.app_state.redis.eval(REFRESH_LOCK_SCRIPT, 1, lock_key, token, lock_ttl_ms):
+                return
+
+    async def _run(
+        self,
+        campaign_id: str,
+        target_date: date,
+        source: str,
+        progress: Dict[str, str],
+        deadline: Optional[datetime]
+    ):
+        redis = self.app_state.redis
+        progress_key = self._key(campaign_id, "progress")
+        sent_key = self._key(campaign_id, "sent")
+        await redis.hset(progress_key, mapping={"status": "running", "target_date": target_date.isoformat(), "source": source})
+        await redis.hsetnx(progress_key, "started_at", datetime.now(TIMEZONE).isoformat())
+
+        cursor = progress.get("cursor")
+        resumed = " (resuming)" if cursor else ""
+        logger.info(f"Reminder campaign {campaign_id} started{resumed}")
+
+        whatsapp = self.app_state.whatsapp_service
+        semaphore = asyncio.Semaphore(settings.REMINDER_CONCURRENCY)
+
+        async def send(item: Dict[str, Any]):
+            async with semaphore:
+                result = await whatsapp.send_template_message(
+                    to=item["phone"],
+                    template_name=settings.REMINDER_TEMPLATE_NAME,
+                    template_params=item["params"],
+                    priority=PRIORITY_BULK
+                )
+            async with redis.pipeline(transaction=False) as pipe:
+                if result.get("success"):
+                    pipe.sadd(sent_key, item["id"])
+                    pipe.hincrby(progress_key, "sent", 1)
+                else:
+                    pipe.hincrby(progress_key, "failed", 1)
+                    pipe.hset(self._key(campaign_id, "failures"), item["id"], str(result.get("error"))[:500])
+                await pipe.execute()
+            record_reminder("sent" if result.get("success") else "failed")
+
+        async for batch, next_cursor in self._select(source, target_date, cursor):
+            if deadline and datetime.now(TIMEZONE) >= deadline:
+                await redis.hset(progress_key, "status", "expired")
+                logger.warning(f"Reminder campaign {campaign_id} stopped at the end of its window")
+                return
+
+            items = self._render(batch)
+            already_sent = await redis.smismember(sent_key, [item["id"] for item in items]) if items else []
+            pending = [item for item, sent in zip(items, already_sent) if not sent]
+            skipped = len(batch) - len(pending)
+            if skipped:
+                await redis.hincrby(progress_key, "skipped", skipped)
+                record_reminder("skipped", skipped)
+
+            await asyncio.gather(*(send(item) for item in pending))
+            await redis.hset(progress_key, "cursor", next_cursor)
+
+        await redis.hset(progress_key, mapping={"status": "finished", "finished_at": datetime.now(TIMEZONE).isoformat()})
+        await redis.expire(sent_key, settings.REMINDER_RETENTION_SECONDS)
+        logger.info(f"Reminder campaign {campaign_id} finished")
+
+    def _render(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Template parameters: customer name, date, time, service"""
+        return [
+            {
+                "id": str(appointment["id"]),
+                "phone": appointment["phone"],
+                "params": [
+                    appointment["customer_name"],
+                    appointment["start_time"].strftime("%d/%m/%Y"),
+                    appointment["start_time"].strftime("%H:%M"),
+                    appointment["service_type"] or "",
+                ],
+            }
+            for appointment in batch
+            if appointment["phone"]
+        ]
+
+    def _select(self, source: str, target_date: date, cursor: Optional[str]):
+        if source == "calendar":
+            return self._select_calendar(target_date, cursor)
+        return self._select_database(target_date, cursor)
+
+    async def _select_database(
+        self, target_date: date, cursor: Optional[str]
+    ) -> AsyncIterator[Tuple[List[Dict[str, Any]], str]]:
+        """Keyset pagination on appointments.id; the cursor is the last id of a completed batch"""
+        pool = self.app_state.db_pool
+        if pool is None:
+            raise RuntimeError("Database pool not available")
+
+        start = datetime.combine(target_date, time.min)
+        end = start + timedelta(days=1)
+        last_id = int(cursor or 0)
+        while True:
+            async with pool.acquire() as conn:
+                rows = await conn.fetch(
+                    """
+                    SELECT id, customer_name, customer_phone, service_type, start_time
+                    FROM appointments
+                    WHERE client_name = $1 AND start_time >= $2 AND start_time < $3
+                      AND status IN ('scheduled', 'confirmed') AND id > $4
+                    ORDER BY id
+                    LIMIT $5
+                    """,
+                    self.tenant, start, end, last_id, settings.REMINDER_BATCH_SIZE
+                )
+            if not rows:
+                return
+            last_id = rows[-1]["id"]
+            yield [
+                {
+                    "id": row["id"],
+                    "customer_name": row["customer_name"],
+                    "phone": row["customer_phone"],
+                    "service_type": row["service_type"],
+                    "start_time": row["start_time"],
+                }
+                for row in rows
+            ], str(last_id)
+
+    async def _select_calendar(
+        self, target_date: date, cursor: Optional[str]
+    ) -> AsyncIterator[Tuple[List[Dict[str, Any]], str]]:
+        """Events of the day streamed from Google Calendar; already-sent ids are skipped via the sent set"""
+        calendar = self.app_state.calendar_service
+        start = datetime.combine(target_date, time.min, TIMEZONE)
+        events = calendar.iter_events(timeMin=start.isoformat(), timeMax=(start + timedelta(days=1)).isoformat())
+
+        batch: List[Dict[str, Any]] = []
+        async with aclosing(events):
+            async for event in events:
+                description = event.get("description", "")
+                name = _DESCRIPTION_NAME_RE.search(description)
+                phone = _DESCRIPTION_PHONE_RE.search(description)
+                start_value = event["start"].get("dateTime")
+                if not phone or not start_value:
+                    continue
+                batch.append({
+                    "id": event["id"],
+                    "customer_name": name.group(1).strip() if name else "",
+                    "phone": phone.group(1),
+                    "service_type": event.get("summary", "").split(" - ", 1)[0],
+                    "start_time": datetime.fromisoformat(start_value).astimezone(TIMEZONE),
+                })
+                if len(batch) >= settings.REMINDER_BATCH_SIZE:
+                    yield batch, event["id"]
+                    batch = []
+        if batch:
+            yield batch, batch[-1]["id"]
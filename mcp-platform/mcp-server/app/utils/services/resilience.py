@@ -0,0 +1,348 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from tenacity import AsyncRetrying, RetryCallState, stop_after_attempt, wait_random_exponential
+
+from app.config import settings
+from app.utils.metrics import (
+    observe_dependency,
+    record_circuit_rejected,
+    record_hedge,
+    record_retry,
+    record_retry_budget_exhausted,
+    set_circuit_state,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit is open"""
+
+    def __init__(self, dependency: str, retry_after: float):
+        super().__init__(f"{dependency} circuit is open, retry in {retry_after:.0f}s")
+        self.dependency = dependency
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker over the most recent calls.
+
+    Opens when at least CIRCUIT_MIN_CALLS of the last CIRCUIT_WINDOW calls
+    were seen and CIRCUIT_FAILURE_RATIO of them failed. After
+    CIRCUIT_RESET_SECONDS one trial call is let through (half-open): success
+    closes the circuit, failure opens it again.
+    """
+
+    def __init__(
+        self,
+        dependency: str,
+        window: Optional[int] = None,
+        min_calls: Optional[int] = None,
+        failure_ratio: Optional[float] = None,
+        reset_seconds: Optional[float] = None
+    ):
+        self.dependency = dependency
+        self.min_calls = min_calls or settings.CIRCUIT_MIN_CALLS
+        self.failure_ratio = failure_ratio or settings.CIRCUIT_FAILURE_RATIO
+        self.reset_seconds = reset_seconds or settings.CIRCUIT_RESET_SECONDS
+        self.outcomes: deque = deque(maxlen=window or settings.CIRCUIT_WINDOW)
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        set_circuit_state(dependency, CLOSED)
+
+    def _set_state(self, state: str):
+        if state != self.state:
+            logger.warning(f"Circuit for {self.dependency} changed from {self.state} to {state}")
+            self.state = state
+            set_circuit_state(self.dependency, state)
+
+    def _retry_after(self) -> float:
+        return max(0.0, self.opened_at + self.reset_seconds - time.monotonic())
+
+    def check(self):
+        """Raise CircuitOpenError if a call would be rejected (does not take the trial slot)"""
+        if self.state == OPEN and self._retry_after() > 0:
+            raise CircuitOpenError(self.dependency, self._retry_after())
+        if self.state == HALF_OPEN and self.probe_in_flight:
+            raise CircuitOpenError(self.dependency, self.reset_seconds)
+
+    def before_call(self):
+        self.check()
+        if self.state == OPEN:
+            self._set_state(HALF_OPEN)
+        if self.state == HALF_OPEN:
+            self.probe_in_flight = True
+
+    def record_success(self):
+        if self.state == HALF_OPEN:
+            self.probe_in_flight = False
+            self.outcomes.clear()
+            self._set_state(CLOSED)
+        self.outcomes.append(False)
+
+    def record_failure(self):
+        if self.state == HALF_OPEN:
+            self.probe_in_flight = False
+            self._open()
+            return
+        self.outcomes.append(True)
+        if (
+            self.state == CLOSED
+            and len(self.outcomes) >= self.min_calls
+            and sum(self.outcomes) / len(self.outcomes) >= self.failure_ratio
+        ):
+            self._open()
+
+    def _open(self):
+        self.opened_at = time.monotonic()
+        self._set_state(OPEN)
+
+
+class RetryBudget:
+    """Caps retries to a share of the calls seen in a sliding window.
+
+    A retry is allowed while retries in the last `window` seconds stay below
+    RETRY_BUDGET_RATIO * calls + RETRY_BUDGET_MIN_PER_SECOND * window, so an
+    outage adds at most ~10% load instead of multiplying it by the attempt count.
+    Also used as the hedge budget, with its own ratio.
+    """
+
+    def __init__(
+        self,
+        ratio: Optional[float] = None,
+        min_per_second: Optional[float] = None,
+        window: float = 10.0
+    ):
+        self.ratio = settings.RETRY_BUDGET_RATIO if ratio is None else ratio
+        self.min_per_second = settings.RETRY_BUDGET_MIN_PER_SECOND if min_per_second is None else min_per_second
+        self.window = window
+        self.calls: deque = deque()
+        self.retries: deque = deque()
+
+    def _prune(self, now: float):
+        cutoff = now - self.window
+        for events in (self.calls, self.retries):
+            while events and events[0] < cutoff:
+                events.popleft()
+
+    def record_call(self):
+        self.calls.append(time.monotonic())
+
+    def try_spend(self) -> bool:
+        now = time.monotonic()
+        self._prune(now)
+        allowed = self.ratio * len(self.calls) + self.min_per_second * self.window
+        if len(self.retries) < allowed:
+            self.retries.append(now)
+            return True
+        return False
+
+
+class Hedge:
+    """Hedged requests for idempotent reads.
+
+    If the first request has not answered after the HEDGE_PERCENTILE latency
+    of recent requests (per operation), an identical second request is
+    started; the first successful answer wins and the other is cancelled.
+    Hedges are capped to HEDGE_BUDGET_RATIO of the calls, and only start
+    once HEDGE_MIN_SAMPLES latencies have been seen.
+    """
+
+    def __init__(
+        self,
+        dependency: str,
+        percentile: Optional[float] = None,
+        budget_ratio: Optional[float] = None,
+        window: int = 200
+    ):
+        self.dependency = dependency
+        self.percentile = percentile or settings.HEDGE_PERCENTILE
+        self.budget = RetryBudget(
+            ratio=settings.HEDGE_BUDGET_RATIO if budget_ratio is None else budget_ratio,
+            min_per_second=0.0
+        )
+        self.window = window
+        self.latencies: Dict[str, deque] = {}
+
+    def delay(self, operation: str) -> Optional[float]:
+        samples = self.latencies.get(operation)
+        if not samples or len(samples) < settings.HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(len(ordered) * self.percentile))
+        return max(settings.HEDGE_MIN_DELAY_SECONDS, ordered[index])
+
+    def _timed(self, operation: str, func: Callable[[], Awaitable[T]]) -> "asyncio.Future[T]":
+        async def run() -> T:
+            start = time.perf_counter()
+            result = await func()
+            samples = self.latencies.setdefault(operation, deque(maxlen=self.window))
+            samples.append(time.perf_counter() - start)
+            return result
+        return asyncio.ensure_future(run())
+
+    async def call(self, operation: str, func: Callable[[], Awaitable[T]]) -> T:
+        self.budget.record_call()
+        delay = self.delay(operation)
+        primary = self._timed(operation, func)
+        if delay is None:
+            return await primary
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(primary), delay)
+        except asyncio.TimeoutError:
+            if primary.done():
+                raise
+        except BaseException:
+            primary.cancel()
+            raise
+        if not self.budget.try_spend():
+            return await primary
+
+        hedge = self._timed(operation, func)
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        record_hedge(self.dependency, operation, "hedge" if task is hedge else "primary")
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+
+def _never(_: Any) -> bool:
+    return False
+
+
+class Dependency:
+    """Timeout, jittered retries, retry budget and circuit breaker for one external dependency.
+
+    `transient(exc)` tells which exceptions mean the dependency is unhealthy:
+    those count as breaker failures and may be retried. Other exceptions
+    (bad request, not found) propagate untouched and count as successes.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        transient: Callable[[BaseException], bool],
+        timeout: Optional[float] = None,
+        max_attempts: Optional[int] = None
+    ):
+        self.name = name
+        self.transient = transient
+        self.timeout = timeout or settings.DEPENDENCY_TIMEOUTS.get(name, settings.HTTP_TIMEOUT_SECONDS)
+        self.max_attempts = max_attempts or settings.RETRY_MAX_ATTEMPTS
+        self.breaker = CircuitBreaker(name)
+        self.budget = RetryBudget()
+        self.hedge = Hedge(name)
+
+    def _is_transient(self, exc: BaseException) -> bool:
+        return isinstance(exc, asyncio.TimeoutError) or self.transient(exc)
+
+    def check(self, operation: str):
+        """Fail fast before queuing work for this dependency"""
+        try:
+            self.breaker.check()
+        except CircuitOpenError:
+            record_circuit_rejected(self.name, operation)
+            raise
+
+    async def call(
+        self,
+        operation: str,
+        func: Callable[[], Awaitable[T]],
+        idempotent: bool = True,
+        failed: Callable[[T], bool] = _never,
+        hedge: bool = False
+    ) -> T:
+        """Await `func()` under the dependency's policies.
+
+        Non-idempotent calls are attempted once. `failed(result)` marks
+        results that should count as breaker failures without raising
+        (e.g. an HTTP 5xx status). With `hedge` (and HEDGE_ENABLED) each
+        attempt may be hedged; the pair counts as one attempt.
+        """
+        if hedge and idempotent and settings.HEDGE_ENABLED:
+            unhedged = func
+            func = lambda: self.hedge.call(operation, unhedged)
+
+        max_attempts = self.max_attempts if idempotent else 1
+
+        def should_retry(retry_state: RetryCallState) -> bool:
+            # tenacity asks before checking `stop`: the last attempt must not spend budget
+            if retry_state.attempt_number >= max_attempts or not retry_state.outcome.failed:
+                return False
+            exc = retry_state.outcome.exception()
+            if isinstance(exc, CircuitOpenError) or not self._is_transient(exc):
+                return False
+            if not self.budget.try_spend():
+                record_retry_budget_exhausted(self.name)
+                return False
+            return True
+
+        retrying = AsyncRetrying(
+            stop=stop_after_attempt(max_attempts),
+            wait=wait_random_exponential(
+                multiplier=settings.RETRY_BASE_DELAY_SECONDS, max=settings.RETRY_MAX_DELAY_SECONDS
+            ),
+            retry=should_retry,
+            before_sleep=lambda _: record_retry(self.name, operation),
+            reraise=True,
+        )
+        return await retrying(self._attempt, operation, func, failed)
+
+    async def _attempt(self, operation: str, func: Callable[[], Awaitable[T]], failed: Callable[[T], bool]) -> T:
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError:
+            record_circuit_rejected(self.name, operation)
+            raise
+
+        self.budget.record_call()
+        try:
+            with observe_dependency(self.name, operation):
+                result = await asyncio.wait_for(func(), self.timeout)
+        except Exception as e:
+            if self._is_transient(e):
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            raise
+        except BaseException:
+            # Cancelled by the caller: free the half-open trial slot
+            self.breaker.probe_in_flight = False
+            raise
+
+        if failed(result):
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return result
+
+
+_dependencies: Dict[str, Dependency] = {}
+
+
+def get_dependency(name: str, transient: Callable[[BaseException], bool] = _never) -> Dependency:
+    """One policy per dependency in this process, shared by every service instance"""
+    if name not in _dependencies:
+        _dependencies[name] = Dependency(name, transient)
+    return _dependencies[name]
@@ -0,0 +1,211 @@
+import logging
+import math
+import re
+from datetime import datetime
+from typing import Any, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from app.config import settings
+from app.utils.metrics import record_cache, record_dependency_error, record_slot_conflict
+
+logger = logging.getLogger(__name__)
+
+# Naive datetimes are local business time, as in CalendarService
+TIMEZONE = ZoneInfo("America/Sao_Paulo")
+
+# Checks and takes every cell of an interval in one step.
+# KEYS: hold key and busy key of each cell, interleaved
+# ARGV: owner, hold ttl_ms
+# A cell held by, or busy with, the owner itself does not conflict.
+# Returns 0 once held, 1 when another owner holds a cell, 2 when a cell is busy
+RESERVE_SCRIPT = """
+for i = 1, #KEYS, 2 do
+    local holder = redis.call('GET', KEYS[i])
+    if holder and holder ~= ARGV[1] then
+        return 1
+    end
+    local busy = redis.call('GET', KEYS[i + 1])
+    if busy and busy ~= ARGV[1] then
+        return 2
+    end
+end
+for i = 1, #KEYS, 2 do
+    redis.call('SET', KEYS[i], ARGV[1], 'PX', ARGV[2])
+end
+return 0
+"""
+
+# Deletes the keys whose value is still ARGV[1]
+RELEASE_SCRIPT = """
+for _, key in ipairs(KEYS) do
+    if redis.call('GET', key) == ARGV[1] then
+        redis.call('DEL', key)
+    end
+end
+return 0
+"""
+
+CONFLICT_REASONS = {1: "held", 2: "busy"}
+
+Interval = Tuple[datetime, datetime]
+
+
+class SlotUnavailableError(Exception):
+    """The interval overlaps a slot held by someone else or a known booking"""
+
+    def __init__(self, start: datetime, end: datetime, reason: str):
+        super().__init__(f"Slot {start.isoformat()} - {end.isoformat()} is {reason}")
+        self.start = start
+        self.end = end
+        self.reason = reason
+
+
+class SlotHolds:
+    """Short-lived slot reservations in Redis, per calendar.
+
+    Intervals are split into SLOT_HOLD_GRANULARITY_MINUTES cells. Each cell
+    has a hold key (owner, expires with PX) and a busy key (event id, cached
+    from Calendar reads and from our own bookings for
+    SLOT_BUSY_CACHE_SECONDS). Reserving checks and sets all cells of an
+    interval in one Lua script, so overlapping intervals can never be held
+    by two owners. Bookings made directly in Google Calendar are only seen
+    once they have been read. Without Redis every check passes (fail open).
+    """
+
+    def __init__(self, redis: Any, calendar_id: str = settings.GOOGLE_CALENDAR_ID, tenant: str = settings.CLIENT_NAME):
+        self.redis = redis
+        self.prefix = f"slots:{tenant}:{calendar_id}"
+        self.granularity = settings.SLOT_HOLD_GRANULARITY_MINUTES * 60
+        self._reserve = redis.register_script(RESERVE_SCRIPT) if redis is not None else None
+        self._release = redis.register_script(RELEASE_SCRIPT) if redis is not None else None
+
+    def _cells(self, start: datetime, end: datetime) -> List[int]:
+        first = math.floor(_epoch(start) / self.granularity)
+        last = math.ceil(_epoch(end) / self.granularity)
+        return [cell * self.granularity for cell in range(first, max(last, first + 1))]
+
+    def _hold_key(self, cell: int) -> str:
+        return f"{self.prefix}:hold:{cell}"
+
+    def _busy_key(self, cell: int) -> str:
+        return f"{self.prefix}:busy:{cell}"
+
+    def _event_key(self, event_id: str) -> str:
+        return f"{self.prefix}:event:{event_id}"
+
+    def _failed(self, operation: str, error: Exception):
+        logger.warning(f"Slot holds unavailable ({operation}), allowing: {error}")
+        record_dependency_error("redis", f"slot_holds.{operation}")
+
+    async def reserve(self, start: datetime, end: datetime, owner: str, ttl_seconds: float):
+        """Hold [start, end) for `owner`; raises SlotUnavailableError on conflict"""
+        if self._reserve is None:
+            return
+        keys = []
+        for cell in self._cells(start, end):
+            keys += [self._hold_key(cell), self._busy_key(cell)]
+        try:
+            result = int(await self._reserve(keys=keys, args=[owner, int(ttl_seconds * 1000)]))
+        except Exception as e:
+            self._failed("reserve", e)
+            return
+        # 1 (held) stops before the busy keys are all read
+        if result != 1:
+            record_cache("slot_busy", hit=result == 2)
+        if result:
+            reason = CONFLICT_REASONS[result]
+            record_slot_conflict(reason)
+            raise SlotUnavailableError(start, end, reason)
+
+    async def try_hold(self, start: datetime, end: datetime, owner: str, ttl_seconds: float) -> bool:
+        try:
+            await self.reserve(start, end, owner, ttl_seconds)
+            return True
+        except SlotUnavailableError:
+            return False
+
+    async def is_free(self, start: datetime, end: datetime) -> bool:
+        """No hold and no known booking on any cell (read-only)"""
+        if self.redis is None:
+            return True
+        keys = []
+        for cell in self._cells(start, end):
+            keys += [self._hold_key(cell), self._busy_key(cell)]
+        try:
+            values = await self.redis.mget(keys)
+        except Exception as e:
+            self._failed("is_free", e)
+            return True
+        record_cache("slot_busy", hit=any(values[1::2]))
+        return not any(values)
+
+    async def release(self, start: datetime, end: datetime, owner: str):
+        if self._release is None:
+            return
+        try:
+            await self._release(keys=[self._hold_key(cell) for cell in self._cells(start, end)], args=[owner])
+        except Exception as e:
+            self._failed("release", e)
+
+    async def mark_busy(self, events: Iterable[Tuple[str, datetime, datetime]]):
+        """Cache (event id, start, end) bookings for SLOT_BUSY_CACHE_SECONDS"""
+        if self.redis is None:
+            return
+        ttl_ms = settings.SLOT_BUSY_CACHE_SECONDS * 1000
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for event_id, start, end in events:
+                    cells = self._cells(start, end)
+                    for cell in cells:
+                        pipe.set(self._busy_key(cell), event_id, px=ttl_ms)
+                    pipe.sadd(self._event_key(event_id), *cells)
+                    pipe.pexpire(self._event_key(event_id), ttl_ms)
+                await pipe.execute()
+        except Exception as e:
+            self._failed("mark_busy", e)
+
+    async def forget_event(self, event_id: str):
+        """Drop the cached busy cells of a cancelled or moved event"""
+        if self.redis is None:
+            return
+        try:
+            cells = await self.redis.smembers(self._event_key(event_id))
+            if cells:
+                await self._release(keys=[self._busy_key(int(cell)) for cell in cells], args=[event_id])
+            await self.redis.delete(self._event_key(event_id))
+        except Exception as e:
+            self._failed("forget_event", e)
+
+
+def phone_key(phone: str) -> str:
+    """Hold owner for a customer phone: E.164 digits, so every spelling of a number matches.
+
+    WhatsApp sends `from` as 55 + area code + number, sometimes without the
+    ninth digit of Brazilian mobiles; forms and the API usually carry the
+    local number, with or without +55 and punctuation.
+    """
+    digits = re.sub(r"\D", "", phone)
+    if digits.startswith("00"):
+        digits = digits[2:]
+    if len(digits) in (10, 11):
+        digits = "55" + digits
+    # Mobile numbers (first digit 6-9) without the ninth digit
+    if len(digits) == 12 and digits.startswith("55") and digits[4] in "6789":
+        digits = digits[:4] + "9" + digits[4:]
+    return digits or phone
+
+
+def _epoch(value: datetime) -> float:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=TIMEZONE)
+    return value.timestamp()
+
+
+def event_interval(event: dict) -> Optional[Interval]:
+    """(start, end) of a Calendar event resource; all-day events use their dates"""
+    try:
+        start = event["start"].get("dateTime") or event["start"]["date"]
+        end = event["end"].get("dateTime") or event["end"]["date"]
+        return datetime.fromisoformat(start), datetime.fromisoformat(end)
+    except (KeyError, ValueError):
+        return None
@@ -1,36 +1,79 @@
 import aiohttp
 import asyncio
-from typing import Dict, Optional, List
+from typing import Any, Dict, Optional, List, Union
 import logging
 import json
 from datetime import datetime
+import msgspec
 from app.config import settings
+from app.utils.metrics import record_dependency_error
+from app.utils.services.outbound_scheduler import PRIORITY_INTERACTIVE, get_scheduler, retry_after_hint
+from app.utils.services.resilience import get_dependency
+from app.utils.whatsapp_webhook import DecodeError, decode_webhook, first_message
 
 logger = logging.getLogger(__name__)
 
+# Only mark_as_read is safe to resend; a retried send could deliver the message twice
+IDEMPOTENT_OPERATIONS = {'mark_as_read'}
+
+
+def _is_transient(exc: BaseException) -> bool:
+    return isinstance(exc, (aiohttp.ClientConnectionError, aiohttp.ServerTimeoutError))
+
 class WhatsAppService:
-    def __init__(self):
+    def __init__(self, session: Optional[aiohttp.ClientSession] = None, redis: Any = None):
         self.api_token = settings.WHATSAPP_API_TOKEN
         self.phone_number_id = settings.WHATSAPP_PHONE_NUMBER_ID
         self.api_version = "v17.0"
         self.base_url = f"https://graph.facebook.com/{self.api_version}"
         self.webhook_verify_token = settings.WHATSAPP_WEBHOOK_VERIFY_TOKEN
+        self.messages_url = f"{self.base_url}/{self.phone_number_id}/messages"
+        self.headers = {
+            "Authorization": f"Bearer {self.api_token}",
+            "Content-Type": "application/json"
+        }
+        # Shared per-worker session (keep-alive, connection pool); created in lifespan
+        self._session = session
+        # Paces every call to /messages for this number (throughput limits, throttling),
+        # sharing the budget with the other workers through Redis
+        self.scheduler = get_scheduler(self.phone_number_id, redis)
+        # Timeout and circuit breaker; throttling stays with the scheduler
+        self.dependency = get_dependency('graph', _is_transient)
+    
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        return self._session
+    
+    async def _post(self, operation: str, payload: Dict, priority: int = PRIORITY_INTERACTIVE):
+        """POST to /messages through the outbound scheduler; returns (status, body)"""
+        # Fail fast while the circuit is open instead of queuing doomed calls
+        self.dependency.check(operation)
+        return await self.scheduler.submit(operation, lambda: self._request(operation, payload), priority)
+    
+    async def _request(self, operation: str, payload: Dict):
+        return await self.dependency.call(
+            operation,
+            lambda: self._send(payload),
+            idempotent=operation in IDEMPOTENT_OPERATIONS,
+            failed=lambda result: result[0] >= 500
+        )
+    
+    async def _send(self, payload: Dict):
+        async with self.session.post(self.messages_url, json=payload, headers=self.headers) as response:
+            body = await response.json(content_type=None)
+            return response.status, body, retry_after_hint(response.headers)
         
     async def send_message(
         self, 
         to: str, 
         message: str,
-        message_type: str = "text"
+        message_type: str = "text",
+        priority: int = PRIORITY_INTERACTIVE
     ) -> Dict[str, any]:
         """Send WhatsApp message"""
         try:
-            url = f"{self.base_url}/{self.phone_number_id}/messages"
-            
-            headers = {
-                "Authorization": f"Bearer {self.api_token}",
-                "Content-Type": "application/json"
-            }
-            
             # Format phone number (ensure it has country code)
             if not to.startswith("+"):
                 to = f"+55{to}"  # Default to Brazil
@@ -44,17 +87,16 @@ class WhatsAppService:
             if message_type == "text":
                 payload["text"] = {"body": message}
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, json=payload, headers=headers) as response:
-                    result = await response.json()
-                    
-                    if response.status == 200:
-                        logger.info(f"Message sent successfully to {to}")
-                        return {"success": True, "message_id": result.get("messages", [{}])[0].get("id")}
-                    else:
-                        logger.error(f"Failed to send message: {result}")
-                        return {"success": False, "error": result}
-                        
+            status, result = await self._post('send_message', payload, priority)
+            
+            if status == 200:
+                logger.debug("Message sent successfully to %s", to)
+                return {"success": True, "message_id": result.get("messages", [{}])[0].get("id")}
+            else:
+                logger.error(f"Failed to send message: {result}")
+                record_dependency_error('graph', 'send_message')
+                return {"success": False, "error": result}
+                
         except Exception as e:
             logger.error(f"Error sending WhatsApp message: {e}")
             return {"success": False, "error": str(e)}
@@ -63,17 +105,11 @@ class WhatsAppService:
         self,
         to: str,
         template_name: str,
-        template_params: List[str]
+        template_params: List[str],
+        priority: int = PRIORITY_INTERACTIVE
     ) -> Dict[str, any]:
         """Send WhatsApp template message"""
         try:
-            url = f"{self.base_url}/{self.phone_number_id}/messages"
-            
-            headers = {
-                "Authorization": f"Bearer {self.api_token}",
-                "Content-Type": "application/json"
-            }
-            
             # Format phone number
             if not to.startswith("+"):
                 to = f"+55{to}"
@@ -100,17 +136,16 @@ class WhatsAppService:
                 }
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, json=payload, headers=headers) as response:
-                    result = await response.json()
-                    
-                    if response.status == 200:
-                        logger.info(f"Template message sent to {to}")
-                        return {"success": True, "message_id": result.get("messages", [{}])[0].get("id")}
-                    else:
-                        logger.error(f"Failed to send template message: {result}")
-                        return {"success": False, "error": result}
-                        
+            status, result = await self._post('send_template_message', payload, priority)
+            
+            if status == 200:
+                logger.info(f"Template message sent to {to}")
+                return {"success": True, "message_id": result.get("messages", [{}])[0].get("id")}
+            else:
+                logger.error(f"Failed to send template message: {result}")
+                record_dependency_error('graph', 'send_template_message')
+                return {"success": False, "error": result}
+                
         except Exception as e:
             logger.error(f"Error sending template message: {e}")
             return {"success": False, "error": str(e)}
@@ -119,17 +154,11 @@ class WhatsAppService:
         self,
         to: str,
         body_text: str,
-        buttons: List[Dict[str, str]]
+        buttons: List[Dict[str, str]],
+        priority: int = PRIORITY_INTERACTIVE
     ) -> Dict[str, any]:
         """Send interactive message with buttons"""
         try:
-            url = f"{self.base_url}/{self.phone_number_id}/messages"
-            
-            headers = {
-                "Authorization": f"Bearer {self.api_token}",
-                "Content-Type": "application/json"
-            }
-            
             # Format phone number
             if not to.startswith("+"):
                 to = f"+55{to}"
@@ -159,62 +188,54 @@ class WhatsAppService:
                 "interactive": interactive
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, json=payload, headers=headers) as response:
-                    result = await response.json()
-                    
-                    if response.status == 200:
-                        logger.info(f"Interactive message sent to {to}")
-                        return {"success": True, "message_id": result.get("messages", [{}])[0].get("id")}
-                    else:
-                        logger.error(f"Failed to send interactive message: {result}")
-                        return {"success": False, "error": result}
-                        
+            status, result = await self._post('send_interactive_message', payload, priority)
+            
+            if status == 200:
+                logger.info(f"Interactive message sent to {to}")
+                return {"success": True, "message_id": result.get("messages", [{}])[0].get("id")}
+            else:
+                logger.error(f"Failed to send interactive message: {result}")
+                record_dependency_error('graph', 'send_interactive_message')
+                return {"success": False, "error": result}
+                
         except Exception as e:
             logger.error(f"Error sending interactive message: {e}")
             return {"success": False, "error": str(e)}
     
-    def parse_webhook_message(self, webhook_data: Dict) -> Optional[Dict]:
-        """Parse incoming webhook message"""
+    def parse_webhook_message(self, webhook_data: Union[bytes, Dict]) -> Optional[Dict]:
+        """Parse incoming webhook message (raw body or decoded dict)"""
         try:
-            # Extract message data from webhook payload
-            entry = webhook_data.get("entry", [{}])[0]
-            changes = entry.get("changes", [{}])[0]
-            value = changes.get("value", {})
-            
+            found = first_message(decode_webhook(webhook_data))
             # Check if it's a message
-            messages = value.get("messages", [])
-            if not messages:
+            if found is None:
                 return None
-            
-            message = messages[0]
-            contact = value.get("contacts", [{}])[0]
-            
-            # Extract relevant information
-            parsed_message = {
-                "message_id": message.get("id"),
-                "from": message.get("from"),
-                "timestamp": datetime.fromtimestamp(int(message.get("timestamp", 0))),
-                "type": message.get("type"),
-                "contact_name": contact.get("profile", {}).get("name", "Unknown"),
-            }
-            
-            # Extract message content based on type
-            if message["type"] == "text":
-                parsed_message["text"] = message.get("text", {}).get("body", "")
-            elif message["type"] == "interactive":
-                parsed_message["interactive"] = message.get("interactive", {})
-                # Extract button reply
-                if message["interactive"]["type"] == "button_reply":
-                    parsed_message["button_id"] = message["interactive"]["button_reply"]["id"]
-                    parsed_message["button_title"] = message["interactive"]["button_reply"]["title"]
-            
-            logger.info(f"Parsed webhook message: {parsed_message}")
-            return parsed_message
-            
-        except Exception as e:
+            message, contact = found
+            timestamp = datetime.fromtimestamp(int(message.timestamp or 0))
+        except (DecodeError, ValueError) as e:
             logger.error(f"Error parsing webhook message: {e}")
             return None
+        
+        # Extract relevant information
+        parsed_message = {
+            "message_id": message.id,
+            "from": message.from_,
+            "timestamp": timestamp,
+            "type": message.type,
+            "contact_name": (contact.profile.name if contact and contact.profile else None) or "Unknown",
+        }
+        
+        # Extract message content based on type
+        if message.type == "text":
+            parsed_message["text"] = (message.text.body if message.text else None) or ""
+        elif message.type == "interactive" and message.interactive:
+            parsed_message["interactive"] = msgspec.to_builtins(message.interactive)
+            # Extract button reply
+            if message.interactive.button_reply:
+                parsed_message["button_id"] = message.interactive.button_reply.id
+                parsed_message["button_title"] = message.interactive.button_reply.title or ""
+        
+        logger.debug("Parsed webhook message %s (%s)", parsed_message["message_id"], parsed_message["type"])
+        return parsed_message
     
     def verify_webhook(self, mode: str, token: str, challenge: str) -> Optional[str]:
         """Verify webhook subscription"""
@@ -228,28 +249,34 @@ class WhatsAppService:
     async def mark_as_read(self, message_id: str) -> bool:
         """Mark message as read"""
         try:
-            url = f"{self.base_url}/{self.phone_number_id}/messages"
-            
-            headers = {
-                "Authorization": f"Bearer {self.api_token}",
-                "Content-Type": "application/json"
-            }
-            
             payload = {
                 "messaging_product": "whatsapp",
                 "status": "read",
                 "message_id": message_id
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, json=payload, headers=headers) as response:
-                    if response.status == 200:
-                        logger.info(f"Message {message_id} marked as read")
-                        return True
-                    else:
-                        logger.error(f"Failed to mark message as read: {await response.text()}")
-                        return False
-                        
+            status, result = await self._post('mark_as_read', payload)
+            
+            if status == 200:
+                logger.debug("Message %s marked as read", message_id)
+                return True
+            else:
+                logger.error(f"Failed to mark message as read: {result}")
+                record_dependency_error('graph', 'mark_as_read')
+                return False
+                
         except Exception as e:
             logger.error(f"Error marking message as read: {e}")
-            return False
\ No newline at end of file
+            return False
+    
+    async def health_check(self) -> str:
+        """Check Graph API health by reading the phone number metadata"""
+        try:
+            url = f"{self.base_url}/{self.phone_number_id}"
+            headers = {"Authorization": f"Bearer {self.api_token}"}
+            
+            async with self.session.get(url, params={"fields": "id"}, headers=headers) as response:
+                return "healthy" if response.status == 200 else "unhealthy"
+                
+        except Exception:
+            return "unhealthy"
@@ -0,0 +1,104 @@
+import logging
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from opentelemetry import context, propagate, trace
+from opentelemetry.trace import SpanKind
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+tracer = trace.get_tracer("mcp-server")
+
+_memory_exporter = None
+
+
+def setup_tracing(app) -> Optional[object]:
+    """Configure the tracer provider according to OTEL_TRACES_EXPORTER.
+
+    - "none": tracing disabled, spans are no-ops
+    - "otlp": batch export over OTLP/HTTP to OTEL_EXPORTER_OTLP_ENDPOINT
+    - "console": print finished spans (local debugging)
+    - "memory": keep finished spans in memory (tests)
+    """
+    exporter_name = settings.OTEL_TRACES_EXPORTER.lower()
+    if exporter_name == "none":
+        return None
+
+    # SDK imports are deferred so processes without tracing do not pay for them
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, SimpleSpanProcessor
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+    resource = Resource.create({
+        "service.name": settings.OTEL_SERVICE_NAME,
+        "service.namespace": settings.CLIENT_NAME,
+        "deployment.environment": settings.ENVIRONMENT,
+        "mcp.tenant": settings.CLIENT_NAME,
+    })
+    provider = TracerProvider(
+        resource=resource,
+        sampler=ParentBased(TraceIdRatioBased(settings.OTEL_TRACES_SAMPLER_RATIO))
+    )
+
+    if exporter_name == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        endpoint = settings.OTEL_EXPORTER_OTLP_ENDPOINT
+        exporter = OTLPSpanExporter(endpoint=f"{endpoint.rstrip('/')}/v1/traces") if endpoint else OTLPSpanExporter()
+        provider.add_span_processor(BatchSpanProcessor(exporter))
+    elif exporter_name == "console":
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+        provider.add_span_processor(SimpleSpanProcessor(ConsoleSpanExporter()))
+    elif exporter_name == "memory":
+        from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+        global _memory_exporter
+        _memory_exporter = InMemorySpanExporter()
+        provider.add_span_processor(SimpleSpanProcessor(_memory_exporter))
+    else:
+        raise ValueError(f"Unknown OTEL_TRACES_EXPORTER: {settings.OTEL_TRACES_EXPORTER}")
+
+    trace.set_tracer_provider(provider)
+
+    from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+
+    FastAPIInstrumentor.instrument_app(app, excluded_urls="livez,readyz,health,metrics")
+    logger.info(f"Tracing enabled with {exporter_name} exporter")
+    return provider
+
+
+def get_memory_exporter():
+    """Return the in-memory exporter when OTEL_TRACES_EXPORTER=memory"""
+    return _memory_exporter
+
+
+def start_span(name: str, kind: SpanKind = SpanKind.INTERNAL, attributes: Optional[Dict] = None):
+    return tracer.start_as_current_span(name, kind=kind, attributes=attributes)
+
+
+def set_span_attribute(key: str, value):
+    trace.get_current_span().set_attribute(key, value)
+
+
+def inject_context() -> Dict[str, str]:
+    """Serialize the current trace context, e.g. to put it on a queue item"""
+    carrier: Dict[str, str] = {}
+    propagate.inject(carrier)
+    return carrier
+
+
+@contextmanager
+def attached_context(carrier: Optional[Dict[str, str]]):
+    """Run a block under the trace context captured by inject_context()"""
+    if not carrier:
+        yield
+        return
+    token = context.attach(propagate.extract(carrier))
+    try:
+        yield
+    finally:
+        context.detach(token)
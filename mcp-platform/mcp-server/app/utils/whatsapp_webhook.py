@@ -0,0 +1,90 @@
+from typing import List, Optional, Tuple, Union
+
+import msgspec
+
+
+class Profile(msgspec.Struct):
+    name: Optional[str] = None
+
+
+class Contact(msgspec.Struct):
+    wa_id: Optional[str] = None
+    profile: Optional[Profile] = None
+
+
+class Text(msgspec.Struct):
+    body: Optional[str] = None
+
+
+class Reply(msgspec.Struct):
+    id: str
+    title: Optional[str] = None
+
+
+class Interactive(msgspec.Struct):
+    type: str
+    button_reply: Optional[Reply] = None
+    list_reply: Optional[Reply] = None
+
+
+class Message(msgspec.Struct):
+    id: str
+    from_: str = msgspec.field(name="from")
+    type: str
+    timestamp: Union[str, int, None] = None
+    text: Optional[Text] = None
+    interactive: Optional[Interactive] = None
+
+
+class Value(msgspec.Struct):
+    messaging_product: Optional[str] = None
+    contacts: Optional[List[Contact]] = None
+    messages: Optional[List[Message]] = None
+
+
+class Change(msgspec.Struct):
+    field: Optional[str] = None
+    value: Optional[Value] = None
+
+
+class Entry(msgspec.Struct):
+    id: Optional[str] = None
+    changes: Optional[List[Change]] = None
+
+
+class WebhookPayload(msgspec.Struct):
+    """WhatsApp Cloud API webhook body.
+
+    Only the fields the server reads are declared; msgspec skips the rest
+    while decoding, so the body goes from bytes to structs in one pass
+    without building the intermediate dicts of json.loads. Optional fields
+    accept both a missing key and an explicit null, like the .get() calls
+    of the dict parser did; callers coalesce them.
+    """
+
+    object: Optional[str] = None
+    entry: Optional[List[Entry]] = None
+
+
+_decoder = msgspec.json.Decoder(WebhookPayload)
+
+# Errors raised for bodies that are not JSON or do not match the schema
+DecodeError = msgspec.DecodeError
+
+
+def decode_webhook(body: Union[bytes, str, dict]) -> WebhookPayload:
+    """Decode a raw webhook body (or an already parsed dict) into a WebhookPayload"""
+    if isinstance(body, dict):
+        return msgspec.convert(body, WebhookPayload)
+    return _decoder.decode(body)
+
+
+def first_message(payload: WebhookPayload) -> Optional[Tuple[Message, Optional[Contact]]]:
+    """(message, contact) of the first change that carries a message"""
+    for entry in payload.entry or ():
+        for change in entry.changes or ():
+            value = change.value
+            if value is not None and value.messages:
+                contact = value.contacts[0] if value.contacts else None
+                return value.messages[0], contact
+    return None
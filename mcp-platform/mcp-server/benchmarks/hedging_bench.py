@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+MCP Server - Hedged request benchmark
+Starts a local fake Calendar API that answers in ~--base-ms, with a fraction
+--slow-fraction of the requests delayed by --slow-ms, and sends the same load
+through the calendar resilience policy (thread pool + one connection per
+thread, like CalendarService) with hedging off and on. Reports latency
+percentiles and how many extra requests the hedges cost.
+
+Usage (from mcp-server/):
+    python benchmarks/hedging_bench.py --requests 2000 --concurrency 8 [--slow-fraction 0.02 --slow-ms 1000]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from startup_profile import PLACEHOLDER_ENV, SERVER_DIR  # noqa: E402
+
+for key, value in PLACEHOLDER_ENV.items():
+    os.environ.setdefault(key, value)
+sys.path.insert(0, str(SERVER_DIR))
+
+import httplib2  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.utils.services.resilience import Dependency  # noqa: E402
+
+
+class FakeCalendar(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, base_ms, slow_fraction, slow_ms):
+        super().__init__(("127.0.0.1", 0), FakeCalendarHandler)
+        self.base_ms = base_ms
+        self.slow_fraction = slow_fraction
+        self.slow_ms = slow_ms
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def latency(self):
+        with self._lock:
+            self.requests += 1
+        latency_ms = random.uniform(0.5, 1.5) * self.base_ms
+        if random.random() < self.slow_fraction:
+            latency_ms += self.slow_ms
+        return latency_ms / 1000
+
+
+class FakeCalendarHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        time.sleep(self.server.latency())
+        body = json.dumps({"kind": "calendar#events", "items": []}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+async def run_load(dependency, url, total, concurrency, threads, hedge):
+    executor = ThreadPoolExecutor(max_workers=threads)
+    local = threading.local()
+    loop = asyncio.get_running_loop()
+
+    def fetch():
+        http = getattr(local, "http", None)
+        if http is None:
+            http = local.http = httplib2.Http(timeout=dependency.timeout)
+        response, content = http.request(url, "GET")
+        return json.loads(content)
+
+    latencies = []
+    remaining = total
+
+    async def client():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            await dependency.call("events.list", lambda: loop.run_in_executor(executor, fetch), hedge=hedge)
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    executor.shutdown(wait=True)
+    return sorted(latencies)
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def benchmark(server, url, args, hedged):
+    settings.HEDGE_ENABLED = hedged
+    settings.HEDGE_PERCENTILE = args.percentile
+    dependency = Dependency("calendar", lambda e: False)
+    # Warm-up fills the latency window the hedge delay is computed from
+    asyncio.run(run_load(dependency, url, args.warmup, args.concurrency, args.concurrency * 2, hedged))
+
+    before = server.requests
+    latencies = asyncio.run(run_load(dependency, url, args.requests, args.concurrency, args.concurrency * 2, hedged))
+    sent = server.requests - before
+    return {
+        "mode": f"hedged (p{args.percentile * 100:g})" if hedged else "no hedging",
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "p999_ms": percentile(latencies, 0.999) * 1000,
+        "extra": sent / args.requests - 1,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP Server hedged request benchmark")
+    parser.add_argument("--requests", type=int, default=2000, help="Measured requests per mode")
+    parser.add_argument("--warmup", type=int, default=200, help="Warm-up requests per mode")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent callers")
+    parser.add_argument("--base-ms", type=float, default=20.0, help="Typical fake Calendar latency")
+    parser.add_argument("--slow-fraction", type=float, default=0.02, help="Share of requests that are slow")
+    parser.add_argument("--slow-ms", type=float, default=1000.0, help="Extra latency of slow requests")
+    parser.add_argument("--percentile", type=float, default=settings.HEDGE_PERCENTILE, help="Hedge delay percentile")
+    parser.add_argument("--output", help="Write the markdown report to this file")
+    args = parser.parse_args()
+
+    server = FakeCalendar(args.base_ms, args.slow_fraction, args.slow_ms)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/calendar/v3/calendars/primary/events"
+
+    lines = ["# MCP Server hedged requests", ""]
+    lines.append(f"Fake Calendar: ~{args.base_ms:.0f} ms, {args.slow_fraction:.1%} of requests +{args.slow_ms:.0f} ms; "
+                 f"{args.requests} requests, {args.concurrency} concurrent callers, "
+                 f"hedge budget {settings.HEDGE_BUDGET_RATIO:.0%}")
+    lines.append("")
+    lines.append("| mode | p50 (ms) | p95 (ms) | p99 (ms) | p99.9 (ms) | extra requests |")
+    lines.append("|---|---|---|---|---|---|")
+    for hedged in (False, True):
+        result = benchmark(server, url, args, hedged)
+        lines.append(
+            f"| {result['mode']} | {result['p50_ms']:.1f} | {result['p95_ms']:.1f} | "
+            f"{result['p99_ms']:.1f} | {result['p999_ms']:.1f} | {result['extra']:.1%} |"
+        )
+    server.shutdown()
+
+    report = "\n".join(lines) + "\n"
+    if args.output:
+        Path(args.output).write_text(report)
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
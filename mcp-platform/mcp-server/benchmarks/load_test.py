@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+MCP Server - Load test
+Starts the server under gunicorn (gunicorn.conf.py) with each worker count,
+drives a closed-loop load against one endpoint and reports throughput and
+latency percentiles, to show how throughput scales with workers.
+
+Usage (from mcp-server/):
+    python benchmarks/load_test.py --workers 1 2 4 --concurrency 64 --duration 10 [--path /health]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from startup_profile import SERVER_DIR, build_env, free_port  # noqa: E402
+
+
+def wait_until_up(port, timeout=60.0):
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/livez", timeout=1) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.1)
+    raise TimeoutError(f"Server did not start within {timeout}s")
+
+
+async def _drive(url, concurrency, duration):
+    import aiohttp
+
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def client(session):
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                async with session.get(url) as response:
+                    await response.read()
+                    if response.status >= 500:
+                        errors += 1
+            except aiohttp.ClientError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        await asyncio.gather(*(client(session) for _ in range(concurrency)))
+    return latencies, errors
+
+
+def _generator(args):
+    url, concurrency, duration = args
+    return asyncio.run(_drive(url, concurrency, duration))
+
+
+def run_load(url, concurrency, duration, generators):
+    """Split the connections across `generators` processes so the client is not the bottleneck"""
+    per_generator = max(1, concurrency // generators)
+    with multiprocessing.Pool(generators) as pool:
+        results = pool.map(_generator, [(url, per_generator, duration)] * generators)
+    latencies = sorted(latency for result, _ in results for latency in result)
+    errors = sum(errors for _, errors in results)
+    return latencies, errors
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def benchmark(workers, args, env):
+    port = free_port()
+    process_env = dict(env, WEB_CONCURRENCY=str(workers), PORT=str(port))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app"],
+        cwd=SERVER_DIR, env=process_env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_until_up(port)
+        url = f"http://127.0.0.1:{port}{args.path}"
+        # Warm-up so every worker has served requests before measuring
+        run_load(url, args.concurrency, 1.0, args.generators)
+        latencies, errors = run_load(url, args.concurrency, args.duration, args.generators)
+    finally:
+        process.terminate()
+        process.wait()
+
+    return {
+        "workers": workers,
+        "rps": len(latencies) / args.duration,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP Server load test")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Worker counts to benchmark")
+    parser.add_argument("--path", default="/health", help="Endpoint to load")
+    parser.add_argument("--concurrency", type=int, default=64, help="Concurrent connections")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per measurement")
+    parser.add_argument("--generators", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="Load generator processes")
+    parser.add_argument("--output", help="Write the markdown report to this file")
+    args = parser.parse_args()
+
+    env = build_env()
+    lines = ["# MCP Server load test", ""]
+    lines.append(f"`GET {args.path}`, {args.concurrency} connections, {args.duration:.0f}s per run, "
+                 f"{args.generators} generator processes, {os.cpu_count()} CPUs")
+    lines.append("")
+    lines.append("| workers | req/s | speedup | p50 (ms) | p99 (ms) | errors |")
+    lines.append("|---|---|---|---|---|---|")
+
+    baseline = None
+    for workers in args.workers:
+        result = benchmark(workers, args, env)
+        baseline = baseline or result["rps"]
+        speedup = result["rps"] / baseline if baseline else 0.0
+        lines.append(
+            f"| {workers} | {result['rps']:.0f} | {speedup:.2f}x | "
+            f"{result['p50_ms']:.1f} | {result['p99_ms']:.1f} | {result['errors']} |"
+        )
+
+    report = "\n".join(lines) + "\n"
+    if args.output:
+        Path(args.output).write_text(report)
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
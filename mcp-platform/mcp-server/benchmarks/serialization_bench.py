@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+MCP Server - Serialization microbenchmark
+Decodes WhatsApp webhook bodies the old way (json.loads + dict walking), with
+orjson + dict walking and with the msgspec structs used by
+parse_webhook_message, and encodes typical responses (chat, health, a page of
+/appointments/list) with the stdlib json settings of Starlette's
+JSONResponse, orjson (ORJSONResponse) and msgspec. Reports microseconds per
+payload.
+
+Usage (from mcp-server/):
+    python benchmarks/serialization_bench.py [--min-time 0.2] [--output report.md]
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from startup_profile import PLACEHOLDER_ENV, SERVER_DIR  # noqa: E402
+
+for key, value in PLACEHOLDER_ENV.items():
+    os.environ.setdefault(key, value)
+sys.path.insert(0, str(SERVER_DIR))
+
+import msgspec  # noqa: E402
+import orjson  # noqa: E402
+
+from app.models import AppointmentListResponse  # noqa: E402
+from app.utils.whatsapp_webhook import decode_webhook, first_message  # noqa: E402
+
+
+def webhook(messages=None, statuses=None):
+    value = {
+        "messaging_product": "whatsapp",
+        "metadata": {"display_phone_number": "5511999990000", "phone_number_id": "123456789012345"},
+    }
+    if messages is not None:
+        value["contacts"] = [{"profile": {"name": "Maria Silva"}, "wa_id": "5511988887777"}]
+        value["messages"] = messages
+    if statuses is not None:
+        value["statuses"] = statuses
+    return json.dumps({
+        "object": "whatsapp_business_account",
+        "entry": [{"id": "987654321098765", "changes": [{"value": value, "field": "messages"}]}],
+    }).encode()
+
+
+def webhook_payloads():
+    base = {"from": "5511988887777", "id": "wamid.HBgNNTUxMTk4ODg4Nzc3NxUCABIYFDNBQjM0", "timestamp": "1734700000"}
+    statuses = [
+        {
+            "id": f"wamid.HBgNNTUxMTk4ODg4Nzc3NxUCABEYEjQ{i:04d}",
+            "status": "delivered",
+            "timestamp": "1734700000",
+            "recipient_id": "5511988887777",
+            "conversation": {"id": f"conv-{i}", "origin": {"type": "utility"}},
+            "pricing": {"billable": True, "pricing_model": "CBP", "category": "utility"},
+        }
+        for i in range(20)
+    ]
+    return {
+        "webhook text": webhook(messages=[{**base, "type": "text", "text": {"body": "Oi, queria marcar um corte amanhã às 15h"}}]),
+        "webhook button": webhook(messages=[{
+            **base,
+            "type": "interactive",
+            "interactive": {"type": "button_reply", "button_reply": {"id": "confirm_appointment", "title": "Confirmar"}},
+        }]),
+        "webhook 20 statuses": webhook(statuses=statuses),
+    }
+
+
+def walk(webhook_data):
+    """parse_webhook_message before the msgspec structs"""
+    entry = webhook_data.get("entry", [{}])[0]
+    changes = entry.get("changes", [{}])[0]
+    value = changes.get("value", {})
+    messages = value.get("messages", [])
+    if not messages:
+        return None
+    message = messages[0]
+    contact = value.get("contacts", [{}])[0]
+    parsed = {
+        "message_id": message.get("id"),
+        "from": message.get("from"),
+        "timestamp": datetime.fromtimestamp(int(message.get("timestamp", 0))),
+        "type": message.get("type"),
+        "contact_name": contact.get("profile", {}).get("name", "Unknown"),
+    }
+    if message["type"] == "text":
+        parsed["text"] = message.get("text", {}).get("body", "")
+    elif message["type"] == "interactive":
+        parsed["interactive"] = message.get("interactive", {})
+        if message["interactive"]["type"] == "button_reply":
+            parsed["button_id"] = message["interactive"]["button_reply"]["id"]
+            parsed["button_title"] = message["interactive"]["button_reply"]["title"]
+    return parsed
+
+
+def structs(body):
+    """Decoding part of parse_webhook_message"""
+    found = first_message(decode_webhook(body))
+    if found is None:
+        return None
+    message, contact = found
+    return message, contact, datetime.fromtimestamp(int(message.timestamp))
+
+
+def response_payloads():
+    start = datetime(2024, 12, 2, 9, 0)
+    page = AppointmentListResponse(
+        appointments=[
+            {
+                "id": f"evt{i:06d}",
+                "customer_name": f"Cliente {i}",
+                "customer_phone": f"55119{i:08d}",
+                "service_type": "Corte de cabelo",
+                "notes": "Prefere máquina 2 nas laterais" if i % 3 == 0 else None,
+                "start_time": start + timedelta(minutes=30 * i),
+                "end_time": start + timedelta(minutes=30 * i + 30),
+                "status": "confirmed",
+                "created_at": start - timedelta(days=3),
+                "updated_at": None,
+            }
+            for i in range(250)
+        ],
+        page_size=250,
+        next_cursor="eyJzb3VyY2UiOiJjYWxlbmRhciIsInBhZ2VfdG9rZW4iOiJDaWdLR2pWMGJHWnVOMjVyIn0",
+    )
+    return {
+        "chat response": {
+            "response": "Temos horários disponíveis amanhã:\n- 09:00 às 09:30\n- 10:30 às 11:00\n\nQual horário você prefere?",
+            "user_id": "5511988887777",
+            "processed": True,
+        },
+        "health": {
+            "status": "saudável",
+            "services": {"redis": "healthy", "database": "healthy", "calendar": "healthy", "gemini": "healthy", "whatsapp": "healthy"},
+        },
+        # What FastAPI hands to the response class for a response_model
+        "appointments page (250)": page.model_dump(mode="json"),
+    }
+
+
+def stdlib_dumps(content):
+    """Starlette JSONResponse.render"""
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+DECODERS = {
+    "json.loads + dict walk": lambda body: walk(json.loads(body)),
+    "orjson.loads + dict walk": lambda body: walk(orjson.loads(body)),
+    "msgspec structs": structs,
+}
+
+ENCODERS = {
+    "json.dumps (JSONResponse)": stdlib_dumps,
+    "orjson (ORJSONResponse)": orjson.dumps,
+    "msgspec.json.encode": msgspec.json.encode,
+}
+
+
+def measure(func, arg, min_time):
+    timer = timeit.Timer(lambda: func(arg))
+    number, _ = timer.autorange()
+    runs = max(3, int(min_time / max(timer.timeit(number) / number, 1e-9) / number))
+    best = min(timer.repeat(repeat=runs, number=number)) / number
+    return best * 1e6
+
+
+def table(title, payloads, functions, min_time):
+    names = list(functions)
+    lines = [f"## {title}", "", "| payload | bytes | " + " | ".join(f"{name} (µs)" for name in names) + " | speedup |"]
+    lines.append("|---|---|" + "---|" * len(names) + "---|")
+    for label, payload in payloads.items():
+        size = len(payload) if isinstance(payload, bytes) else len(stdlib_dumps(payload))
+        timings = [measure(functions[name], payload, min_time) for name in names]
+        cells = " | ".join(f"{timing:.2f}" for timing in timings)
+        lines.append(f"| {label} | {size} | {cells} | {timings[0] / min(timings[1:]):.1f}x |")
+    lines.append("")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP Server serialization microbenchmark")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds spent per payload and codec")
+    parser.add_argument("--output", help="Write the markdown report to this file")
+    args = parser.parse_args()
+
+    # Same results from every decoder before timing them
+    for body in webhook_payloads().values():
+        legacy, typed = walk(json.loads(body)), structs(body)
+        assert (legacy is None) == (typed is None)
+        if typed is not None:
+            message, _, timestamp = typed
+            assert (legacy["message_id"], legacy["from"], legacy["timestamp"]) == (message.id, message.from_, timestamp)
+
+    lines = ["# MCP Server serialization", "", f"Python {sys.version.split()[0]}, orjson {orjson.__version__}, msgspec {msgspec.__version__}", ""]
+    lines += table("Decode (webhook body -> parsed message)", webhook_payloads(), DECODERS, args.min_time)
+    lines += table("Encode (response content -> body)", response_payloads(), ENCODERS, args.min_time)
+
+    report = "\n".join(lines)
+    if args.output:
+        Path(args.output).write_text(report)
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
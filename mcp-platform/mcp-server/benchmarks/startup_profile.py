@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+MCP Server - Startup profile
+Measures import time (-X importtime), cold start until the first successful
+response and resident memory (RSS) of the server process.
+
+Usage (from mcp-server/):
+    python benchmarks/startup_profile.py [--top 25] [--output report.md]
+"""
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+SERVER_DIR = Path(__file__).resolve().parent.parent
+
+# Placeholder settings so app.config.Settings can be instantiated
+PLACEHOLDER_ENV = {
+    "CLIENT_NAME": "benchmark",
+    "DATABASE_HOST": "localhost",
+    "DATABASE_NAME": "mcp_platform",
+    "DATABASE_USER": "postgres",
+    "DATABASE_PASSWORD": "postgres",
+    "GOOGLE_CALENDAR_ID": "benchmark@group.calendar.google.com",
+    "GOOGLE_PROJECT_ID": "benchmark",
+    "GOOGLE_PRIVATE_KEY": "benchmark",
+    "GOOGLE_CLIENT_EMAIL": "benchmark@benchmark.iam.gserviceaccount.com",
+    "GEMINI_API_KEY": "benchmark",
+    "WHATSAPP_API_TOKEN": "benchmark",
+    "WHATSAPP_PHONE_NUMBER_ID": "0",
+    "REDIS_HOST": "localhost",
+}
+
+# Modules that should NOT be imported just to serve /health
+HEAVY_MODULES = [
+    "google.generativeai",
+    "googleapiclient",
+    "aiohttp",
+    "asyncpg",
+    "pytz",
+]
+
+
+def build_env():
+    env = dict(os.environ)
+    for key, value in PLACEHOLDER_ENV.items():
+        env.setdefault(key, value)
+    env["PYTHONPATH"] = str(SERVER_DIR)
+    return env
+
+
+def profile_imports(module, env):
+    """Run `python -X importtime -c 'import <module>'` and parse the report"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SERVER_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Import of {module} failed:\n{result.stderr[-2000:]}")
+
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.split(":", 1)[1].split("|")
+        imports.append((name.strip(), int(self_us), int(cumulative_us)))
+    return imports
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def read_rss_kb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except FileNotFoundError:
+        pass
+    return None
+
+
+def measure_cold_start(env, path="/", timeout=60.0):
+    """Start uvicorn and poll `path` until it answers 200"""
+    port = free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=SERVER_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}{path}", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started, read_rss_kb(process.pid)
+            except OSError:
+                time.sleep(0.02)
+        raise TimeoutError(f"Server did not answer {path} within {timeout}s")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP Server startup profile")
+    parser.add_argument("--top", type=int, default=25, help="Number of imports to list")
+    parser.add_argument("--path", default="/", help="Endpoint polled for the cold start measurement")
+    parser.add_argument("--output", help="Write the markdown report to this file")
+    args = parser.parse_args()
+
+    env = build_env()
+    imports = profile_imports("app.main", env)
+    imported = {name for name, _, _ in imports}
+    total_us = sum(self_us for _, self_us, _ in imports)
+
+    lines = ["# MCP Server startup profile", ""]
+    lines.append(f"Python {sys.version.split()[0]}, {len(imports)} modules, "
+                 f"total import time {total_us / 1000:.1f} ms")
+    lines.append("")
+    lines.append("## Slowest imports (cumulative)")
+    lines.append("")
+    lines.append("| module | self (ms) | cumulative (ms) |")
+    lines.append("|---|---|---|")
+    for name, self_us, cumulative_us in sorted(imports, key=lambda i: i[2], reverse=True)[:args.top]:
+        lines.append(f"| {name} | {self_us / 1000:.1f} | {cumulative_us / 1000:.1f} |")
+    lines.append("")
+    lines.append("## Heavy SDKs loaded by `import app.main`")
+    lines.append("")
+    for module in HEAVY_MODULES:
+        lines.append(f"- {module}: {'yes' if module in imported else 'no (deferred)'}")
+    lines.append("")
+
+    try:
+        cold_start, rss_kb = measure_cold_start(env, args.path)
+        lines.append("## Cold start")
+        lines.append("")
+        lines.append(f"- time to first 200 on `{args.path}`: {cold_start * 1000:.0f} ms")
+        if rss_kb is not None:
+            lines.append(f"- RSS after first response: {rss_kb / 1024:.1f} MiB")
+    except (TimeoutError, OSError) as e:
+        lines.append(f"Cold start measurement failed: {e}")
+
+    report = "\n".join(lines) + "\n"
+    if args.output:
+        Path(args.output).write_text(report)
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Gunicorn configuration for the production run mode.
+
+One UvicornWorker per available CPU. The count comes from WEB_CONCURRENCY
+if set, otherwise from the container CPU limit (CPU_LIMIT in millicores,
+injected by the deployment through resourceFieldRef, or the cgroup quota),
+falling back to os.cpu_count(). The app is imported once in the master
+(preload_app) and forked; Redis, the database pool and the HTTP session
+are created per worker in the FastAPI lifespan.
+"""
+
+import math
+import os
+import shutil
+
+# Prometheus multiprocess mode: each worker writes its samples here and
+# /metrics aggregates them. Must be set before prometheus_client is imported.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/mcp-prometheus")
+
+
+def _cpu_limit():
+    """CPU limit of the container in cores, or None when unlimited"""
+    millicores = os.environ.get("CPU_LIMIT")
+    if millicores:
+        return int(millicores) / 1000
+    try:
+        # cgroup v2: "<quota> <period>" or "max <period>"
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            return int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _workers():
+    if os.environ.get("WEB_CONCURRENCY"):
+        return int(os.environ["WEB_CONCURRENCY"])
+    cores = _cpu_limit() or os.cpu_count() or 1
+    return max(1, math.ceil(cores))
+
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = _workers()
+preload_app = True
+
+# Recycle workers gradually to bound memory growth; the jitter keeps them
+# from restarting at the same time
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", "1000"))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "60"))
+keepalive = 5
+
+accesslog = None
+errorlog = "-"
+
+
+def on_starting(server):
+    # Samples left over by a previous run would be aggregated into /metrics
+    multiproc_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(multiproc_dir, ignore_errors=True)
+    os.makedirs(multiproc_dir, exist_ok=True)
+    server.log.info(f"Starting {workers} workers")
+
+
+def post_fork(server, worker):
+    # The log listener thread started while preloading does not survive fork
+    from app.utils.logging_config import restart_after_fork
+
+    restart_after_fork()
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
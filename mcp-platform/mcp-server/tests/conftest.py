@@ -0,0 +1,279 @@
+import itertools
+import os
+import re
+import sqlite3
+import sys
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import httplib2
+import httpx
+import pytest
+import pytest_asyncio
+from fakeredis import aioredis
+
+SERVER_DIR = Path(__file__).resolve().parent.parent
+
+# Placeholder settings so app.config.Settings can be instantiated
+for key, value in {
+    "CLIENT_NAME": "test",
+    "DATABASE_HOST": "localhost",
+    "DATABASE_NAME": "mcp_platform",
+    "DATABASE_USER": "postgres",
+    "DATABASE_PASSWORD": "postgres",
+    "GOOGLE_CALENDAR_ID": "test@group.calendar.google.com",
+    "GOOGLE_PROJECT_ID": "test",
+    "GOOGLE_PRIVATE_KEY": "test",
+    "GOOGLE_CLIENT_EMAIL": "test@test.iam.gserviceaccount.com",
+    "GEMINI_API_KEY": "test",
+    "WHATSAPP_API_TOKEN": "test",
+    "WHATSAPP_PHONE_NUMBER_ID": "0",
+    "REDIS_HOST": "localhost",
+    # Finished spans kept in memory (app.utils.tracing.get_memory_exporter)
+    "OTEL_TRACES_EXPORTER": "memory",
+}.items():
+    os.environ.setdefault(key, value)
+
+sys.path.insert(0, str(SERVER_DIR))
+
+from googleapiclient.errors import HttpError  # noqa: E402
+
+from app.utils.services import resilience  # noqa: E402
+from app.utils.services.calendar_service import CalendarService  # noqa: E402
+from app.utils.services.slot_holds import SlotHolds  # noqa: E402
+
+
+def http_error(status: int, message: str = "error") -> HttpError:
+    return HttpError(httplib2.Response({"status": status}), f'{{"error": {{"message": "{message}"}}}}'.encode())
+
+
+class FakeRequest:
+    """A googleapiclient HttpRequest: executed by FakeCalendarApi"""
+
+    def __init__(self, api, method, params):
+        self.api = api
+        self.method = method
+        self.params = params
+        self.headers = {}
+
+    def execute(self, http=None):
+        return self.api.handle(self)
+
+
+class FakeBatch:
+    def __init__(self, api, callback):
+        self.api = api
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id):
+        self.requests.append((request_id, request))
+
+    def execute(self, http=None):
+        self.api.batches.append(len(self.requests))
+        if self.api.batch_errors:
+            raise self.api.batch_errors.pop(0)
+        for request_id, request in self.requests:
+            try:
+                self.callback(request_id, request.execute(), None)
+            except HttpError as e:
+                self.callback(request_id, None, e)
+
+
+class FakeEvents:
+    def __init__(self, api):
+        self.api = api
+
+    def __getattr__(self, method):
+        if method not in ("list", "get", "insert", "patch", "delete"):
+            raise AttributeError(method)
+        return lambda **params: FakeRequest(self.api, method, params)
+
+
+class FakeCalendarApi:
+    """In-memory stand-in for the Calendar v3 resource CalendarService builds.
+
+    Events live in `store` by id. `list` pages through them by start time
+    (`pageToken` is an offset); `patch` honours If-Match against the event
+    etag. `fail_next` queues errors for the next calls of a method on an
+    event. Every executed request is appended to `calls` as (method, event
+    id or page token), and the size of every batch to `batches`.
+    """
+
+    def __init__(self):
+        self.store = {}
+        self.fail = {}
+        self.batch_errors = []
+        self.calls = []
+        self.batches = []
+        self._ids = itertools.count(1)
+
+    def events(self):
+        return FakeEvents(self)
+
+    def add(self, event_id, start, end, summary="Corte - Maria", phone="5511988887777", status="confirmed"):
+        """Store an event; start/end are ISO datetimes, or dates for all-day events"""
+        key = "dateTime" if "T" in start else "date"
+        self.store[event_id] = {
+            "id": event_id,
+            "etag": '"1"',
+            "status": status,
+            "summary": summary,
+            "description": f"Cliente: {summary.partition(' - ')[2]}\nTelefone: {phone}\n",
+            "start": {key: start},
+            "end": {key: end},
+            "created": "2024-11-01T12:00:00.000Z",
+            "updated": "2024-11-01T12:00:00.000Z",
+        }
+        return self.store[event_id]
+
+    def fail_next(self, method, event_id, *statuses):
+        self.fail.setdefault((method, event_id), []).extend(http_error(status) for status in statuses)
+
+    def new_batch_http_request(self, callback):
+        return FakeBatch(self, callback)
+
+    def handle(self, request):
+        params = request.params
+        event_id = params.get("eventId")
+        self.calls.append((request.method, event_id or params.get("pageToken")))
+        errors = self.fail.get((request.method, event_id))
+        if errors:
+            raise errors.pop(0)
+        return getattr(self, f"_{request.method}")(request, params, event_id)
+
+    def _list(self, request, params, event_id):
+        ordered = sorted(self.store.values(), key=lambda event: event["start"].get("dateTime") or event["start"]["date"])
+        offset = int(params.get("pageToken") or 0)
+        size = params["maxResults"]
+        result = {"items": ordered[offset:offset + size]}
+        if offset + size < len(ordered):
+            result["nextPageToken"] = str(offset + size)
+        return result
+
+    def _get(self, request, params, event_id):
+        if event_id not in self.store:
+            raise http_error(404, "Not Found")
+        return self.store[event_id]
+
+    def _insert(self, request, params, event_id):
+        event_id = f"evt{next(self._ids)}"
+        self.store[event_id] = dict(params["body"], id=event_id, etag='"1"', htmlLink=f"https://calendar/{event_id}")
+        return self.store[event_id]
+
+    def _patch(self, request, params, event_id):
+        event = self._get(request, params, event_id)
+        if_match = request.headers.get("If-Match")
+        if if_match and if_match != event["etag"]:
+            raise http_error(412, "Precondition Failed")
+        version = int(event["etag"].strip('"')) + 1
+        event.update(params["body"], etag=f'"{version}"')
+        return event
+
+    def _delete(self, request, params, event_id):
+        if self.store.pop(event_id, None) is None:
+            raise http_error(410, "Gone")
+        return ""
+
+
+class FakePool:
+    """asyncpg pool over an in-memory SQLite `appointments` table.
+
+    `$n` placeholders become `?n`; timestamps are stored as ISO strings
+    (which sort like the datetimes) and read back as datetimes.
+    """
+
+    TIMESTAMPS = ("start_time", "end_time", "created_at", "updated_at")
+
+    def __init__(self):
+        self.db = sqlite3.connect(":memory:")
+        self.db.row_factory = sqlite3.Row
+        self.db.execute(
+            """
+            CREATE TABLE appointments (
+                id INTEGER PRIMARY KEY, client_name TEXT, appointment_id TEXT, customer_name TEXT,
+                customer_phone TEXT, service_type TEXT, start_time TEXT, end_time TEXT,
+                status TEXT, notes TEXT, created_at TEXT, updated_at TEXT
+            )
+            """
+        )
+        self.queries = []
+        self._ids = itertools.count(1)
+
+    def add(self, start_time, duration_minutes=30, status="confirmed", client_name="test", **fields):
+        row = {
+            "client_name": client_name,
+            "appointment_id": f"evt{next(self._ids)}",
+            "customer_name": "Maria",
+            "customer_phone": "5511988887777",
+            "service_type": "Corte",
+            "start_time": start_time,
+            "end_time": start_time + timedelta(minutes=duration_minutes),
+            "status": status,
+            "notes": None,
+            "created_at": start_time,
+            "updated_at": None,
+            **fields,
+        }
+        values = [value.isoformat() if isinstance(value, datetime) else value for value in row.values()]
+        cursor = self.db.execute(
+            f"INSERT INTO appointments ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})", values
+        )
+        return cursor.lastrowid
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self
+
+    async def fetch(self, query, *args):
+        self.queries.append((query, args))
+        query = re.sub(r"\$(\d+)", r"?\1", query)
+        values = [value.isoformat() if isinstance(value, datetime) else value for value in args]
+        rows = []
+        for row in self.db.execute(query, values):
+            row = dict(row)
+            for key in self.TIMESTAMPS:
+                if row.get(key):
+                    row[key] = datetime.fromisoformat(row[key])
+            rows.append(row)
+        return rows
+
+
+@pytest.fixture
+def redis():
+    return aioredis.FakeRedis()
+
+
+@pytest.fixture
+def db_pool():
+    return FakePool()
+
+
+@pytest.fixture
+def calendar_api():
+    return FakeCalendarApi()
+
+
+@pytest.fixture
+def calendar(monkeypatch, redis, calendar_api):
+    """CalendarService over FakeCalendarApi, with slot holds on fakeredis and fresh dependency policies"""
+    monkeypatch.setattr(resilience, "_dependencies", {})
+    monkeypatch.setattr(CalendarService, "_initialize_service", lambda self: calendar_api)
+    monkeypatch.setattr(CalendarService, "_http", lambda self: None)
+    service = CalendarService(holds=SlotHolds(redis))
+    yield service
+    service._executor.shutdown(wait=False)
+
+
+
+
+@pytest_asyncio.fixture
+async def client(monkeypatch, calendar, db_pool, redis):
+    """HTTP client of the app over the fake calendar, database and Redis (lifespan not run)"""
+    from app.main import app
+
+    for name, value in {"calendar_service": calendar, "db_pool": db_pool, "redis": redis}.items():
+        monkeypatch.setattr(app.state, name, value, raising=False)
+    async with httpx.AsyncClient(app=app, base_url="http://test", headers={"Authorization": "Bearer test"}) as http:
+        yield http
@@ -0,0 +1,139 @@
+from datetime import datetime
+
+import pytest
+
+from app.utils.services.appointment_store import (
+    AppointmentStore,
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+)
+
+DAY = datetime(2024, 12, 2)
+
+
+def at(hour, minute=0, day=DAY):
+    return day.replace(hour=hour, minute=minute)
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("database", {"start_time": "2024-12-02T09:00:00", "id": 7})
+
+    assert "=" not in cursor
+    assert decode_cursor("database", cursor) == {"start_time": "2024-12-02T09:00:00", "id": 7}
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", "bm90IGpzb24", encode_cursor("calendar", {"page_token": "x"})])
+def test_bad_cursors_are_rejected(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("database", cursor)
+
+
+@pytest.mark.asyncio
+async def test_malformed_position_is_rejected(db_pool):
+    cursor = encode_cursor("database", {"start_time": "yesterday", "id": 1})
+
+    with pytest.raises(InvalidCursorError):
+        await AppointmentStore(db_pool).list_page(DAY, cursor=cursor)
+
+
+@pytest.mark.asyncio
+async def test_pages_follow_start_time_then_id(db_pool):
+    # Three appointments share 09:00: the keyset must split them across pages without loss
+    for hour in (9, 9, 9, 8, 10):
+        db_pool.add(at(hour))
+    store = AppointmentStore(db_pool)
+
+    seen, cursor = [], None
+    while True:
+        items, cursor = await store.list_page(DAY, page_size=2, cursor=cursor)
+        seen += [(item["start_time"].hour, item["id"]) for item in items]
+        if cursor is None:
+            break
+
+    assert seen == [(8, "evt4"), (9, "evt1"), (9, "evt2"), (9, "evt3"), (10, "evt5")]
+    # One row beyond the page is read to detect the next page
+    assert db_pool.queries[0][1][-1] == 3
+
+
+@pytest.mark.asyncio
+async def test_exactly_full_page_has_no_next_cursor(db_pool):
+    db_pool.add(at(8))
+    db_pool.add(at(9))
+
+    items, cursor = await AppointmentStore(db_pool).list_page(DAY, page_size=2)
+
+    assert len(items) == 2
+    assert cursor is None
+
+
+@pytest.mark.asyncio
+async def test_filters(db_pool):
+    db_pool.add(at(8), status="cancelled")
+    db_pool.add(at(9), service_type="Barba")
+    db_pool.add(at(10), customer_phone="5511977776666")
+    db_pool.add(at(9, day=datetime(2024, 12, 3)))
+    db_pool.add(at(9), client_name="other")
+    store = AppointmentStore(db_pool)
+
+    async def start_hours(**filters):
+        items, _ = await store.list_page(DAY, **filters)
+        return [(item["start_time"].day, item["start_time"].hour) for item in items]
+
+    assert await start_hours() == [(2, 8), (2, 9), (2, 10), (3, 9)]
+    assert await start_hours(end=datetime(2024, 12, 3)) == [(2, 8), (2, 9), (2, 10)]
+    assert await start_hours(status="confirmed") == [(2, 9), (2, 10), (3, 9)]
+    assert await start_hours(service_type="Barba") == [(2, 9)]
+    assert await start_hours(phone="5511977776666") == [(2, 10)]
+
+
+@pytest.mark.asyncio
+async def test_list_endpoint_date_range_is_inclusive(client, db_pool):
+    for day in (1, 2, 3, 4):
+        db_pool.add(at(9, day=datetime(2024, 12, day)))
+
+    response = await client.get(
+        "/api/v1/appointments/list",
+        params={"source": "database", "date_from": "2024-12-02", "date_to": "2024-12-03"},
+    )
+
+    assert response.status_code == 200
+    assert [item["start_time"][:10] for item in response.json()["appointments"]] == ["2024-12-02", "2024-12-03"]
+
+
+@pytest.mark.asyncio
+async def test_list_endpoint_rejects_reversed_range(client):
+    response = await client.get(
+        "/api/v1/appointments/list", params={"date_from": "2024-12-03", "date_to": "2024-12-02"}
+    )
+
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_calendar_listing_includes_all_day_events(client, calendar_api):
+    calendar_api.add("all-day", "2024-12-02", "2024-12-03", summary="Folga - Equipe")
+    calendar_api.add("cut", "2024-12-02T09:00:00-03:00", "2024-12-02T09:30:00-03:00")
+
+    response = await client.get("/api/v1/appointments/list", params={"date": "2024-12-02"})
+
+    assert response.status_code == 200
+    appointments = response.json()["appointments"]
+    assert [item["id"] for item in appointments] == ["all-day", "cut"]
+    assert appointments[0]["start_time"] == "2024-12-02T00:00:00-03:00"
+    assert appointments[0]["end_time"] == "2024-12-03T00:00:00-03:00"
+
+
+@pytest.mark.asyncio
+async def test_calendar_cursor_carries_the_page_token(client, calendar_api):
+    for hour in (8, 9, 10):
+        calendar_api.add(f"evt{hour}", f"2024-12-02T{hour:02d}:00:00-03:00", f"2024-12-02T{hour:02d}:30:00-03:00")
+
+    first = (await client.get("/api/v1/appointments/list", params={"date": "2024-12-02", "page_size": 2})).json()
+    second = (await client.get(
+        "/api/v1/appointments/list", params={"date": "2024-12-02", "page_size": 2, "cursor": first["next_cursor"]}
+    )).json()
+
+    assert [item["id"] for item in first["appointments"]] == ["evt8", "evt9"]
+    assert [item["id"] for item in second["appointments"]] == ["evt10"]
+    assert second["next_cursor"] is None
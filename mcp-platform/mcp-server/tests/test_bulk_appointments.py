@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.utils.services.calendar_service import BATCH_LIMIT
+
+
+DAY = datetime(2024, 12, 2, 8)
+
+
+def appointment(start, phone="11988887777"):
+    return {
+        "start_time": start,
+        "end_time": start + timedelta(minutes=15),
+        "customer_name": "Maria",
+        "customer_phone": phone,
+        "service_type": "Corte",
+    }
+
+
+def as_json(item):
+    return {**item, "start_time": item["start_time"].isoformat(), "end_time": item["end_time"].isoformat()}
+
+
+@pytest.mark.asyncio
+async def test_requests_are_sent_in_batches_of_the_limit(calendar, calendar_api):
+    for index in range(BATCH_LIMIT * 2 + 20):
+        calendar_api.add(f"evt{index}", "2024-12-02T08:00:00", "2024-12-02T08:30:00")
+    requests = [calendar.service.events().get(calendarId="c", eventId=f"evt{index}") for index in range(len(calendar_api.store))]
+
+    responses = await calendar._execute_batch(requests, "events.get")
+
+    assert calendar_api.batches == [BATCH_LIMIT, BATCH_LIMIT, 20]
+    # Results come back in request order across batches
+    assert [event["id"] for event, _ in responses] == [f"evt{index}" for index in range(len(requests))]
+
+
+@pytest.mark.asyncio
+async def test_item_errors_are_collected_per_request(calendar, calendar_api):
+    calendar_api.add("a", "2024-12-02T08:00:00", "2024-12-02T08:30:00")
+    requests = [calendar.service.events().get(calendarId="c", eventId=event_id) for event_id in ("a", "missing")]
+
+    (event, error), (missing, missing_error) = await calendar._execute_batch(requests, "events.get")
+
+    assert event["id"] == "a" and error is None
+    assert missing is None and missing_error.status_code == 404
+    # Item errors do not count against the circuit breaker
+    assert not any(calendar.dependency.breaker.outcomes)
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_only_fails_its_own_items(calendar, calendar_api):
+    calendar_api.batch_errors.append(ConnectionError("reset"))
+    items = [appointment(DAY + timedelta(minutes=15 * index)) for index in range(BATCH_LIMIT + 10)]
+
+    results = await calendar.create_appointments(items)
+
+    assert [result["success"] for result in results] == [False] * BATCH_LIMIT + [True] * 10
+    assert results[0]["error"] == {"status": None, "message": "reset"}
+    assert len(calendar_api.store) == 10
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_reports_conflicts_per_item(client, calendar):
+    await calendar.get_available_slots(DAY, limit=1, owner="5511977776666")
+
+    response = await client.post(
+        "/api/v1/appointments/bulk/create", json={"appointments": [as_json(appointment(DAY)), as_json(appointment(DAY + timedelta(hours=2)))]}
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["succeeded"], body["failed"]) == (1, 1)
+    assert body["results"][0]["error"]["status"] == 409
+    assert body["results"][1]["success"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_reports_conflicts_per_item(client, calendar, calendar_api):
+    calendar_api.add("a", "2024-12-02T10:00:00", "2024-12-02T10:30:00")
+    calendar_api.add("b", "2024-12-02T11:00:00", "2024-12-02T11:30:00")
+    await calendar.create_appointment(DAY, DAY + timedelta(minutes=30), "Ana", "11955554444", "Corte")
+
+    response = await client.post("/api/v1/appointments/bulk/update", json={"updates": [
+        {"id": "a", "start_time": "2024-12-02T08:00:00", "end_time": "2024-12-02T08:30:00"},
+        {"id": "b", "notes": "Trazer referência"},
+    ]})
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results[0] == {"id": "a", "success": False, "error": {"status": 409, "message": "Time slot is no longer available (busy)"}}
+    assert results[1]["success"]
+    assert calendar_api.store["b"]["description"].endswith("Atualização: Trazer referência")
@@ -0,0 +1,122 @@
+import asyncio
+from contextlib import aclosing
+from datetime import datetime
+
+import pytest
+
+from app.utils.services.calendar_service import MAX_PATCH_ATTEMPTS, AppointmentConflictError
+
+
+@pytest.fixture
+def event(calendar_api):
+    return calendar_api.add("a", "2024-12-02T09:00:00", "2024-12-02T09:30:00")
+
+
+@pytest.mark.asyncio
+async def test_time_change_is_a_single_patch(calendar, calendar_api, event):
+    result = await calendar.update_appointment("a", datetime(2024, 12, 2, 10), datetime(2024, 12, 2, 10, 30))
+
+    assert calendar_api.calls == [("patch", "a")]
+    assert result["etag"] == '"2"'
+    assert event["start"]["dateTime"] == "2024-12-02T10:00:00"
+
+
+@pytest.mark.asyncio
+async def test_notes_are_reread_after_a_concurrent_change(calendar, calendar_api, event):
+    calendar_api.fail_next("patch", "a", 412)
+
+    result = await calendar.update_appointment("a", notes="Chega 10 min antes")
+
+    assert calendar_api.calls == [("get", "a"), ("patch", "a"), ("get", "a"), ("patch", "a")]
+    assert result["updated"]
+    assert event["description"].endswith("Atualização: Chega 10 min antes")
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_patch_attempts(calendar, calendar_api, event):
+    calendar_api.fail_next("patch", "a", *[412] * MAX_PATCH_ATTEMPTS)
+
+    with pytest.raises(AppointmentConflictError):
+        await calendar.update_appointment("a", notes="Chega 10 min antes")
+
+    assert calendar_api.calls.count(("patch", "a")) == MAX_PATCH_ATTEMPTS
+
+
+@pytest.mark.asyncio
+async def test_caller_etag_mismatch_is_not_retried(calendar, calendar_api, event):
+    with pytest.raises(AppointmentConflictError):
+        await calendar.update_appointment("a", notes="Chega 10 min antes", etag='"0"')
+
+    assert calendar_api.calls == [("get", "a"), ("patch", "a")]
+
+
+@pytest.mark.asyncio
+async def test_patch_endpoint_answers_409_on_stale_if_match(client, calendar_api, event):
+    response = await client.patch(
+        "/api/v1/appointments/a", json={"notes": "Chega 10 min antes"}, headers={"If-Match": '"0"'}
+    )
+
+    assert response.status_code == 409
+
+
+@pytest.fixture
+def events(calendar_api):
+    for hour in range(8, 15):
+        calendar_api.add(f"evt{hour}", f"2024-12-02T{hour:02d}:00:00", f"2024-12-02T{hour:02d}:30:00")
+
+
+@pytest.mark.asyncio
+async def test_pages_are_followed_in_order(calendar, calendar_api, events):
+    pages = [[event["id"] for event in page] async for page in calendar.iter_event_pages(page_size=2)]
+
+    assert pages == [["evt8", "evt9"], ["evt10", "evt11"], ["evt12", "evt13"], ["evt14"]]
+    assert calendar_api.calls == [("list", None), ("list", "2"), ("list", "4"), ("list", "6")]
+
+
+@pytest.mark.asyncio
+async def test_next_page_is_prefetched(calendar, calendar_api, events):
+    async with aclosing(calendar.iter_event_pages(page_size=2)) as pages:
+        await pages.__anext__()
+        # The caller is still on the first page
+        await asyncio.sleep(0.05)
+        assert calendar_api.calls == [("list", None), ("list", "2")]
+
+
+@pytest.mark.asyncio
+async def test_leaving_early_downloads_no_further_pages(calendar, calendar_api, events):
+    seen = []
+    stream = calendar.iter_events(page_size=2)
+    async with aclosing(stream):
+        async for event in stream:
+            seen.append(event["id"])
+            if len(seen) == 3:
+                break
+    await asyncio.sleep(0.05)
+
+    assert seen == ["evt8", "evt9", "evt10"]
+    # At most page 3 (prefetched while page 2 was read); never past it
+    assert calendar_api.calls[:2] == [("list", None), ("list", "2")]
+    assert set(calendar_api.calls[2:]) <= {("list", "4")}
+
+
+@pytest.mark.asyncio
+async def test_closing_cancels_the_pending_prefetch(calendar, calendar_api, events, monkeypatch):
+    started = asyncio.Event()
+    release = asyncio.Event()
+    pages_requested = []
+
+    async def slow_execute(request, operation, idempotent=True, hedge=False):
+        pages_requested.append(request.params.get("pageToken"))
+        if request.params.get("pageToken"):
+            started.set()
+            await release.wait()
+        return calendar_api.handle(request)
+
+    monkeypatch.setattr(calendar, "_execute", slow_execute)
+    pages = calendar.iter_event_pages(page_size=2)
+    await pages.__anext__()
+    await started.wait()
+    await pages.aclose()
+
+    assert pages_requested == [None, "2"]
+    assert calendar_api.calls == [("list", None)]
@@ -0,0 +1,49 @@
+import json
+import logging
+
+from app.utils.logging_config import JsonFormatter, RedactionFilter
+
+PHONE = "5511988887777"
+
+
+def make_record(msg, args=(), **extra):
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, msg, args, None)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+def render(record):
+    assert RedactionFilter().filter(record)
+    return JsonFormatter().format(record)
+
+
+def test_phone_in_args_is_redacted():
+    output = render(make_record("Message from %s: %s", (PHONE, "oi")))
+
+    assert PHONE not in output
+    assert json.loads(output)["message"] == "Message from ***7777: oi"
+
+
+def test_phone_in_extra_is_redacted():
+    output = render(make_record(
+        "Webhook received",
+        phone=PHONE,
+        recipient=int(PHONE),
+        payload={"to": f"+{PHONE}", "ids": [PHONE]},
+        attempts=3,
+    ))
+
+    entry = json.loads(output)
+    assert PHONE not in output
+    assert entry["phone"] == "***7777"
+    assert entry["recipient"] == "***7777"
+    assert entry["payload"] == {"to": "***7777", "ids": ["***7777"]}
+    assert entry["attempts"] == 3
+
+
+def test_message_bodies_and_tokens_are_redacted():
+    output = render(make_record('Payload %s', ('{"text": {"body": "meu CPF"}}, Bearer abc.def',)))
+
+    assert "meu CPF" not in output
+    assert "abc.def" not in output
@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+
+from app.utils.services.outbound_scheduler import OutboundScheduler, SchedulerStopped
+
+
+@pytest.fixture
+def scheduler():
+    return OutboundScheduler("123", messages_per_second=1000, max_concurrency=1, initial_concurrency=1)
+
+
+@pytest.mark.asyncio
+async def test_sends_are_tracked_until_done(scheduler):
+
+    async def send():
+        return 200, {"ok": True}, None
+
+    assert await scheduler.submit("send_message", send) == (200, {"ok": True})
+    await asyncio.sleep(0)
+    assert not scheduler._sends
+    assert scheduler.in_flight == 0
+    await scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_stop_fails_in_flight_and_queued_callers(scheduler):
+    started = asyncio.Event()
+
+    async def hang():
+        started.set()
+        await asyncio.sleep(3600)
+
+    in_flight = asyncio.create_task(scheduler.submit("send_message", hang))
+    queued = [asyncio.create_task(scheduler.submit("send_message", hang)) for _ in range(3)]
+    await started.wait()
+
+    await asyncio.wait_for(scheduler.stop(), timeout=1)
+
+    for task in [in_flight, *queued]:
+        with pytest.raises(SchedulerStopped):
+            await asyncio.wait_for(task, timeout=1)
+    assert scheduler.in_flight == 0
+    assert not scheduler._sends
+
+
+@pytest.mark.asyncio
+async def test_send_error_releases_the_slot(scheduler):
+
+    async def fail():
+        raise ConnectionError("boom")
+
+    async def send():
+        return 200, {}, None
+
+    with pytest.raises(ConnectionError):
+        await scheduler.submit("send_message", fail)
+    # Concurrency is 1: this would wait forever if the slot leaked
+    assert await asyncio.wait_for(scheduler.submit("send_message", send), timeout=1) == (200, {})
+    await scheduler.stop()
+
+
+def recorder(sent, *responses):
+    """send() that records when it ran and answers the given (status, body, retry hint) in turn, then 200"""
+    responses = list(responses)
+
+    async def send():
+        sent.append(asyncio.get_running_loop().time())
+        return responses.pop(0) if responses else (200, {}, None)
+
+    return send
+
+
+@pytest.mark.asyncio
+async def test_workers_share_the_send_budget(redis):
+    # Two workers sending for the same number
+    workers = [OutboundScheduler("123", messages_per_second=20, max_concurrency=4, redis=redis) for _ in range(2)]
+    sent = []
+
+    await asyncio.gather(*(worker.submit("send_message", recorder(sent)) for worker in workers for _ in range(4)))
+
+    gaps = [later - earlier for earlier, later in zip(sorted(sent), sorted(sent)[1:])]
+    assert len(sent) == 8
+    assert min(gaps) >= 0.04
+    for worker in workers:
+        await worker.stop()
+
+
+@pytest.mark.asyncio
+async def test_throttle_pause_is_shared(redis):
+    workers = [OutboundScheduler("123", messages_per_second=1000, max_concurrency=4, redis=redis) for _ in range(2)]
+    sent = []
+
+    throttled = asyncio.create_task(workers[0].submit("send_message", recorder([], (429, {}, 0.3))))
+    await asyncio.sleep(0.05)
+    start = asyncio.get_running_loop().time()
+    await workers[1].submit("send_message", recorder(sent))
+
+    assert sent[0] - start >= 0.2
+    await throttled
+    for worker in workers:
+        await worker.stop()
+
+
+@pytest.mark.asyncio
+async def test_send_waits_for_a_pause_that_starts_during_its_turn():
+    scheduler = OutboundScheduler("123", messages_per_second=10, max_concurrency=2, initial_concurrency=2)
+    throttled, sent = [], []
+    start = asyncio.get_running_loop().time()
+
+    # The second job waits 0.1s for its turn; meanwhile the first is throttled for 0.3s
+    await asyncio.gather(
+        scheduler.submit("send_message", recorder(throttled, (429, {}, 0.3))),
+        scheduler.submit("send_message", recorder(sent)),
+    )
+
+    assert sent[0] - start >= 0.28
+    await scheduler.stop()
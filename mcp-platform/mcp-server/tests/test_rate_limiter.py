@@ -0,0 +1,97 @@
+import pytest
+from fakeredis import FakeServer, aioredis
+
+from app.config import settings
+from app.utils.services.rate_limiter import RateLimiter
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_TENANT_PER_MINUTE", 600)
+    monkeypatch.setattr(settings, "RATE_LIMIT_TENANT_BURST", 100)
+    monkeypatch.setattr(settings, "RATE_LIMIT_SENDER_PER_MINUTE", 10)
+    monkeypatch.setattr(settings, "RATE_LIMIT_SENDER_BURST", 5)
+    monkeypatch.setattr(settings, "RATE_LIMIT_SENDER_OVERRIDES", {})
+
+
+@pytest.mark.asyncio
+async def test_sender_burst_then_denied_with_retry_after(redis, limits):
+    limiter = RateLimiter(redis)
+
+    decisions = [await limiter.check("5511988887777", endpoint="webhook") for _ in range(6)]
+
+    assert [decision.allowed for decision in decisions] == [True] * 5 + [False]
+    assert decisions[-1].scope == "sender"
+    # 10 per minute: one token every 6s
+    assert 5.9 <= decisions[-1].retry_after <= 6.0
+
+
+@pytest.mark.asyncio
+async def test_senders_have_their_own_buckets(redis, limits):
+    limiter = RateLimiter(redis)
+    for _ in range(5):
+        await limiter.check("5511988887777", endpoint="webhook")
+
+    assert not (await limiter.check("5511988887777", endpoint="webhook")).allowed
+    assert (await limiter.check("5511977776666", endpoint="webhook")).allowed
+
+
+@pytest.mark.asyncio
+async def test_sender_override(redis, limits, monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_SENDER_OVERRIDES", {"vip": 6000})
+    monkeypatch.setattr(settings, "RATE_LIMIT_SENDER_BURST", 1)
+    limiter = RateLimiter(redis)
+
+    await limiter.check("vip", endpoint="chat")
+    denied = await limiter.check("vip", endpoint="chat")
+
+    assert denied.retry_after <= 0.01
+
+
+@pytest.mark.asyncio
+async def test_tenant_limit_is_shared_by_senders_and_per_tenant(redis, limits, monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_TENANT_BURST", 2)
+    limiter = RateLimiter(redis, tenant="barbearia")
+
+    decisions = [await limiter.check(sender, endpoint="webhook") for sender in ("a", "b", "c")]
+
+    assert [decision.allowed for decision in decisions] == [True, True, False]
+    assert decisions[-1].scope == "tenant"
+    assert (await RateLimiter(redis, tenant="salao").check("c", endpoint="webhook")).allowed
+
+
+@pytest.mark.asyncio
+async def test_denied_request_charges_no_level(redis, limits, monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_TENANT_BURST", 1)
+    limiter = RateLimiter(redis)
+    await limiter.check("a", endpoint="webhook")
+
+    assert not (await limiter.check("b", endpoint="webhook")).allowed
+    # The tenant refusal did not take b's sender token
+    assert await redis.hget("ratelimit:test:sender:b", "tokens") is None
+
+
+@pytest.mark.asyncio
+async def test_fails_open_without_redis(limits):
+    limiter = RateLimiter(None)
+
+    assert all([(await limiter.check("a", endpoint="webhook")).allowed for _ in range(10)])
+    assert not await limiter.should_notify("a")
+
+
+@pytest.mark.asyncio
+async def test_fails_open_when_redis_is_down(limits):
+    server = FakeServer()
+    server.connected = False
+    limiter = RateLimiter(aioredis.FakeRedis(server=server))
+
+    assert all([(await limiter.check("a", endpoint="webhook")).allowed for _ in range(10)])
+
+
+@pytest.mark.asyncio
+async def test_notice_once_per_window(redis, limits):
+    limiter = RateLimiter(redis)
+
+    assert await limiter.should_notify("a")
+    assert not await limiter.should_notify("a")
+    assert await limiter.should_notify("b")
@@ -0,0 +1,56 @@
+import asyncio
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from app.config import settings
+from app.utils.services.reminder_service import ReminderService
+
+
+@pytest.fixture
+def service(monkeypatch, redis):
+    monkeypatch.setattr(settings, "REMINDER_LOCK_TTL_SECONDS", 1)
+    return ReminderService(SimpleNamespace(redis=redis))
+
+
+@pytest.mark.asyncio
+async def test_campaign_stops_when_lock_is_taken_over(service, redis, monkeypatch):
+    stopped = asyncio.Event()
+
+    async def run(*args):
+        try:
+            await asyncio.sleep(3600)
+        finally:
+            stopped.set()
+
+    monkeypatch.setattr(service, "_run", run)
+    lock_key = service._key(service.campaign_id(date(2024, 12, 2), "database"), "lock")
+
+    campaign = asyncio.create_task(service.run_campaign(date(2024, 12, 2)))
+    await asyncio.sleep(0.1)
+    assert await redis.get(lock_key) is not None
+    # The lock expired and another worker took it
+    await redis.set(lock_key, "other-worker")
+
+    await asyncio.wait_for(campaign, timeout=2)
+    assert stopped.is_set()
+    assert await redis.get(lock_key) == b"other-worker"
+    assert await redis.pttl(lock_key) == -1
+
+
+@pytest.mark.asyncio
+async def test_lock_is_extended_while_running(service, redis, monkeypatch):
+    async def run(*args):
+        await asyncio.sleep(1.5)
+
+    monkeypatch.setattr(service, "_run", run)
+    lock_key = service._key(service.campaign_id(date(2024, 12, 2), "database"), "lock")
+
+    campaign = asyncio.create_task(service.run_campaign(date(2024, 12, 2)))
+    await asyncio.sleep(1.2)
+    # Past the 1s TTL: still held thanks to the refresher
+    assert await redis.get(lock_key) is not None
+
+    await asyncio.wait_for(campaign, timeout=2)
+    assert await redis.get(lock_key) is None
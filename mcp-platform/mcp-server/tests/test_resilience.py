@@ -0,0 +1,143 @@
+import asyncio
+from collections import deque
+
+import pytest
+
+from app.config import settings
+from app.utils.services.resilience import Dependency, Hedge, RetryBudget
+
+
+class Unavailable(Exception):
+    pass
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(settings, "RETRY_BASE_DELAY_SECONDS", 0.0)
+    monkeypatch.setattr(settings, "RETRY_MAX_DELAY_SECONDS", 0.0)
+
+
+@pytest.fixture
+def dependency():
+    return Dependency("test", lambda exc: isinstance(exc, Unavailable), timeout=1, max_attempts=3)
+
+
+@pytest.mark.asyncio
+async def test_last_attempt_does_not_spend_budget(dependency):
+    attempts = 0
+
+    async def fail():
+        nonlocal attempts
+        attempts += 1
+        raise Unavailable()
+
+    with pytest.raises(Unavailable):
+        await dependency.call("op", fail)
+
+    assert attempts == 3
+    # Only the two retries were taken from the budget
+    assert len(dependency.budget.retries) == 2
+
+
+@pytest.mark.asyncio
+async def test_non_idempotent_call_does_not_spend_budget(dependency):
+
+    async def fail():
+        raise Unavailable()
+
+    with pytest.raises(Unavailable):
+        await dependency.call("op", fail, idempotent=False)
+
+    assert not dependency.budget.retries
+
+
+@pytest.mark.asyncio
+async def test_permanent_errors_are_not_retried(dependency):
+    attempts = 0
+
+    async def fail():
+        nonlocal attempts
+        attempts += 1
+        raise ValueError()
+
+    with pytest.raises(ValueError):
+        await dependency.call("op", fail)
+
+    assert attempts == 1
+    assert not dependency.budget.retries
+
+
+@pytest.fixture
+def hedge(monkeypatch):
+    monkeypatch.setattr(settings, "HEDGE_MIN_SAMPLES", 3)
+    monkeypatch.setattr(settings, "HEDGE_MIN_DELAY_SECONDS", 0.01)
+    hedge = Hedge("test", percentile=0.5, budget_ratio=1.0)
+    # p50 of recent latencies: 20ms
+    hedge.latencies["op"] = deque([0.02] * 3)
+    return hedge
+
+
+def calls(*durations):
+    """func() whose n-th call takes durations[n] seconds; records starts and cancellations"""
+    log = {"started": 0, "cancelled": 0}
+
+    async def func():
+        index = log["started"]
+        log["started"] += 1
+        try:
+            await asyncio.sleep(durations[index])
+        except asyncio.CancelledError:
+            log["cancelled"] += 1
+            raise
+        return index
+
+    return func, log
+
+
+@pytest.mark.asyncio
+async def test_hedge_wins_and_the_primary_is_cancelled(hedge):
+    func, log = calls(1.0, 0.01)
+
+    assert await asyncio.wait_for(hedge.call("op", func), timeout=0.5) == 1
+    await asyncio.sleep(0)
+    assert log == {"started": 2, "cancelled": 1}
+
+
+@pytest.mark.asyncio
+async def test_fast_primary_is_not_hedged(hedge):
+    func, log = calls(0.001)
+
+    assert await hedge.call("op", func) == 0
+    assert log["started"] == 1
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_before_enough_samples(hedge):
+    hedge.latencies.clear()
+    func, log = calls(0.05, 0.0)
+
+    assert await hedge.call("op", func) == 0
+    assert log["started"] == 1
+
+
+@pytest.mark.asyncio
+async def test_hedges_stop_when_the_budget_is_spent(hedge):
+    hedge.budget = RetryBudget(ratio=0.0, min_per_second=0.0)
+    func, log = calls(0.05, 0.0)
+
+    assert await hedge.call("op", func) == 0
+    assert log == {"started": 1, "cancelled": 0}
+
+
+@pytest.mark.asyncio
+async def test_failed_hedge_falls_back_to_the_primary(hedge):
+    log = {"started": 0}
+
+    async def func():
+        log["started"] += 1
+        if log["started"] == 2:
+            raise Unavailable()
+        await asyncio.sleep(0.05)
+        return "primary"
+
+    assert await hedge.call("op", func) == "primary"
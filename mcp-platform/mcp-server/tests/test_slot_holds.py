@@ -0,0 +1,90 @@
+from datetime import datetime
+
+import pytest
+
+from app.config import settings
+from app.utils.services.slot_holds import SlotUnavailableError, phone_key
+
+DAY = datetime(2024, 12, 2)
+
+
+def at(hour, minute=0):
+    return DAY.replace(hour=hour, minute=minute)
+
+
+@pytest.mark.parametrize("phone", ["5511988887777", "+55 (11) 98888-7777", "11988887777", "551188887777", "005511988887777"])
+def test_phone_key_spellings(phone):
+    assert phone_key(phone) == "5511988887777"
+
+
+def test_phone_key_keeps_landlines():
+    assert phone_key("1133334444") == "551133334444"
+
+
+@pytest.mark.asyncio
+async def test_offered_slot_can_be_booked_by_the_same_customer(calendar):
+    # WhatsApp `from`, without the ninth digit
+    slots = await calendar.get_available_slots(DAY, limit=1, owner="551188887777")
+    assert slots[0] == {"start": "08:00", "end": "08:30"}
+
+    # Another conversation cannot take it
+    with pytest.raises(SlotUnavailableError):
+        await calendar.create_appointment(at(8), at(8, 30), "Outra", "11977776666", "Corte")
+
+    # The customer books it with the phone as typed in the form
+    result = await calendar.create_appointment(at(8), at(8, 30), "Maria", "(11) 98888-7777", "Corte")
+    assert result["id"] == "evt1"
+
+
+@pytest.mark.asyncio
+async def test_early_exit_caches_the_events_read(calendar, calendar_api, monkeypatch):
+    monkeypatch.setattr(settings, "CALENDAR_PAGE_SIZE", 1)
+    calendar_api.add("a", "2024-12-02T08:00:00", "2024-12-02T09:00:00")
+    calendar_api.add("b", "2024-12-02T09:30:00", "2024-12-02T10:00:00")
+    calendar_api.add("c", "2024-12-02T14:00:00", "2024-12-02T15:00:00")
+
+    slots = await calendar.get_available_slots(DAY, limit=1)
+
+    assert slots == [{"start": "09:00", "end": "09:30"}]
+    assert not await calendar.holds.is_free(at(8), at(9))
+    assert not await calendar.holds.is_free(at(9, 30), at(10))
+    # Not read yet, so not known
+    assert await calendar.holds.is_free(at(14), at(15))
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_skips_held_and_booked_slots(calendar, calendar_api):
+    await calendar.get_available_slots(DAY, limit=1, owner="5511977776666")
+    await calendar.create_appointment(at(9), at(9, 30), "Ana", "11955554444", "Corte")
+
+    results = await calendar.create_appointments([
+        {"start_time": at(8), "end_time": at(8, 30), "customer_name": "Maria", "customer_phone": "11988887777", "service_type": "Corte"},
+        {"start_time": at(9), "end_time": at(9, 30), "customer_name": "Maria", "customer_phone": "11988887777", "service_type": "Corte"},
+        {"start_time": at(10), "end_time": at(10, 30), "customer_name": "Maria", "customer_phone": "11988887777", "service_type": "Corte"},
+    ])
+
+    assert [result["success"] for result in results] == [False, False, True]
+    assert [result.get("error", {}).get("status") for result in results] == [409, 409, None]
+    # Conflicting items are not sent to Calendar
+    assert calendar_api.batches == [1]
+    assert not await calendar.holds.is_free(at(10), at(10, 30))
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_moves_the_busy_cells(calendar, calendar_api):
+    calendar_api.add("a", "2024-12-02T08:00:00", "2024-12-02T08:30:00")
+    calendar_api.add("b", "2024-12-02T09:00:00", "2024-12-02T09:30:00")
+    await calendar.get_available_slots(DAY)
+    await calendar.get_available_slots(DAY, limit=1, owner="5511977776666")
+
+    results = await calendar.update_appointments([
+        {"event_id": "a", "start_time": at(11), "end_time": at(11, 30)},
+        {"event_id": "b", "start_time": at(8, 30), "end_time": at(9)},
+    ])
+
+    assert results[0]["success"]
+    # 08:30 is held for the other conversation
+    assert results[1]["error"]["status"] == 409
+    assert calendar_api.store["b"]["start"] == {"dateTime": "2024-12-02T09:00:00"}
+    assert await calendar.holds.is_free(at(8), at(8, 30))
+    assert not await calendar.holds.is_free(at(11), at(11, 30))
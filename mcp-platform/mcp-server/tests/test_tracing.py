@@ -0,0 +1,117 @@
+import asyncio
+from types import SimpleNamespace
+
+import orjson
+import pytest
+import pytest_asyncio
+
+from app.utils.services import outbound_scheduler
+from app.utils.services.gemini_service import GeminiService
+from app.utils.services.outbound_scheduler import OutboundScheduler
+from app.utils.services.rate_limiter import RateLimiter
+from app.utils.services.whatsapp_service import WhatsAppService
+from app.utils.tracing import get_memory_exporter, start_span
+
+
+class FakeResponse:
+    status = 200
+    headers = {}
+
+    async def json(self, content_type=None):
+        return {"messages": [{"id": "wamid.out"}], "success": True}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    """aiohttp session for the Graph API: every call answers 200"""
+    closed = False
+
+    def __init__(self):
+        self.posts = []
+
+    def post(self, url, json=None, headers=None):
+        self.posts.append(json)
+        return FakeResponse()
+
+
+@pytest.fixture
+def spans():
+    exporter = get_memory_exporter()
+    exporter.clear()
+    return exporter.get_finished_spans
+
+
+@pytest_asyncio.fixture
+async def services(monkeypatch, client, redis):
+    """WhatsApp (fake Graph session) and Gemini (canned reply) services on the app"""
+    from app.main import app
+
+    monkeypatch.setattr(outbound_scheduler, "_schedulers", {})
+    whatsapp = WhatsAppService(session=FakeSession(), redis=redis)
+    # Dispatcher started outside any request: only the trace carried on the job links the sends
+    whatsapp.scheduler._start()
+
+    gemini = GeminiService()
+
+    async def generate_content_async(prompt, generation_config=None):
+        return SimpleNamespace(text="Temos horários às 9h e às 10h.")
+
+    monkeypatch.setattr(gemini.model, "generate_content_async", generate_content_async)
+    for name, value in {
+        "whatsapp_service": whatsapp, "gemini_service": gemini, "rate_limiter": RateLimiter(redis)
+    }.items():
+        monkeypatch.setattr(app.state, name, value, raising=False)
+    yield whatsapp
+    await outbound_scheduler.stop_schedulers()
+
+
+def webhook(text):
+    message = {"from": "5511988887777", "id": "wamid.in", "timestamp": "1733130000", "type": "text", "text": {"body": text}}
+    value = {
+        "messaging_product": "whatsapp",
+        "contacts": [{"profile": {"name": "Maria"}, "wa_id": "5511988887777"}],
+        "messages": [message],
+    }
+    return orjson.dumps({"object": "whatsapp_business_account", "entry": [{"id": "1", "changes": [{"field": "messages", "value": value}]}]})
+
+
+@pytest.mark.asyncio
+async def test_webhook_message_is_one_trace(client, services, spans):
+    response = await client.post("/api/v1/webhooks/whatsapp/test", content=webhook("Está livre hoje?"))
+
+    assert response.json() == {"status": "ok"}
+    assert len(services.session.posts) == 2  # mark_as_read and the reply
+    by_name = {span.name: span for span in spans()}
+    request = by_name["POST /api/v1/webhooks/whatsapp/{client_name}"]
+    for name in ("gemini.generate_content", "calendar.events.list", "graph.mark_as_read", "graph.send_message"):
+        assert name in by_name, sorted(by_name)
+        assert by_name[name].context.trace_id == request.context.trace_id, name
+    assert {span.context.trace_id for span in spans()} == {request.context.trace_id}
+
+
+@pytest.mark.asyncio
+async def test_scheduler_carries_the_submitter_trace(redis, spans):
+    scheduler = OutboundScheduler("123", messages_per_second=1000, redis=redis)
+    scheduler._start()
+
+    async def send():
+        with start_span("graph.send_message"):
+            return 200, {}, None
+
+    with start_span("request") as parent:
+        await scheduler.submit("send_message", send)
+    # A second submit under no trace starts its own
+    await scheduler.submit("send_message", send)
+    await asyncio.sleep(0)
+    await scheduler.stop()
+
+    first, second = [span for span in spans() if span.name == "graph.send_message"]
+    assert first.context.trace_id == parent.get_span_context().trace_id
+    assert first.parent.span_id == parent.get_span_context().span_id
+    assert second.context.trace_id != parent.get_span_context().trace_id
+    assert second.parent is None
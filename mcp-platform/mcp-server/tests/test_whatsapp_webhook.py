@@ -0,0 +1,111 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from app.utils.services.whatsapp_service import WhatsAppService
+from app.utils.whatsapp_webhook import decode_webhook, first_message
+
+PHONE = "5511988887777"
+
+
+def webhook(messages=None, statuses=None, contacts=None):
+    value = {"messaging_product": "whatsapp", "metadata": {"phone_number_id": "123"}}
+    if messages is not None:
+        value["messages"] = messages
+        value["contacts"] = contacts if contacts is not None else [{"profile": {"name": "Maria"}, "wa_id": PHONE}]
+    if statuses is not None:
+        value["statuses"] = statuses
+    return json.dumps({
+        "object": "whatsapp_business_account",
+        "entry": [{"id": "987", "changes": [{"value": value, "field": "messages"}]}],
+    }).encode()
+
+
+def message(**fields):
+    return {"from": PHONE, "id": "wamid.1", "timestamp": "1734700000", **fields}
+
+
+@pytest.fixture
+def whatsapp():
+    return WhatsAppService()
+
+
+def test_text_message(whatsapp):
+    parsed = whatsapp.parse_webhook_message(webhook([message(type="text", text={"body": "Oi"})]))
+
+    assert parsed == {
+        "message_id": "wamid.1",
+        "from": PHONE,
+        "timestamp": datetime.fromtimestamp(1734700000),
+        "type": "text",
+        "contact_name": "Maria",
+        "text": "Oi",
+    }
+
+
+def test_button_reply(whatsapp):
+    parsed = whatsapp.parse_webhook_message(webhook([message(
+        type="interactive",
+        interactive={"type": "button_reply", "button_reply": {"id": "confirm_appointment", "title": "Confirmar"}},
+    )]))
+
+    assert (parsed["button_id"], parsed["button_title"]) == ("confirm_appointment", "Confirmar")
+    assert parsed["interactive"]["type"] == "button_reply"
+
+
+def test_list_reply(whatsapp):
+    parsed = whatsapp.parse_webhook_message(webhook([message(
+        type="interactive",
+        interactive={"type": "list_reply", "list_reply": {"id": "slot_0900", "title": "09:00"}},
+    )]))
+
+    assert parsed["interactive"]["list_reply"] == {"id": "slot_0900", "title": "09:00"}
+    assert "button_id" not in parsed
+
+
+def test_statuses_only_body_has_no_message(whatsapp):
+    body = webhook(statuses=[{"id": "wamid.1", "status": "delivered", "timestamp": "1734700000", "recipient_id": PHONE}])
+
+    assert first_message(decode_webhook(body)) is None
+    assert whatsapp.parse_webhook_message(body) is None
+
+
+def test_int_timestamp(whatsapp):
+    parsed = whatsapp.parse_webhook_message(webhook([message(type="text", text={"body": "Oi"}, timestamp=1734700000)]))
+
+    assert parsed["timestamp"] == datetime.fromtimestamp(1734700000)
+
+
+def test_null_fields_are_tolerated(whatsapp):
+    body = webhook(
+        [message(type="text", text={"body": None}, timestamp=None)],
+        contacts=[{"profile": {"name": None}, "wa_id": None}],
+    )
+
+    parsed = whatsapp.parse_webhook_message(body)
+
+    assert parsed["text"] == ""
+    assert parsed["contact_name"] == "Unknown"
+    assert parsed["timestamp"] == datetime.fromtimestamp(0)
+
+
+def test_null_reply_title_and_lists(whatsapp):
+    parsed = whatsapp.parse_webhook_message(webhook([message(
+        type="interactive",
+        interactive={"type": "button_reply", "button_reply": {"id": "confirm_appointment", "title": None}},
+    )], contacts=[]))
+
+    assert (parsed["button_id"], parsed["button_title"], parsed["contact_name"]) == ("confirm_appointment", "", "Unknown")
+    assert whatsapp.parse_webhook_message(b'{"object": "whatsapp_business_account", "entry": null}') is None
+    assert whatsapp.parse_webhook_message(b'{"entry": [{"changes": null}]}') is None
+
+
+def test_dict_body_is_accepted(whatsapp):
+    parsed = whatsapp.parse_webhook_message(json.loads(webhook([message(type="text", text={"body": "Oi"})])))
+
+    assert parsed["text"] == "Oi"
+
+
+def test_invalid_body_is_dropped(whatsapp):
+    assert whatsapp.parse_webhook_message(b"not json") is None
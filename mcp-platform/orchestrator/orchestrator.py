@@ -4,12 +4,20 @@ MCP Platform Orchestrator
 Generates Kubernetes and ArgoCD manifests based on config.json
 """
 
+import hashlib
 import json
 import os
+import shutil
 import sys
+import time
 import yaml
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
 from pathlib import Path
-from jinja2 import Environment, FileSystemLoader
+from stat import S_ISREG
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 import argparse
 import logging
 
@@ -17,15 +25,46 @@ import logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+INDEX_FILE = '.manifest-index.json'
+INDEX_VERSION = 1
+
+# Manifest types in the order they must be applied
+MANIFEST_TYPES = ['namespace', 'secret', 'deployment', 'service', 'hpa', 'pdb', 'argocd-application']
+BUNDLES_DIR = 'bundles'
+
+SCALING_DEFAULTS = {
+    'min_replicas': 1,
+    'max_replicas': 3,
+    'target_cpu_utilization': None,
+    'metric': None,
+    'min_available': None,
+    'scale_down_stabilization_seconds': 300,
+    'environments': None,
+}
+CACHE_DIR = Path('.orchestrator-cache')
+
 class MCPOrchestrator:
-    def __init__(self, config_file='config/config.json'):
-        self.config = self.load_config(config_file)
+    def __init__(self, config_file='config/config.json', config=None):
+        self.config_file = config_file
+        self.config = config if config is not None else self.load_config(config_file)
+        self.template_dir = Path('orchestrator/templates')
+        bytecode_dir = CACHE_DIR / 'jinja'
+        bytecode_dir.mkdir(parents=True, exist_ok=True)
         self.template_env = Environment(
-            loader=FileSystemLoader('orchestrator/templates'),
+            loader=FileSystemLoader(str(self.template_dir)),
             trim_blocks=True,
-            lstrip_blocks=True
+            lstrip_blocks=True,
+            # Templates are compiled once per process (see load_templates)
+            auto_reload=False,
+            bytecode_cache=FileSystemBytecodeCache(str(bytecode_dir))
         )
         self.output_dir = Path('generated-manifests')
+        self.templates = {}
+        self.credentials_cache = {}
+        # Bundle documents by manifest type and client/environment key, kept
+        # across watch cycles so only changed manifests are read again
+        self.bundle_documents = {}
+        self.load_templates()
         
     def load_config(self, config_file):
         """Load and validate configuration file"""
@@ -41,32 +80,55 @@ class MCPOrchestrator:
             logger.error(f"Invalid JSON in configuration file: {e}")
             sys.exit(1)
     
-    def create_output_directories(self):
-        """Create directory structure for generated manifests"""
-        for client in self.config['clients']:
-            for env, enabled in client['environments'].items():
-                if enabled:
-                    client_dir = self.output_dir / client['client_name'] / env
-                    client_dir.mkdir(parents=True, exist_ok=True)
-                    logger.info(f"Created directory: {client_dir}")
+    def load_templates(self):
+        """Compile every template once; call again after templates change on disk"""
+        self.template_env.cache.clear()
+        self.templates = {
+            path.name: self.template_env.get_template(path.name)
+            for path in sorted(self.template_dir.glob('*.j2'))
+        }
+        self.templates_hash = self.compute_templates_hash()
     
-    def load_credentials(self, credentials_file):
-        """Load credentials from environment file"""
-        credentials = {}
+    def read_credentials_file(self, credentials_file):
+        """Return (raw bytes, parsed credentials) of a credentials file
+        
+        Results are cached by path and invalidated when the file's mtime or
+        size changes, so a tenant's file is read and parsed once per run
+        instead of once per environment.
+        """
+        path = Path('config') / credentials_file
         try:
-            with open(f"config/{credentials_file}", 'r') as f:
-                for line in f:
-                    if '=' in line and not line.startswith('#'):
-                        key, value = line.strip().split('=', 1)
-                        credentials[key] = value.strip('"\'')
-            return credentials
+            file_stat = path.stat()
         except FileNotFoundError:
+            return None, None
+        if not S_ISREG(file_stat.st_mode):
+            return None, None
+        
+        key = (file_stat.st_mtime_ns, file_stat.st_size)
+        cached = self.credentials_cache.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1], cached[2]
+        
+        raw = path.read_bytes()
+        credentials = {}
+        for line in raw.decode().splitlines():
+            if '=' in line and not line.startswith('#'):
+                name, value = line.strip().split('=', 1)
+                credentials[name] = value.strip('"\'')
+        self.credentials_cache[path] = (key, raw, credentials)
+        return raw, credentials
+    
+    def load_credentials(self, credentials_file):
+        """Load credentials from environment file"""
+        _, credentials = self.read_credentials_file(credentials_file)
+        if credentials is None:
             logger.warning(f"Credentials file {credentials_file} not found")
             return {}
+        return credentials
     
     def generate_namespace_manifest(self, client_name, environment):
         """Generate Kubernetes namespace manifest"""
-        template = self.template_env.get_template('namespace.yaml.j2')
+        template = self.templates['namespace.yaml.j2']
         namespace = f"{client_name}-{environment}"
         
         manifest = template.render(
@@ -79,7 +141,7 @@ class MCPOrchestrator:
     
     def generate_secret_manifest(self, client, environment):
         """Generate Kubernetes secret manifest with credentials"""
-        template = self.template_env.get_template('secret.yaml.j2')
+        template = self.templates['secret.yaml.j2']
         credentials = self.load_credentials(client['credentials_file'])
         namespace = f"{client['client_name']}-{environment}"
         
@@ -92,25 +154,47 @@ class MCPOrchestrator:
         
         return manifest
     
+    def get_scaling(self, client, environment):
+        """Autoscaling settings of a client/environment, or None for a fixed single replica
+        
+        Read from `scaling` in config.json or from `resources.scaling` (the
+        `clients.resources` JSONB column). CPU utilization (70%) is the target
+        unless a custom `metric` is configured.
+        """
+        scaling = client.get('scaling') or client.get('resources', {}).get('scaling')
+        if not scaling:
+            return None
+        
+        scaling = {**SCALING_DEFAULTS, **scaling}
+        if scaling['environments'] is not None and environment not in scaling['environments']:
+            return None
+        if scaling['target_cpu_utilization'] is None and not scaling['metric']:
+            scaling['target_cpu_utilization'] = 70
+        scaling['max_replicas'] = max(scaling['max_replicas'], scaling['min_replicas'])
+        return scaling
+    
     def generate_deployment_manifest(self, client, environment):
         """Generate Kubernetes deployment manifest"""
-        template = self.template_env.get_template('deployment.yaml.j2')
+        template = self.templates['deployment.yaml.j2']
         namespace = f"{client['client_name']}-{environment}"
+        resources = {key: value for key, value in client.get('resources', {}).items() if key != 'scaling'}
         
         manifest = template.render(
             namespace=namespace,
             client_name=client['client_name'],
             environment=environment,
-            resources=client.get('resources', {}),
+            resources=resources,
+            scaling=self.get_scaling(client, environment),
             database=self.config['database'],
-            image_tag=environment if environment != 'production' else 'stable'
+            image_tag=environment if environment != 'production' else 'stable',
+            log_level=client.get('log_level', 'INFO')
         )
         
         return manifest
     
     def generate_service_manifest(self, client, environment):
         """Generate Kubernetes service manifest"""
-        template = self.template_env.get_template('service.yaml.j2')
+        template = self.templates['service.yaml.j2']
         namespace = f"{client['client_name']}-{environment}"
         
         manifest = template.render(
@@ -121,9 +205,35 @@ class MCPOrchestrator:
         
         return manifest
     
+    def generate_hpa_manifest(self, client, environment, scaling):
+        """Generate HorizontalPodAutoscaler manifest"""
+        template = self.templates['hpa.yaml.j2']
+        
+        manifest = template.render(
+            namespace=f"{client['client_name']}-{environment}",
+            client_name=client['client_name'],
+            environment=environment,
+            scaling=scaling
+        )
+        
+        return manifest
+    
+    def generate_pdb_manifest(self, client, environment, scaling):
+        """Generate PodDisruptionBudget manifest"""
+        template = self.templates['pdb.yaml.j2']
+        
+        manifest = template.render(
+            namespace=f"{client['client_name']}-{environment}",
+            client_name=client['client_name'],
+            environment=environment,
+            scaling=scaling
+        )
+        
+        return manifest
+    
     def generate_argocd_application(self, client, environment):
         """Generate ArgoCD Application manifest"""
-        template = self.template_env.get_template('argocd-app.yaml.j2')
+        template = self.templates['argocd-app.yaml.j2']
         namespace = f"{client['client_name']}-{environment}"
         
         manifest = template.render(
@@ -139,80 +249,636 @@ class MCPOrchestrator:
         return manifest
     
     def save_manifest(self, manifest, client_name, environment, manifest_type):
-        """Save generated manifest to file"""
+        """Save generated manifest to file, only touching it when the content changed"""
         output_path = self.output_dir / client_name / environment / f"{manifest_type}.yaml"
+        changed = write_if_changed(output_path, manifest)
+        
+        if changed:
+            logger.debug(f"Generated {manifest_type} for {client_name}/{environment}")
+        return changed
+    
+    def compute_templates_hash(self):
+        """Hash the source of every template, so template edits invalidate all outputs"""
+        digest = hashlib.sha256()
+        for template_path in sorted(self.template_dir.glob('*.j2')):
+            digest.update(template_path.name.encode())
+            digest.update(template_path.read_bytes())
+        return digest.hexdigest()
+    
+    def compute_input_hash(self, client, environment):
+        """Hash every input that affects the manifests of one client/environment"""
+        digest = hashlib.sha256()
+        digest.update(json.dumps({
+            'client': client,
+            'environment': environment,
+            'database': self.config.get('database'),
+            'argocd': self.config.get('argocd'),
+        }, sort_keys=True).encode())
+        digest.update(self.templates_hash.encode())
+        
+        raw_credentials, _ = self.read_credentials_file(client.get('credentials_file', ''))
+        if raw_credentials is not None:
+            digest.update(raw_credentials)
+        return digest.hexdigest()
+    
+    def load_index(self):
+        """Load the manifest index written by the previous run"""
+        index_path = self.output_dir / INDEX_FILE
+        try:
+            with open(index_path, 'r') as f:
+                index = json.load(f)
+            if index.get('version') == INDEX_VERSION:
+                return index['entries']
+            logger.info("Manifest index version changed, regenerating everything")
+        except FileNotFoundError:
+            pass
+        except json.JSONDecodeError:
+            logger.warning(f"Corrupted manifest index {index_path}, regenerating everything")
+        return {}
+    
+    def save_index(self, entries):
+        """Persist the manifest index atomically"""
+        content = json.dumps({'version': INDEX_VERSION, 'entries': entries}, indent=2, sort_keys=True)
+        write_if_changed(self.output_dir / INDEX_FILE, content)
+    
+    def render_environment(self, client, environment):
+        """Render every manifest for one client/environment"""
+        client_name = client['client_name']
+        manifests = {
+            'namespace': self.generate_namespace_manifest(client_name, environment),
+            'secret': self.generate_secret_manifest(client, environment),
+            'deployment': self.generate_deployment_manifest(client, environment),
+            'service': self.generate_service_manifest(client, environment),
+        }
         
-        with open(output_path, 'w') as f:
-            f.write(manifest)
+        scaling = self.get_scaling(client, environment)
+        if scaling:
+            manifests['hpa'] = self.generate_hpa_manifest(client, environment, scaling)
+            manifests['pdb'] = self.generate_pdb_manifest(client, environment, scaling)
         
-        logger.info(f"Generated {manifest_type} for {client_name}/{environment}")
+        manifests['argocd-application'] = self.generate_argocd_application(client, environment)
+        return manifests
     
-    def generate_all_manifests(self):
-        """Generate all manifests for all clients and environments"""
-        self.create_output_directories()
+    def remove_environment(self, key):
+        """Delete the outputs of a client/environment that is no longer configured"""
+        env_dir = self.output_dir / key
+        if env_dir.is_dir():
+            shutil.rmtree(env_dir)
+        client_dir = env_dir.parent
+        if client_dir.is_dir() and not any(client_dir.iterdir()):
+            client_dir.rmdir()
+        logger.info(f"Removed manifests for {key}")
+    
+    def generate_all_manifests(self, force=False, jobs=1, clients=None, scope=None):
+        """Generate manifests for the clients and environments whose inputs changed
+        
+        `clients` defaults to the clients in config.json and can be any iterable,
+        e.g. rows streamed from the database. When `scope` is a set of client
+        names, `clients` is a partial update and only the outputs of those
+        clients are pruned.
+        """
+        timings = PhaseTimings()
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        
+        with timings.phase('index'):
+            previous_index = self.load_index()
+        
+        if clients is None:
+            clients = self.config.get('clients', [])
+        if scope is None:
+            index = {}
+        else:
+            index = {key: value for key, value in previous_index.items() if key.split('/', 1)[0] not in scope}
+        counts = {'generated': 0, 'unchanged': 0}
+        # Manifest type -> keys whose file of that type was written or removed
+        changed_manifests = {}
+        
+        # Inputs are hashed as clients stream in, so only changed environments
+        # reach the renderers and the full client list is never held in memory
+        def changed_environments():
+            for client in clients:
+                with timings.phase('hash'):
+                    changed = []
+                    for environment, enabled in client['environments'].items():
+                        if not enabled:
+                            continue
+                        
+                        key = f"{client['client_name']}/{environment}"
+                        input_hash = self.compute_input_hash(client, environment)
+                        index[key] = input_hash
+                        
+                        if force or previous_index.get(key) != input_hash or not (self.output_dir / key).is_dir():
+                            changed.append((client, environment))
+                        else:
+                            counts['unchanged'] += 1
+                counts['generated'] += len(changed)
+                yield from changed
+        
+        with timings.phase('generate'):
+            written = 0
+            worker_seconds = {'render': 0.0, 'write': 0.0}
+            for result in self.process_pending(changed_environments(), jobs):
+                written += result['written']
+                for manifest_type in result['changed']:
+                    changed_manifests.setdefault(manifest_type, set()).add(result['key'])
+                worker_seconds['render'] += result['render']
+                worker_seconds['write'] += result['write']
+        # Hashing happened while the generate phase was running
+        timings.seconds['generate'] -= timings.seconds.get('hash', 0.0)
         
-        for client in self.config['clients']:
-            client_name = client['client_name']
+        with timings.phase('cleanup'):
+            removed = [
+                key for key in previous_index
+                if key not in index and (scope is None or key.split('/', 1)[0] in scope)
+            ]
+            for key in removed:
+                self.remove_environment(key)
             
-            for environment, enabled in client['environments'].items():
-                if not enabled:
-                    continue
-                
-                # Generate Kubernetes manifests
-                namespace_manifest = self.generate_namespace_manifest(client_name, environment)
-                self.save_manifest(namespace_manifest, client_name, environment, 'namespace')
-                
-                secret_manifest = self.generate_secret_manifest(client, environment)
-                self.save_manifest(secret_manifest, client_name, environment, 'secret')
-                
-                deployment_manifest = self.generate_deployment_manifest(client, environment)
-                self.save_manifest(deployment_manifest, client_name, environment, 'deployment')
-                
-                service_manifest = self.generate_service_manifest(client, environment)
-                self.save_manifest(service_manifest, client_name, environment, 'service')
-                
-                # Generate ArgoCD application
-                argocd_app = self.generate_argocd_application(client, environment)
-                self.save_manifest(argocd_app, client_name, environment, 'argocd-application')
-        
-        logger.info("All manifests generated successfully!")
-        self.generate_apply_script()
+            self.save_index(index)
+        
+        with timings.phase('bundles'):
+            for key in removed:
+                for manifest_type in MANIFEST_TYPES:
+                    changed_manifests.setdefault(manifest_type, set()).add(key)
+            if force or not (self.output_dir / BUNDLES_DIR).is_dir():
+                self.generate_bundles(index)
+            elif changed_manifests:
+                self.generate_bundles(index, changed_manifests)
+            self.generate_apply_script()
+        
+        stats = {
+            'generated': counts['generated'],
+            'unchanged': counts['unchanged'],
+            'removed': len(removed),
+            'files_written': written,
+            'timings': timings.as_dict(),
+            'worker_timings': {name: round(seconds * 1000, 1) for name, seconds in worker_seconds.items()},
+        }
+        logger.info(
+            f"Manifests: {stats['generated']} generated, {stats['unchanged']} unchanged, "
+            f"{stats['removed']} removed ({written} files written)"
+        )
+        logger.info(
+            f"Timings: {timings} (across workers: render={stats['worker_timings']['render']}ms "
+            f"write={stats['worker_timings']['write']}ms)"
+        )
+        return stats
+    
+    def render_and_save(self, client, environment):
+        """Render and write the manifests of one client/environment"""
+        client_name = client['client_name']
+        start = time.perf_counter()
+        manifests = self.render_environment(client, environment)
+        rendered = time.perf_counter()
+        
+        env_dir = self.output_dir / client_name / environment
+        env_dir.mkdir(parents=True, exist_ok=True)
+        changed = []
+        for manifest_type, manifest in manifests.items():
+            if self.save_manifest(manifest, client_name, environment, manifest_type):
+                changed.append(manifest_type)
+        
+        # Optional manifests (e.g. hpa/pdb after scaling was turned off)
+        for manifest_type in MANIFEST_TYPES:
+            stale_path = env_dir / f"{manifest_type}.yaml"
+            if manifest_type not in manifests and stale_path.is_file():
+                stale_path.unlink()
+                changed.append(manifest_type)
+        
+        return {
+            'key': f"{client_name}/{environment}",
+            'changed': changed,
+            'written': len(changed),
+            'render': rendered - start,
+            'write': time.perf_counter() - rendered,
+        }
+    
+    def process_pending(self, pending, jobs=1, batch_size=64):
+        """Render and write (client, environment) pairs, in a process pool when jobs > 1
+        
+        `pending` is consumed lazily; at most `jobs * 2` batches are in flight.
+        """
+        if jobs <= 1:
+            for client, environment in pending:
+                yield self.render_and_save(client, environment)
+            return
+        
+        # Each worker renders and writes its own batches, so file I/O is
+        # spread across processes as well. The pool is only started once
+        # there is something to render.
+        executor = None
+        in_flight = deque()
+        try:
+            for batch in batched(pending, batch_size):
+                if executor is None:
+                    executor = ProcessPoolExecutor(
+                        max_workers=jobs,
+                        initializer=_init_render_worker,
+                        initargs=(self.config,)
+                    )
+                in_flight.append(executor.submit(_render_batch_in_worker, batch))
+                if len(in_flight) >= jobs * 2:
+                    yield from in_flight.popleft().result()
+            while in_flight:
+                yield from in_flight.popleft().result()
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+    
+    def read_manifest(self, key, manifest_type):
+        """Manifest of one client/environment as a bundle document, or None if it does not exist"""
+        manifest_path = self.output_dir / key / f"{manifest_type}.yaml"
+        try:
+            return manifest_path.read_text().rstrip('\n') + '\n'
+        except FileNotFoundError:
+            return None
+    
+    def generate_bundles(self, index, changed=None):
+        """Concatenate every manifest of each type into one multi-document YAML
+        
+        `changed` maps manifest types to the keys whose file of that type was
+        written or removed; only those bundles are rebuilt and only those
+        files are read again (the other documents come from
+        self.bundle_documents). Without it every bundle is rebuilt from disk.
+        Kinds without documents get no bundle and are left out of
+        kustomization.yaml.
+        """
+        bundles_dir = self.output_dir / BUNDLES_DIR
+        bundles_dir.mkdir(parents=True, exist_ok=True)
+        
+        for manifest_type in MANIFEST_TYPES:
+            if changed is not None and manifest_type not in changed:
+                continue
+            
+            documents = self.bundle_documents.get(manifest_type)
+            if changed is None or documents is None:
+                documents = {key: self.read_manifest(key, manifest_type) for key in index}
+            else:
+                for key in changed[manifest_type]:
+                    documents[key] = self.read_manifest(key, manifest_type) if key in index else None
+            documents = {key: document for key, document in documents.items() if document is not None and key in index}
+            self.bundle_documents[manifest_type] = documents
+            
+            bundle_path = bundles_dir / f"{manifest_type}.yaml"
+            if not documents:
+                # No manifest of this kind (e.g. no tenant has scaling): no bundle
+                if bundle_path.is_file():
+                    bundle_path.unlink()
+                    logger.info(f"Removed empty bundle {bundle_path}")
+            elif write_if_changed(bundle_path, '---\n'.join(documents[key] for key in sorted(documents))):
+                logger.info(f"Generated bundle {bundle_path} ({len(documents)} documents)")
+        
+        # Only the bundles on disk, so kustomize never gets an empty resource
+        resources = [
+            f"{manifest_type}.yaml" for manifest_type in MANIFEST_TYPES
+            if (bundles_dir / f"{manifest_type}.yaml").is_file()
+        ]
+        kustomization = yaml.safe_dump({
+            'apiVersion': 'kustomize.config.k8s.io/v1beta1',
+            'kind': 'Kustomization',
+            'resources': resources,
+        }, sort_keys=False)
+        write_if_changed(bundles_dir / 'kustomization.yaml', kustomization)
     
     def generate_apply_script(self):
-        """Generate a shell script to apply all manifests"""
+        """Generate a shell script that applies each bundle with one server-side apply"""
+        steps = '\n'.join(
+            f'echo "Applying {manifest_type} bundle..."\napply_bundle "{manifest_type}.yaml"\n'
+            for manifest_type in MANIFEST_TYPES
+        )
         script_content = """#!/bin/bash
 # Apply script for MCP Platform manifests
+#
+# Usage: ./apply-all.sh [--diff | --dry-run]
+#   --diff     show what would change (kubectl diff --server-side)
+#   --dry-run  validate against the API server without persisting
 
 set -e
 
-echo "Applying MCP Platform manifests..."
+cd "$(dirname "$0")/""" + BUNDLES_DIR + """"
 
-# Apply namespaces first
-echo "Creating namespaces..."
-find generated-manifests -name "namespace.yaml" -exec kubectl apply -f {} \\;
+MODE="${1:-apply}"
+APPLY_FLAGS="--server-side --field-manager=mcp-orchestrator --force-conflicts"
 
-# Apply secrets
-echo "Creating secrets..."
-find generated-manifests -name "secret.yaml" -exec kubectl apply -f {} \\;
+apply_bundle() {
+    local bundle="$1"
+    [ -s "$bundle" ] || return 0
+    case "$MODE" in
+        --diff)
+            # kubectl diff exits with 1 when there are differences
+            kubectl diff --server-side --field-manager=mcp-orchestrator -f "$bundle" || [ $? -eq 1 ]
+            ;;
+        --dry-run)
+            kubectl apply $APPLY_FLAGS --dry-run=server -f "$bundle"
+            ;;
+        *)
+            kubectl apply $APPLY_FLAGS -f "$bundle"
+            ;;
+    esac
+}
 
-# Apply deployments and services
-echo "Creating deployments and services..."
-find generated-manifests -name "deployment.yaml" -exec kubectl apply -f {} \\;
-find generated-manifests -name "service.yaml" -exec kubectl apply -f {} \\;
+echo "Applying MCP Platform manifests ($MODE)..."
 
-# Apply ArgoCD applications
-echo "Creating ArgoCD applications..."
-find generated-manifests -name "argocd-application.yaml" -exec kubectl apply -f {} \\;
-
-echo "All manifests applied successfully!"
+""" + steps + """
+echo "Done."
 """
         
         script_path = self.output_dir / 'apply-all.sh'
-        with open(script_path, 'w') as f:
-            f.write(script_content)
+        if write_if_changed(script_path, script_content):
+            os.chmod(script_path, 0o755)
+            logger.info(f"Generated apply script: {script_path}")
+
+    def changed_clients(self, old_config, new_config):
+        """Names of clients whose config entry differs, or None if a global section changed"""
+        strip = lambda config: {key: value for key, value in config.items() if key != 'clients'}
+        if strip(old_config) != strip(new_config):
+            return None
+        
+        old_clients = {client['client_name']: client for client in old_config.get('clients', [])}
+        new_clients = {client['client_name']: client for client in new_config.get('clients', [])}
+        return {
+            name for name in old_clients.keys() | new_clients.keys()
+            if old_clients.get(name) != new_clients.get(name)
+        }
+    
+    def watch(self, jobs=1, debounce=2.0, interval=0.5, metrics_file=None):
+        """Keep running, regenerating the manifests whose inputs change on disk
         
-        os.chmod(script_path, 0o755)
-        logger.info(f"Generated apply script: {script_path}")
+        The parsed config and the template environment are kept across
+        cycles; only the clients affected by each burst of edits are
+        regenerated.
+        """
+        credentials_dir = Path('config') / 'secrets'
+        watcher = FileWatcher([
+            (Path(self.config_file).parent, Path(self.config_file).name),
+            (credentials_dir, '*.env'),
+            (self.template_dir, '*.j2'),
+        ], interval=interval)
+        metrics = WatchMetrics(metrics_file)
+        
+        self.generate_all_manifests(jobs=jobs)
+        logger.info(f"Watching {self.config_file}, {credentials_dir} and {self.template_dir} for changes")
+        
+        for changed_paths in watcher.changes(debounce):
+            start = time.perf_counter()
+            scope = set()
+            full = False
+            
+            if any(path.suffix == '.j2' for path in changed_paths):
+                self.load_templates()
+                full = True
+            
+            if Path(self.config_file) in changed_paths:
+                try:
+                    with open(self.config_file, 'r') as f:
+                        new_config = json.load(f)
+                except (OSError, json.JSONDecodeError) as e:
+                    logger.error(f"Ignoring invalid configuration {self.config_file}: {e}")
+                    metrics.record_error()
+                    continue
+                changed_clients = self.changed_clients(self.config, new_config)
+                self.config = new_config
+                if changed_clients is None:
+                    full = True
+                else:
+                    scope |= changed_clients
+            
+            changed_credentials = {path for path in changed_paths if path.suffix == '.env'}
+            if changed_credentials:
+                scope |= {
+                    client['client_name'] for client in self.config.get('clients', [])
+                    if Path('config') / client.get('credentials_file', '') in changed_credentials
+                }
+            
+            if full:
+                stats = self.generate_all_manifests(jobs=jobs)
+            elif scope:
+                logger.info(f"Clients changed: {', '.join(sorted(scope))}")
+                clients = [client for client in self.config.get('clients', []) if client['client_name'] in scope]
+                stats = self.generate_all_manifests(jobs=jobs, clients=clients, scope=scope)
+            else:
+                continue
+            
+            metrics.record_cycle(time.perf_counter() - start, stats)
+
+class FileWatcher:
+    """Polls modification times of the files matching (directory, glob) pairs"""
+    
+    def __init__(self, patterns, interval=0.5):
+        self.patterns = patterns
+        self.interval = interval
+        self.state = self.snapshot()
+    
+    def snapshot(self):
+        state = {}
+        for directory, pattern in self.patterns:
+            for path in Path(directory).glob(pattern):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                state[path] = (stat.st_mtime_ns, stat.st_size)
+        return state
+    
+    def poll(self):
+        """Return the paths added, removed or modified since the last poll"""
+        current = self.snapshot()
+        changed = {
+            path for path in current.keys() | self.state.keys()
+            if current.get(path) != self.state.get(path)
+        }
+        self.state = current
+        return changed
+    
+    def changes(self, debounce=2.0):
+        """Yield sets of changed paths once no further change happened for `debounce` seconds"""
+        while True:
+            changed = self.poll()
+            if not changed:
+                time.sleep(self.interval)
+                continue
+            
+            quiet_since = time.monotonic()
+            while time.monotonic() - quiet_since < debounce:
+                time.sleep(self.interval)
+                burst = self.poll()
+                if burst:
+                    changed |= burst
+                    quiet_since = time.monotonic()
+            yield changed
+
+class WatchMetrics:
+    """Cycle timings of watch mode, logged and optionally written in the
+    Prometheus text format (for node-exporter's textfile collector)"""
+    
+    def __init__(self, metrics_file=None):
+        self.metrics_file = Path(metrics_file) if metrics_file else None
+        self.cycles = 0
+        self.errors = 0
+        self.generated = 0
+        self.removed = 0
+        self.last_cycle_seconds = 0.0
+        self.last_phases = {}
+    
+    def record_cycle(self, seconds, stats):
+        self.cycles += 1
+        self.generated += stats['generated']
+        self.removed += stats['removed']
+        self.last_cycle_seconds = seconds
+        self.last_phases = stats['timings']
+        logger.info(f"Watch cycle {self.cycles} took {seconds * 1000:.1f}ms")
+        self.write()
+    
+    def record_error(self):
+        self.errors += 1
+        self.write()
+    
+    def write(self):
+        if not self.metrics_file:
+            return
+        lines = [
+            '# TYPE mcp_orchestrator_cycles_total counter',
+            f'mcp_orchestrator_cycles_total {self.cycles}',
+            '# TYPE mcp_orchestrator_cycle_errors_total counter',
+            f'mcp_orchestrator_cycle_errors_total {self.errors}',
+            '# TYPE mcp_orchestrator_environments_generated_total counter',
+            f'mcp_orchestrator_environments_generated_total {self.generated}',
+            '# TYPE mcp_orchestrator_environments_removed_total counter',
+            f'mcp_orchestrator_environments_removed_total {self.removed}',
+            '# TYPE mcp_orchestrator_last_cycle_seconds gauge',
+            f'mcp_orchestrator_last_cycle_seconds {self.last_cycle_seconds:.6f}',
+            '# TYPE mcp_orchestrator_last_cycle_phase_seconds gauge',
+        ]
+        lines += [
+            f'mcp_orchestrator_last_cycle_phase_seconds{{phase="{phase}"}} {ms / 1000:.6f}'
+            for phase, ms in self.last_phases.items()
+        ]
+        write_if_changed(self.metrics_file, '\n'.join(lines) + '\n')
+
+class DatabaseClientSource:
+    """Streams client rows from the platform database (table `clients`)
+    
+    Rows are read through a server-side cursor, so memory stays flat no
+    matter how many tenants there are, and changes are received through
+    LISTEN/NOTIFY on the `clients_changed` channel (see database/init.sql).
+    """
+    
+    CHANNEL = 'clients_changed'
+    QUERY = """
+        SELECT client_name, business_name, business_type, environments, credentials_file, resources
+        FROM clients
+        {where}
+        ORDER BY client_name
+    """
+    
+    def __init__(self, conninfo, batch_size=500):
+        # Imported here so file-based runs do not need the database driver
+        import psycopg
+        
+        self.psycopg = psycopg
+        self.conninfo = conninfo
+        self.batch_size = batch_size
+    
+    @staticmethod
+    def conninfo_from_config(database):
+        """Build a libpq conninfo from the `database` section of config.json
+        
+        User and password come from the usual PGUSER/PGPASSWORD variables.
+        """
+        return f"host={database['host']} port={database['port']} dbname={database['name']}"
+    
+    def iter_clients(self, names=None):
+        """Yield client entries in the same shape as config.json `clients`"""
+        from psycopg.rows import dict_row
+        
+        where, params = '', None
+        if names is not None:
+            where, params = 'WHERE client_name = ANY(%s)', (list(names),)
+        
+        with self.psycopg.connect(self.conninfo, row_factory=dict_row) as conn:
+            with conn.cursor(name='mcp_orchestrator_clients') as cursor:
+                cursor.itersize = self.batch_size
+                cursor.execute(self.QUERY.format(where=where), params)
+                for row in cursor:
+                    yield {
+                        'client_name': row['client_name'],
+                        'business_name': row['business_name'],
+                        'business_type': row['business_type'],
+                        'environments': row['environments'] or {},
+                        'credentials_file': row['credentials_file'] or '',
+                        'resources': row['resources'] or {},
+                    }
+    
+    def listen(self, debounce=2.0):
+        """Yield sets of changed client names, debouncing bursts of notifications
+        
+        The first item is None, yielded once LISTEN is active: the caller
+        should run a full sync then, so no change is lost in between.
+        """
+        with self.psycopg.connect(self.conninfo, autocommit=True) as conn:
+            conn.execute(f"LISTEN {self.CHANNEL}")
+            logger.info(f"Listening for changes on channel {self.CHANNEL}")
+            yield None
+            while True:
+                changed = {notify.payload for notify in conn.notifies(stop_after=1)}
+                while True:
+                    burst = {notify.payload for notify in conn.notifies(timeout=debounce)}
+                    if not burst:
+                        break
+                    changed |= burst
+                yield changed
+
+class PhaseTimings:
+    """Wall-clock time spent in each phase of a generation run"""
+    
+    def __init__(self):
+        self.seconds = {}
+    
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = self.seconds.get(name, 0.0) + time.perf_counter() - start
+    
+    def as_dict(self):
+        return {name: round(seconds * 1000, 1) for name, seconds in self.seconds.items()}
+    
+    def __str__(self):
+        phases = ' '.join(f"{name}={ms}ms" for name, ms in self.as_dict().items())
+        return f"{phases} total={round(sum(self.seconds.values()) * 1000, 1)}ms"
+
+# Per-process orchestrator used by the render workers of --jobs
+_worker_orchestrator = None
+
+def _init_render_worker(config):
+    global _worker_orchestrator
+    _worker_orchestrator = MCPOrchestrator(config=config)
+
+def _render_batch_in_worker(batch):
+    return [_worker_orchestrator.render_and_save(client, environment) for client, environment in batch]
+
+def batched(iterable, size):
+    """Yield lists of up to `size` items from `iterable`"""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+def write_if_changed(path, content):
+    """Write content to path atomically, skipping the write when it is identical"""
+    path = Path(path)
+    try:
+        if path.read_text() == content:
+            return False
+    except FileNotFoundError:
+        pass
+    
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, 'w') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+    return True
 
 def main():
     parser = argparse.ArgumentParser(description='MCP Platform Orchestrator')
@@ -220,6 +886,23 @@ def main():
                        help='Path to configuration file')
     parser.add_argument('-v', '--verbose', action='store_true',
                        help='Enable verbose logging')
+    parser.add_argument('--force', action='store_true',
+                       help='Regenerate every manifest, ignoring the manifest index')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                       help='Number of worker processes used to render manifests')
+    parser.add_argument('--source', choices=['file', 'db'], default='file',
+                       help='Read clients from config.json (file) or from the clients table (db)')
+    parser.add_argument('--database-url', default=os.environ.get('MCP_DATABASE_URL'),
+                       help='Database conninfo/URL for --source db (default: MCP_DATABASE_URL or '
+                            'the database section of config.json)')
+    parser.add_argument('--listen', action='store_true',
+                       help='With --source db, keep running and regenerate clients as they change')
+    parser.add_argument('--watch', action='store_true',
+                       help='Keep running and regenerate manifests when config, secrets or templates change')
+    parser.add_argument('--debounce', type=float, default=2.0,
+                       help='Seconds without changes before regenerating in --listen/--watch mode')
+    parser.add_argument('--metrics-file',
+                       help='In --watch mode, write cycle metrics to this file (Prometheus text format)')
     
     args = parser.parse_args()
     
@@ -227,7 +910,32 @@ def main():
         logging.getLogger().setLevel(logging.DEBUG)
     
     orchestrator = MCPOrchestrator(args.config)
-    orchestrator.generate_all_manifests()
+    
+    if args.source == 'file':
+        if args.watch:
+            orchestrator.watch(jobs=args.jobs, debounce=args.debounce, metrics_file=args.metrics_file)
+        else:
+            orchestrator.generate_all_manifests(force=args.force, jobs=args.jobs)
+        return
+    
+    source = DatabaseClientSource(
+        args.database_url or DatabaseClientSource.conninfo_from_config(orchestrator.config['database'])
+    )
+    if not args.listen:
+        orchestrator.generate_all_manifests(force=args.force, jobs=args.jobs, clients=source.iter_clients())
+        return
+    
+    for changed in source.listen(debounce=args.debounce):
+        if changed is None:
+            orchestrator.generate_all_manifests(force=args.force, jobs=args.jobs, clients=source.iter_clients())
+            continue
+        
+        logger.info(f"Clients changed: {', '.join(sorted(changed))}")
+        orchestrator.generate_all_manifests(
+            jobs=args.jobs,
+            clients=source.iter_clients(changed),
+            scope=changed
+        )
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
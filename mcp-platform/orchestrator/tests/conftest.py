@@ -0,0 +1,50 @@
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+ORCHESTRATOR_DIR = Path(__file__).resolve().parent.parent
+
+sys.path.insert(0, str(ORCHESTRATOR_DIR))
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    """Two fake clients in a platform tree under tmp_path (the working directory)
+
+    The orchestrator resolves `orchestrator/templates`, `config/` and
+    `generated-manifests/` from the working directory, so the real templates
+    are copied in and each client gets a credentials file.
+    """
+    monkeypatch.chdir(tmp_path)
+    shutil.copytree(ORCHESTRATOR_DIR / 'templates', tmp_path / 'orchestrator' / 'templates')
+    secrets = tmp_path / 'config' / 'secrets'
+    secrets.mkdir(parents=True)
+    for name in ('barbearia', 'salao'):
+        (secrets / f'{name}.env').write_text(f'GEMINI_API_KEY="{name}-key"\nWHATSAPP_API_TOKEN={name}-token\n')
+
+    return {
+        'argocd': {'namespace': 'argocd', 'repo_url': 'https://git.example/manifests.git', 'branch': 'main'},
+        'database': {'host': 'postgres', 'port': 5432, 'name': 'mcp_platform'},
+        'clients': [
+            {
+                'client_name': 'barbearia',
+                'environments': {'development': True, 'staging': False, 'production': True},
+                'credentials_file': 'secrets/barbearia.env',
+                'resources': {
+                    'limits': {'cpu': '500m', 'memory': '512Mi'},
+                    'requests': {'cpu': '250m', 'memory': '256Mi'},
+                },
+            },
+            {
+                'client_name': 'salao',
+                'environments': {'development': True},
+                'credentials_file': 'secrets/salao.env',
+                'resources': {
+                    'limits': {'cpu': '1000m', 'memory': '1Gi'},
+                    'requests': {'cpu': '500m', 'memory': '512Mi'},
+                },
+            },
+        ],
+    }
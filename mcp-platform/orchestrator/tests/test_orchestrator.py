@@ -0,0 +1,115 @@
+import shutil
+from pathlib import Path
+
+import yaml
+
+from orchestrator import BUNDLES_DIR, MCPOrchestrator
+
+OUTPUT_DIR = Path('generated-manifests')
+
+
+def generate(config, **kwargs):
+    return MCPOrchestrator(config=config).generate_all_manifests(**kwargs)
+
+
+def snapshot():
+    """Content of every generated file, by path relative to the output directory"""
+    return {
+        str(path.relative_to(OUTPUT_DIR)): path.read_text()
+        for path in sorted(OUTPUT_DIR.rglob('*')) if path.is_file()
+    }
+
+
+def mtimes(directory):
+    return {path: path.stat().st_mtime_ns for path in Path(directory).iterdir()}
+
+
+def kustomization_resources():
+    return yaml.safe_load((OUTPUT_DIR / BUNDLES_DIR / 'kustomization.yaml').read_text())['resources']
+
+
+def enable_scaling(config):
+    config['clients'][0]['scaling'] = {'min_replicas': 2, 'max_replicas': 4, 'environments': ['production']}
+
+
+def test_unchanged_clients_are_skipped(config):
+    first = generate(config)
+    assert (first['generated'], first['unchanged']) == (3, 0)
+    barbearia = mtimes(OUTPUT_DIR / 'barbearia' / 'production')
+
+    second = generate(config)
+    assert (second['generated'], second['unchanged'], second['files_written']) == (0, 3, 0)
+
+    config['clients'][1]['resources']['limits']['memory'] = '2Gi'
+    third = generate(config)
+    assert (third['generated'], third['unchanged']) == (1, 2)
+    assert third['files_written'] == 1  # only salao/development/deployment.yaml
+    assert mtimes(OUTPUT_DIR / 'barbearia' / 'production') == barbearia
+
+
+def test_credentials_change_regenerates_the_client(config):
+    generate(config)
+    Path('config/secrets/salao.env').write_text('GEMINI_API_KEY="rotated"\n')
+
+    stats = generate(config)
+
+    assert (stats['generated'], stats['unchanged']) == (1, 2)
+    assert 'rotated' in (OUTPUT_DIR / 'salao' / 'development' / 'secret.yaml').read_text()
+
+
+def test_removed_client_outputs_are_deleted(config):
+    generate(config)
+    del config['clients'][1]
+
+    stats = generate(config)
+
+    assert stats['removed'] == 1
+    assert not (OUTPUT_DIR / 'salao').exists()
+    assert 'salao' not in (OUTPUT_DIR / BUNDLES_DIR / 'namespace.yaml').read_text()
+
+
+def test_jobs_output_matches_serial(config):
+    enable_scaling(config)
+    generate(config)
+    serial = snapshot()
+    shutil.rmtree(OUTPUT_DIR)
+
+    generate(config, jobs=2)
+
+    assert snapshot() == serial
+
+
+def test_empty_kinds_have_no_bundle(config):
+    generate(config)
+
+    bundles = OUTPUT_DIR / BUNDLES_DIR
+    assert not (bundles / 'hpa.yaml').exists()
+    assert not (bundles / 'pdb.yaml').exists()
+    assert kustomization_resources() == [
+        'namespace.yaml', 'secret.yaml', 'deployment.yaml', 'service.yaml', 'argocd-application.yaml'
+    ]
+
+    enable_scaling(config)
+    generate(config)
+
+    assert 'hpa.yaml' in kustomization_resources()
+    assert 'barbearia-production' in (bundles / 'hpa.yaml').read_text()
+
+
+def test_stale_hpa_and_pdb_are_deleted_when_scaling_is_removed(config):
+    enable_scaling(config)
+    generate(config)
+    production = OUTPUT_DIR / 'barbearia' / 'production'
+    assert (production / 'hpa.yaml').is_file()
+    assert (production / 'pdb.yaml').is_file()
+    assert not (OUTPUT_DIR / 'barbearia' / 'development' / 'hpa.yaml').exists()
+
+    del config['clients'][0]['scaling']
+    stats = generate(config)
+
+    # The client entry changed: both barbearia environments are regenerated
+    assert stats['generated'] == 2
+    assert not (production / 'hpa.yaml').exists()
+    assert not (production / 'pdb.yaml').exists()
+    assert not (OUTPUT_DIR / BUNDLES_DIR / 'hpa.yaml').exists()
+    assert 'pdb.yaml' not in kustomization_resources()